@@ -12,7 +12,6 @@ Si se omite `directorio_salida`, exporta a data/export/<temporada>/.
 """
 
 import sys
-import sqlite3
 import logging
 from pathlib import Path
 
@@ -26,11 +25,6 @@ logging.basicConfig(level=logging.INFO, format="%(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
 
 
-def _list_tables(conn: sqlite3.Connection) -> list[str]:
-    cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    return [row[0] for row in cur.fetchall()]
-
-
 def main():
     temporada = sys.argv[1] if len(sys.argv) > 1 else db_utils.get_active_season()
     out_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else ROOT_DIR / "data" / "export" / temporada
@@ -39,7 +33,7 @@ def main():
     logger.info("Exportando temporada '%s' desde %s a %s", temporada, db_utils.get_db_path(), out_dir)
 
     with db_utils.get_connection() as conn:
-        tables = _list_tables(conn)
+        tables = db_utils.data_tables(conn)
 
     if not tables:
         logger.warning("No hay tablas en la base de datos.")
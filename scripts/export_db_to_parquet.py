@@ -0,0 +1,48 @@
+"""
+export_db_to_parquet.py
+=======================
+Exporta data/mister.db a Parquet, particionado por tabla y temporada
+(data/export/parquet/tabla=<tabla>/temporada=<t>/part.parquet), para
+análisis columnares (eda/, dashboards). Incremental: solo reescribe las
+particiones que han cambiado desde el último export (ver
+src/utils/parquet_export.py). No forma parte del pipeline ni de CI.
+
+Uso:
+    python scripts/export_db_to_parquet.py [--temporada T] [--out DIR] [--full]
+
+Requiere pyarrow (dependencia opcional, no está en requirements.txt).
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# ── Entorno ───────────────────────────────────────────────────────────────────
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.utils.parquet_export import export_parquet
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s | %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta data/mister.db a Parquet por tabla y temporada.")
+    parser.add_argument("--temporada", help="Solo esta temporada (por defecto, todas las de la BD).")
+    parser.add_argument("--out", type=Path, help="Directorio de salida (por defecto config.yaml -> export.parquet_dir).")
+    parser.add_argument("--full", action="store_true", help="Reescribe todas las particiones aunque no hayan cambiado.")
+    args = parser.parse_args()
+
+    result = export_parquet(args.out, args.temporada, args.full)
+    if result is None:
+        sys.exit(1)
+    for name in result["exportadas"]:
+        logger.info("  %s -> exportada", name)
+    for name in result["borradas"]:
+        logger.info("  %s -> borrada (ya no está en la BD)", name)
+
+
+if __name__ == "__main__":
+    main()
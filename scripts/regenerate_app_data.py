@@ -26,6 +26,7 @@ for p in (ROOT, SRC):
     if str(p) not in sys.path:
         sys.path.insert(0, str(p))
 
+from src.utils import db as db_utils
 from src.utils.config_loader import load_config
 from src.utils.file_utils import safe_read_csv
 from src.utils.team_map import map_team
@@ -66,15 +67,26 @@ LEAGUE_NAME   = "Sotano League"
 SEASON        = cfg["season"]["current"]
 N_FORM_ROUNDS = 8   # últimas N jornadas para calcular el form
 
+# Columnas que usan las secciones de abajo (el resto no se lee)
+COLUMNAS_GAMEWEEK = [
+    "Date", "Jornada", "Manager", "NombreJugador", "EquipoJugador", "Posicion",
+    "Puntos", "Goles", "Asistencias", "Roja",
+]
+COLUMNAS_TRANSFERS = ["fecha", "subtype", "equipo", "ganancias", "jugador", "compra-venta"]
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Helpers
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _load_csv(path: str, name: str) -> pd.DataFrame:
+def _load_csv(path: str, name: str, columns: list[str], where: dict | None = None) -> pd.DataFrame:
     """Lee `name` (CSV en disco o tabla de BD según config.yaml) vía
-    safe_read_csv, que resuelve la temporada activa automáticamente."""
-    df = safe_read_csv(path)
+    safe_read_csv, que resuelve la temporada activa automáticamente.
+
+    Solo las `columns` que usan las secciones de abajo, filtradas por
+    `where` y con los tipos declarados en db.TABLE_SCHEMAS (fechas ya
+    parseadas)."""
+    df = safe_read_csv(path, columns=columns, where=where, typed=True)
     if df.empty:
         logger.error("Sin datos para %s (%s)", name, path)
         sys.exit(1)
@@ -253,7 +265,7 @@ def build_league(
 ) -> dict:
 
     # Rango de fechas
-    dates = pd.to_datetime(df_gw["Date"])
+    dates = df_gw["Date"]
     date_range = f"{dates.min().date()} · {dates.max().date()}"
 
     # Manager del mes (última jornada disponible)
@@ -474,14 +486,12 @@ def _get_latest_headline(news: list) -> dict | None:
 
 def main():
     logger.info("Cargando CSVs...")
-    df_gw   = _load_csv(CSV_GAMEWEEK,      "gameweek")
-    df_clas = _load_csv(CSV_CLASIFICACION, "clasificaciones")
-    df_quin = _load_csv(CSV_QUINIELAS,     "quinielas")
-    df_merc = _load_csv(CSV_MERCADO,       "mercado/notificaciones")
-    df_jug  = _load_csv(CSV_JUGADORES,     "jugadores")
-
-    # Solo transfers
-    df_transfers = df_merc[df_merc["type"] == "transfer"].copy()
+    df_gw   = _load_csv(CSV_GAMEWEEK,      "gameweek", COLUMNAS_GAMEWEEK)
+    df_clas = _load_csv(CSV_CLASIFICACION, "clasificaciones", ["nombre", "puntos"])
+    df_quin = _load_csv(CSV_QUINIELAS,     "quinielas", ["nombre", "puntos"])
+    df_transfers = _load_csv(CSV_MERCADO,  "mercado/notificaciones", COLUMNAS_TRANSFERS,
+                             where={"type": "transfer"})
+    df_jug  = _load_csv(CSV_JUGADORES,     "jugadores", ["nombre", "foto_url"])
 
     logger.info("Construyendo secciones...")
 
@@ -510,6 +520,7 @@ def main():
         "  %d managers | %d noticias | %d jugadores en mapa",
         len(managers), len(news), len(players_map),
     )
+    db_utils.log_read_cache_stats()
 
 
 if __name__ == "__main__":
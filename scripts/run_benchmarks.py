@@ -0,0 +1,579 @@
+"""
+run_benchmarks.py — Benchmarks de las partes calientes del pipeline.
+
+No forma parte del pipeline ni de CI: sirve para medir antes/después de
+cambiar una implementación y comprobar que la salida no cambia.
+
+Uso:
+    python scripts/run_benchmarks.py parsers [--fecha YYYY-MM-DD] [--repeat N]
+    python scripts/run_benchmarks.py gameweek [--jornadas N] [--repeat N]
+    python scripts/run_benchmarks.py ganancias [--filas N] [--repeat N]
+    python scripts/run_benchmarks.py jugador [--filas N] [--jugadores N] [--repeat N]
+    python scripts/run_benchmarks.py preprocess [--filas N] [--repeat N]
+    python scripts/run_benchmarks.py model [--temporadas 1,3,10] [--repeat N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.utils.bootstrap import setup_project_root
+
+ROOT_DIR = setup_project_root(__file__)
+
+from src.utils.config_loader import load_config
+from src.utils.file_utils import safe_read_html
+
+
+def _best_of(fn, repeat: int) -> tuple[float, object]:
+    """Mejor tiempo (s) de `repeat` ejecuciones de fn() y el último resultado."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - inicio)
+    return best, result
+
+
+# ── parsers ───────────────────────────────────────────────────────────────────
+
+def cmd_parsers(args: argparse.Namespace) -> None:
+    """Tiempo de extracción por sección con cada backend de parseo, y si la
+    salida es idéntica a la de html.parser (la implementación de referencia)."""
+    from unittest.mock import patch
+
+    from src.data.extract_clasificacion import extraer_clasificaciones
+    from src.data.extract_gameweek import extraer_gameweek
+    from src.data.extract_jornadas import extraer_jornadas
+    from src.data.extract_mercado import extraer_mercado
+    from src.data.extract_notificaciones import extraer_notificaciones
+    from src.data.extract_players import extraer_jugadores
+    from src.data.extract_quinielas import extraer_quinielas
+    from src.data.extract_subidas_bajadas import extraer_subidas_bajadas
+    from src.utils import html_parsing
+
+    html_paths = load_config(validate_env=False)["paths"]["html"]
+    secciones = [
+        ("notificaciones", html_paths["aux"], extraer_notificaciones),
+        ("clasificaciones", html_paths["clas_aux"], extraer_clasificaciones),
+        ("mercado", html_paths["mercado"], extraer_mercado),
+        ("jornadas", html_paths["jornadas"], extraer_jornadas),
+        ("subidas_bajadas", html_paths["subidas_bajadas"], extraer_subidas_bajadas),
+        ("gameweek", html_paths["gameweek"], extraer_gameweek),
+        ("quiniela", html_paths["quiniela"], extraer_quinielas),
+        ("jugadores", html_paths["players"], extraer_jugadores),
+    ]
+
+    print(f"{'sección':<16} {'KB':>7} " + " ".join(f"{b:>12}" for b in html_parsing.BACKENDS) + "  idéntico")
+    for nombre, path, extractor in secciones:
+        html = safe_read_html(path, args.fecha)
+        if not html:
+            print(f"{nombre:<16} {'—':>7}  (sin HTML)")
+            continue
+
+        tiempos, salidas = [], []
+        for backend in html_parsing.BACKENDS:
+            with patch.object(html_parsing, "get_parser_backend", lambda b=backend: b):
+                t, df = _best_of(lambda: extractor(html), args.repeat)
+            tiempos.append(t)
+            salidas.append(df)
+
+        identico = all(
+            df.reset_index(drop=True).equals(salidas[0].reset_index(drop=True)) for df in salidas[1:]
+        )
+        print(
+            f"{nombre:<16} {len(html) / 1024:>7.0f} "
+            + " ".join(f"{t * 1000:>10.1f}ms" for t in tiempos)
+            + f"  {'sí' if identico else 'NO'}"
+        )
+
+
+# ── gameweek ──────────────────────────────────────────────────────────────────
+
+_HREFS_EVENTO = [
+    "#events-goal", "#events-assist", "#events-own_goal", "#events-penalty",
+    "#events-missed_penalty", "#events-saved_penalty", "#events-yellow",
+    "#events-red", "#events-sub_in", "#events-sub_out", "#events-mvp",
+]
+
+
+def _gameweek_sintetico(jornadas: int, seed: int = 0) -> str:
+    """HTML con la estructura de gameweek.html: `jornadas` wrappers de 10
+    partidos, 2 equipos x 3 managers x 11 jugadores con 0-4 eventos."""
+    rnd = random.Random(seed)
+    partes = []
+    for j in range(1, jornadas + 1):
+        partes.append(f'<div class="gameweek-wrapper"><div class="section-title"><h3>Jornada {j}</h3></div>')
+        for _ in range(10):
+            partes.append(
+                '<div class="gameweek-match" data-status="played"><div class="info"><div class="scoreboard">'
+                f'<a class="btn btn-sw-link" href="/teams/{rnd.randint(1, 20)}">L</a><span class="goals">{rnd.randint(0, 4)}</span>'
+                f'<a class="btn btn-sw-link" href="/teams/{rnd.randint(1, 20)}">V</a><span class="goals">{rnd.randint(0, 4)}</span>'
+                '</div>'
+            )
+            for _ in range(2):
+                partes.append('<div class="team">')
+                for m in range(3):
+                    partes.append(f'<div class="user"><div class="name">Manager {m}</div><ul>')
+                    for k in range(11):
+                        eventos = "".join(
+                            f'<use href="{rnd.choice(_HREFS_EVENTO)}"></use>' for _ in range(rnd.randint(0, 4))
+                        )
+                        partes.append(
+                            f'<li><strong>Jugador {k}</strong><span class="player-position" data-position="{k % 4 + 1}"></span>'
+                            f'<span class="points">{rnd.randint(-2, 20)}</span><span class="events">{eventos}</span></li>'
+                        )
+                    partes.append('</ul></div>')
+                partes.append('</div>')
+            partes.append('</div></div>')
+        partes.append('</div>')
+    return "".join(partes)
+
+
+def _contar_eventos_por_subcadena(event_hrefs: list[str]) -> list[int]:
+    """Implementación anterior de extraer_gameweek (un barrido por evento),
+    como referencia para comparar tiempo y salida."""
+    def contar_evento(nombre):
+        return sum(nombre in h for h in event_hrefs)
+
+    return [
+        int(any("events-sub_in" in h for h in event_hrefs)),
+        int(any("events-sub_out" in h for h in event_hrefs)),
+        contar_evento("events-goal"),
+        contar_evento("events-assist"),
+        contar_evento("events-own_goal"),
+        contar_evento("events-penalty"),
+        contar_evento("events-missed_penalty"),
+        contar_evento("events-saved_penalty"),
+        contar_evento("events-yellow"),
+        int(any("events-red" in h for h in event_hrefs)),
+    ]
+
+
+def cmd_gameweek(args: argparse.Namespace) -> None:
+    """Conteo de eventos por jugador (antes/después) y extraer_gameweek
+    completo sobre una temporada sintética."""
+    from src.data.extract_gameweek import contar_eventos, extraer_gameweek
+    from src.utils.html_parsing import parse_html
+
+    html = _gameweek_sintetico(args.jornadas)
+    soup = parse_html(html)
+    por_jugador = [[u.get("href", "") for u in li.select(".events use")] for li in soup.select(".user ul li")]
+    print(f"{args.jornadas} jornadas, {len(por_jugador)} jugadores, {len(html) / 1024:.0f} KB")
+
+    t_antes, antes = _best_of(lambda: [_contar_eventos_por_subcadena(h) for h in por_jugador], args.repeat)
+    t_despues, despues = _best_of(lambda: [contar_eventos(h) for h in por_jugador], args.repeat)
+    print(f"conteo de eventos   antes {t_antes * 1000:>8.1f}ms  después {t_despues * 1000:>8.1f}ms"
+          f"  (x{t_antes / t_despues:.1f})  idéntico: {'sí' if antes == despues else 'NO'}")
+
+    t_total, df = _best_of(lambda: extraer_gameweek(soup), args.repeat)
+    print(f"extraer_gameweek    {t_total * 1000:>8.1f}ms  ({len(df)} filas, árbol ya parseado)")
+
+
+# ── ganancias ─────────────────────────────────────────────────────────────────
+
+_MANAGERS = ["Dani", "Maldinillo 💥", "Jotabetrbb", "Los marinero", "Juanba", "Libre", "MuchaSalsa"]
+
+
+def _ganancias_sintetico(filas: int, seed: int = 0, jugadores: int = 600) -> "pd.DataFrame":
+    """Feed de notificaciones con la mezcla de ganancias.csv: marcas de
+    mercado/jornada, bonificaciones y transfers (mercado, pujas, cláusulas,
+    acuerdos y alguna bajada de cláusula sin a_equipo) de `jugadores`
+    jugadores distintos."""
+    import pandas as pd
+
+    rnd = random.Random(seed)
+    registros = []
+    for i in range(filas):
+        fecha = f"2026-{(i // 3000) % 12 + 1:02d}-{(i // 100) % 28 + 1:02d}"
+        r = rnd.random()
+        if r < 0.27:
+            registros.append({"type": "marks", "subtype": "start_mercado", "date": fecha})
+        elif r < 0.28:
+            registros.append({"type": "marks", "subtype": "start_jornada", "jornada": float(i % 38 + 1), "date": fecha})
+        elif r < 0.48:
+            money = round(rnd.uniform(0, 3), 2) if rnd.random() < 0.6 else None
+            registros.append({"type": "bonificacion", "subtype": rnd.choice(["quiniela", "clasificacion"]),
+                              "name": rnd.choice(_MANAGERS), "money": money, "date": fecha})
+        else:
+            subtipo = rnd.choices(["mercado", "Puja", "clausula", "acuerdo"], [65, 25, 6, 4])[0]
+            de = "Mister" if subtipo == "Puja" or rnd.random() < 0.5 else rnd.choice(_MANAGERS)
+            a = None if rnd.random() < 0.003 else ("Mister" if de != "Mister" and rnd.random() < 0.6
+                                                   else rnd.choice(_MANAGERS))
+            registros.append({"type": "transfer", "subtype": subtipo, "jugador": f"Jugador {rnd.randint(1, jugadores)}",
+                              "de_equipo": de, "a_equipo": a, "precio": round(rnd.uniform(0.1, 80), 6),
+                              "equipoLiga": float(rnd.randint(1, 20)), "date": fecha})
+    return pd.DataFrame(registros)
+
+
+def _procesar_ganancias_bucle(df):
+    """Implementación anterior de procesar_ganancias (iloc + iterrows), como
+    referencia para comparar tiempo y salida."""
+    import pandas as pd
+
+    df = df.reset_index(drop=True)
+    filas_a_eliminar = []
+    for i in range(len(df) - 1):
+        fila_actual = df.iloc[i]
+        fila_siguiente = df.iloc[i + 1]
+        if (
+            fila_actual["subtype"] == "start_mercado"
+            and fila_siguiente["type"] == "transfer"
+            and str(fila_siguiente.get("de_equipo", "")) != "Mister"
+        ):
+            filas_a_eliminar.append(i)
+    df = df.drop(filas_a_eliminar).reset_index(drop=True)
+
+    registros = []
+    new_id = 0
+    bool_new_id = False
+    for _, row in df.iterrows():
+        fecha = row["date"]
+        if bool_new_id and row["de_equipo"] != "Mister":
+            new_id = new_id + 1
+            bool_new_id = False
+        tipo = row["type"]
+        subtipo = row["subtype"]
+        base = {"fecha": fecha, "id": new_id}
+        if subtipo == "start_mercado":
+            bool_new_id = True
+            registros.append({**base, "type": tipo, "subtype": subtipo, "equipo": "Mercado diario", "ganancias": 0})
+        elif subtipo == "start_jornada":
+            registros.append({**base, "type": tipo, "subtype": subtipo, "equipo": row["jornada"], "ganancias": 0})
+        elif tipo in ["bonificacion"]:
+            ganancia = row["money"] if pd.notna(row.get("money")) else 0
+            registros.append({**base, "type": tipo, "subtype": subtipo, "equipo": row["name"], "ganancias": ganancia})
+        elif tipo == "transfer":
+            try:
+                if pd.isna(row["a_equipo"]):
+                    registros.append({**base, "type": "bajadaclausula", "equipo": row["de_equipo"],
+                                      "jugador": row["jugador"], "equipoLiga": row["equipoLiga"], "ganancias": 0})
+                else:
+                    precio = 0 if subtipo == "Puja" else row["precio"]
+                    comun = {**base, "type": "transfer", "subtype": subtipo}
+                    registros.append({**comun, "equipo": row["de_equipo"], "jugador": row["jugador"],
+                                      "compra-venta": "venta", "equipoLiga": row["equipoLiga"], "ganancias": precio})
+                    registros.append({**comun, "equipo": row["a_equipo"], "jugador": row["jugador"],
+                                      "compra-venta": "compra", "equipoLiga": row["equipoLiga"], "ganancias": -precio})
+            except Exception:
+                pass
+
+    df_limpio = pd.DataFrame(registros)
+    return df_limpio[df_limpio["equipo"] != "Mister"]
+
+
+def cmd_ganancias(args: argparse.Namespace) -> None:
+    """procesar_ganancias (antes/después) sobre un feed sintético."""
+    from src.preprocessing.process_ganancias import procesar_ganancias
+
+    df = _ganancias_sintetico(args.filas)
+    print(f"{len(df)} filas de feed")
+
+    t_antes, antes = _best_of(lambda: _procesar_ganancias_bucle(df), args.repeat)
+    t_despues, despues = _best_of(lambda: procesar_ganancias(df), args.repeat)
+    identico = antes.to_csv(index=False) == despues.to_csv(index=False) and antes.dtypes.equals(despues.dtypes)
+    print(f"procesar_ganancias  antes {t_antes * 1000:>9.1f}ms  después {t_despues * 1000:>8.1f}ms"
+          f"  (x{t_antes / t_despues:.1f})  {len(despues)} filas  idéntico: {'sí' if identico else 'NO'}")
+
+
+# ── jugador ───────────────────────────────────────────────────────────────────
+
+def _procesar_ganancias_jugador_cruce(df):
+    """Implementación anterior de procesar_ganancias_jugador (merge de cada
+    venta con todas las compras del mismo jugador/equipo, filtro y
+    groupby.first), como referencia para comparar tiempo y salida."""
+    df_ventas = df[
+        (df['type'] == 'transfer') & (df['compra-venta'] == 'venta') & (df['subtype'] != 'Puja')
+    ].copy()
+    df_compras = df[
+        (df['type'] == 'transfer') & (df['compra-venta'] == 'compra')
+    ][['id', 'equipo', 'jugador', 'ganancias']].copy()
+    df_compras = df_compras.rename(columns={'id': 'id_compra', 'ganancias': 'ganancias_compra'})
+    merged = df_ventas[['id', 'equipo', 'jugador', 'ganancias']].merge(df_compras, on=['equipo', 'jugador'], how='left')
+    merged = merged[merged['id_compra'] > merged['id']]
+    merged = merged.sort_values('id_compra', kind='stable').groupby(['id', 'equipo', 'jugador'], as_index=False).first()
+    merged['Diff'] = merged['ganancias'] + merged['ganancias_compra']
+    df_ventas = df_ventas.merge(merged[['id', 'equipo', 'jugador', 'Diff']], on=['id', 'equipo', 'jugador'], how='left')
+    df_ventas = df_ventas.drop(["id", "type", "ganancias", "compra-venta"], axis=1, errors='ignore')
+    return df_ventas.dropna(subset=['Diff'])
+
+
+def cmd_jugador(args: argparse.Namespace) -> None:
+    """procesar_ganancias_jugador (antes/después) sobre el ganancias_clean de
+    un feed sintético. Con pocos jugadores cada uno cambia muchas veces de
+    manos, que es donde el cruce de antes crece de forma cuadrática."""
+    from src.preprocessing.process_ganancias import procesar_ganancias
+    from src.preprocessing.process_ganancias_jugador import procesar_ganancias_jugador
+
+    df = procesar_ganancias(_ganancias_sintetico(args.filas, jugadores=args.jugadores))
+    print(f"{len(df)} filas de ganancias_clean, {args.jugadores} jugadores")
+
+    t_antes, antes = _best_of(lambda: _procesar_ganancias_jugador_cruce(df), args.repeat)
+    t_despues, despues = _best_of(lambda: procesar_ganancias_jugador(df), args.repeat)
+    identico = antes.to_csv(index=False) == despues.to_csv(index=False)
+    print(f"procesar_ganancias_jugador  antes {t_antes * 1000:>9.1f}ms  después {t_despues * 1000:>8.1f}ms"
+          f"  (x{t_antes / t_despues:.1f})  {len(despues)} filas  idéntico: {'sí' if identico else 'NO'}")
+
+
+# ── preprocess ────────────────────────────────────────────────────────────────
+
+def _pico_memoria(fn) -> int:
+    """Pico de memoria (bytes, tracemalloc) de una ejecución de fn()."""
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def cmd_preprocess(args: argparse.Namespace) -> None:
+    """run_preprocess.py --full (antes/después) sobre un feed sintético en una
+    BD temporal: antes, tres pasos que guardan cada tabla por separado y
+    releen ganancias_clean de la BD para el Diff; después, los mismos pasos
+    en memoria (procesar_notificaciones) y las tres tablas en una
+    transacción (db.write_tables)."""
+    import tempfile
+
+    from src.preprocessing.process_clausulas_acuerdos import procesar_clausulas_acuerdos
+    from src.preprocessing.process_ganancias import procesar_ganancias
+    from src.preprocessing.process_ganancias_jugador import procesar_ganancias_jugador
+    from src.preprocessing.process_notificaciones import procesar_notificaciones
+    from src.utils import db as db_utils
+
+    temporada = "2026-27"
+    tablas = ("ganancias_clean", "ganancias_jugador", "clausulas_acuerdos")
+    directorio = Path(tempfile.mkdtemp())
+
+    def por_pasos():
+        feed = db_utils.read_table("ganancias", temporada)
+        db_utils.write_table(procesar_ganancias(feed), tablas[0], temporada)
+        clean = db_utils.read_table(tablas[0], temporada)
+        db_utils.write_table(procesar_ganancias_jugador(clean), tablas[1], temporada)
+        db_utils.write_table(procesar_clausulas_acuerdos(feed), tablas[2], temporada)
+
+    def en_una_transaccion():
+        salidas = procesar_notificaciones(db_utils.read_table("ganancias", temporada))
+        db_utils.write_tables(dict(zip(tablas, salidas.values())), temporada)
+
+    feed = _ganancias_sintetico(args.filas)
+    print(f"{len(feed)} filas de feed")
+    resultados = []
+    for nombre, fn in (("antes", por_pasos), ("después", en_una_transaccion)):
+        # BD temporal: no toca data/mister.db
+        path = directorio / f"{nombre}.db"
+        db_utils.get_db_path = lambda path=path: path
+        db_utils.write_table(feed, "ganancias", temporada)
+        t, _ = _best_of(fn, args.repeat)
+        pico = _pico_memoria(fn)
+        salida = [db_utils.read_table(tabla, temporada).sort_index(axis=1).to_csv(index=False) for tabla in tablas]
+        resultados.append((t, pico, salida))
+
+    (t_antes, pico_antes, antes), (t_despues, pico_despues, despues) = resultados
+    print(f"preprocess  antes {t_antes * 1000:>9.1f}ms  después {t_despues * 1000:>8.1f}ms"
+          f"  (x{t_antes / t_despues:.1f})  pico de memoria antes {pico_antes / 2**20:.1f}MB"
+          f"  después {pico_despues / 2**20:.1f}MB  idéntico: {'sí' if antes == despues else 'NO'}")
+
+
+# ── model ─────────────────────────────────────────────────────────────────────
+
+def _procesar_model_data_merges(csv_mercado, csv_subidasBajadas, csv_jornada, csv_notificaciones_clean):
+    """Implementación anterior de procesar_model_data (apply fila a fila y
+    cuatro merges encadenados), como referencia para comparar tiempo y
+    salida. Modifica los DataFrames de entrada, como hacía."""
+    import numpy as np
+    import pandas as pd
+
+    from src.data.process_modeling import abreviar_nombre, transformar_detalles
+
+    # --- Normalizar fechas ---
+    csv_mercado["date"] = pd.to_datetime(csv_mercado["date"], errors="coerce")
+    csv_subidasBajadas["date"] = pd.to_datetime(csv_subidasBajadas["date"], errors="coerce")
+    csv_jornada["date"] = pd.to_datetime(csv_jornada["date"], errors="coerce")
+    csv_notificaciones_clean["fecha"] = pd.to_datetime(csv_notificaciones_clean["fecha"], errors="coerce")
+
+    # --- Normalizar nombres de jugadores ---
+    csv_mercado["jugador"] = csv_mercado["jugador"].astype(str).str.strip().str.upper()
+    csv_subidasBajadas["nombre"] = csv_subidasBajadas["nombre"].astype(str).str.strip().str.upper()
+    csv_subidasBajadas["nombre"] = csv_subidasBajadas["nombre"].apply(abreviar_nombre)
+    csv_notificaciones_clean["jugador"] = csv_notificaciones_clean["jugador"].astype(str).str.strip().str.upper()
+    csv_notificaciones_clean["jugador"] = csv_notificaciones_clean["jugador"].apply(abreviar_nombre)
+
+
+    columnas_mercado = [
+        "date",
+        "jugador",
+        "precio",
+        "posicionJugador",
+        "puntosJugador",
+        "equipoLiga",
+        "avgPoints",
+        "estado"
+    ]
+    mapeo_estado = {
+    np.nan: 0,       # NaN → 0
+    'injury': 1,
+    'red': 2,
+    'doubt': 3,
+    'other': 4,
+    'five': 5
+}
+    csv_mercado["estado"] = csv_mercado["estado"].map(mapeo_estado)
+
+    mercado_libre = csv_mercado[
+        csv_mercado["manager"] == "Libre"
+    ][columnas_mercado]
+
+    mercado_subida = mercado_libre.merge(
+        csv_subidasBajadas,
+        left_on=["date", "jugador"],
+        right_on=["date", "nombre"],
+        how="left"
+    )
+    mercado_subida = mercado_subida.drop(columns=["nombre"], errors="ignore")
+
+    csv_jornada = csv_jornada[(csv_jornada["detalles"] != "En juego") & (csv_jornada["detalles"] != "Finalizada")].copy()
+    csv_jornada["detalles"] = csv_jornada["detalles"].apply(transformar_detalles)
+    mercado_subida_jornada = mercado_subida.merge(
+        csv_jornada,
+        on="date",
+        how="left"
+    )
+
+    columnas_notificaciones = ["fecha", "equipo", "jugador", "ganancias"]
+    csv_notificaciones_clean = csv_notificaciones_clean.copy()
+    csv_notificaciones_clean["fecha"] -= pd.Timedelta(days=1)
+
+
+    notificaciones_ventas = csv_notificaciones_clean[
+        (csv_notificaciones_clean["compra-venta"] == "compra") &
+        (csv_notificaciones_clean["subtype"] == "mercado")
+    ][columnas_notificaciones]
+
+    notificaciones_pujas = csv_notificaciones_clean[
+        (csv_notificaciones_clean["compra-venta"] == "compra") &
+        (csv_notificaciones_clean["subtype"] == "Puja")
+    ][columnas_notificaciones]
+
+    mercado_subida_jornada_compras = mercado_subida_jornada.merge(
+        notificaciones_ventas,
+        left_on=["date", "jugador"],
+        right_on=["fecha", "jugador"],
+        how="left"
+    )
+    mercado_subida_jornada_compras = mercado_subida_jornada_compras.drop(columns=["fecha"], errors="ignore")
+
+    pujas_agrupadas = (
+    notificaciones_pujas
+    .groupby(["fecha", "jugador"])
+    .size()
+    .reset_index(name="num_pujas")
+    )
+    mercado_final = mercado_subida_jornada_compras.merge(
+    pujas_agrupadas,
+    left_on=["date", "jugador"],
+    right_on=["fecha", "jugador"],
+    how="left"
+    )
+    mercado_final["num_pujas"] = mercado_final["num_pujas"].fillna(0).astype(int)
+    mercado_final = mercado_final.drop(columns=["fecha"], errors="ignore")
+
+
+    return mercado_final
+
+
+_ARCHIVO_MODELO = ROOT_DIR / "archive" / "temporada_2025-26" / "data" / "processed"
+
+
+def _temporadas_modelo(temporadas: int) -> tuple:
+    """Entradas de procesar_model_data con `temporadas` copias de la
+    temporada archivada, cada una desplazada un año (mismos jugadores, como
+    de una temporada a otra)."""
+    import pandas as pd
+
+    tablas = []
+    for archivo, col in (("mercado.csv", "date"), ("subidasBajadas.csv", "date"), ("jornadas.csv", "date"),
+                         ("ganancias_clean.csv", "fecha")):
+        df = pd.read_csv(_ARCHIVO_MODELO / archivo)
+        fechas = pd.to_datetime(df[col], errors="coerce")
+        copias = [df.assign(**{col: (fechas + pd.DateOffset(years=i)).dt.strftime("%Y-%m-%d")})
+                  for i in range(temporadas)]
+        tablas.append(pd.concat(copias, ignore_index=True))
+    return tuple(tablas)
+
+
+def cmd_model(args: argparse.Namespace) -> None:
+    """procesar_model_data (antes/después) sobre 1, 3, 10... temporadas de
+    snapshots de mercado. La caché de abreviaturas se vacía antes de cada
+    ejecución: el tiempo es el de una primera pasada."""
+    from src.data import process_modeling
+
+    if not (_ARCHIVO_MODELO / "mercado.csv").exists():
+        print(f"Sin temporada archivada en {_ARCHIVO_MODELO}")
+        return
+
+    def despues(entradas):
+        process_modeling._ABREVIATURAS.clear()
+        return process_modeling.procesar_model_data(*entradas)
+
+    for temporadas in (int(t) for t in args.temporadas.split(",")):
+        entradas = _temporadas_modelo(temporadas)
+        t_antes, antes = _best_of(lambda: _procesar_model_data_merges(*(df.copy() for df in entradas)), args.repeat)
+        t_despues, resultado = _best_of(lambda: despues(entradas), args.repeat)
+        identico = antes.to_csv(index=False) == resultado.to_csv(index=False) and antes.dtypes.equals(resultado.dtypes)
+        print(f"{temporadas:>2} temporadas ({len(entradas[1]):>7} subidas/bajadas)  antes {t_antes * 1000:>8.1f}ms"
+              f"  después {t_despues * 1000:>7.1f}ms  (x{t_antes / t_despues:.1f})  {len(resultado)} filas"
+              f"  idéntico: {'sí' if identico else 'NO'}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p_parsers = subparsers.add_parser("parsers", help="Backends de parseo HTML por sección")
+    p_parsers.add_argument("--fecha", help="Usar las capturas archivadas de ese día (YYYY-MM-DD)")
+    p_parsers.add_argument("--repeat", type=int, default=3)
+    p_parsers.set_defaults(func=cmd_parsers)
+
+    p_gameweek = subparsers.add_parser("gameweek", help="Conteo de eventos de extraer_gameweek")
+    p_gameweek.add_argument("--jornadas", type=int, default=38)
+    p_gameweek.add_argument("--repeat", type=int, default=3)
+    p_gameweek.set_defaults(func=cmd_gameweek)
+
+    p_ganancias = subparsers.add_parser("ganancias", help="procesar_ganancias vectorizado frente al bucle")
+    p_ganancias.add_argument("--filas", type=int, default=100_000)
+    p_ganancias.add_argument("--repeat", type=int, default=1)
+    p_ganancias.set_defaults(func=cmd_ganancias)
+
+    p_jugador = subparsers.add_parser("jugador", help="procesar_ganancias_jugador con merge_asof frente al cruce")
+    p_jugador.add_argument("--filas", type=int, default=100_000)
+    p_jugador.add_argument("--jugadores", type=int, default=50)
+    p_jugador.add_argument("--repeat", type=int, default=3)
+    p_jugador.set_defaults(func=cmd_jugador)
+
+    p_preprocess = subparsers.add_parser("preprocess", help="run_preprocess.py --full en una transacción frente a por pasos")
+    p_preprocess.add_argument("--filas", type=int, default=100_000)
+    p_preprocess.add_argument("--repeat", type=int, default=3)
+    p_preprocess.set_defaults(func=cmd_preprocess)
+
+    p_model = subparsers.add_parser("model", help="procesar_model_data con joins indexados frente a los merges")
+    p_model.add_argument("--temporadas", default="1,3,10", help="Nº de temporadas de cada medición, separados por comas")
+    p_model.add_argument("--repeat", type=int, default=3)
+    p_model.set_defaults(func=cmd_model)
+
+    return parser
+
+
+def main() -> None:
+    parser = build_parser()
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import sys
 import os
+import argparse
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 import pandas as pd
@@ -11,210 +14,264 @@ from src.utils.bootstrap import setup_project_root
 
 ROOT_DIR = setup_project_root(__file__)
 
-from src.data.merge_notifications import merge_feed_cards_until_match
-from src.data.merge_clasification import merge_clasifications
+from src.data.merge_notifications import append_new_notifications
+from src.data.merge_clasification import upsert_clasificaciones
 from src.data.extract_notificaciones import extraer_notificaciones
 from src.data.extract_clasificacion import extraer_clasificaciones
 from src.data.extract_mercado import extraer_mercado
 from src.data.extract_jornadas import extraer_jornadas
 from src.data.extract_subidas_bajadas import extraer_subidas_bajadas
 from src.data.extract_gameweek import extraer_gameweek
-from src.data.merge_gameweek import merge_gameweek
+from src.data.merge_gameweek import upsert_gameweek
 from src.data.extract_quinielas import extraer_quinielas
 from src.data.merge_quinielas import merge_quinielas
+from src.data.extraction_cache import get_cache_dir, guardar_cache
+from src.data.extraction_context import extraer_pagina
 from src.scraper.login import login
-from src.utils.config_loader import load_config
+from src.utils import db as db_utils
+from src.utils.config_loader import get_parse_count, load_config
 from src.utils.data_utils import normalize_date_column
-from src.utils.file_utils import safe_read_html, safe_read_csv, safe_save_csv
-
-cfg = load_config(validate_env=False)
-
-# ── Logging ──────────────────────────────────────────────────────────────────
-log_level = getattr(logging, cfg.get("logging", {}).get("level", "INFO").upper(), logging.INFO)
-log_file = cfg.get("logging", {}).get("file", "logs/app.log")
-os.makedirs(os.path.dirname(log_file), exist_ok=True)
-
-logging.basicConfig(
-    level=log_level,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_file, encoding="utf-8"),
-        logging.StreamHandler(sys.stdout),
-    ],
-)
+from src.utils.file_utils import safe_read_csv, safe_save_csv
+
 logger = logging.getLogger(__name__)
 
-# ── Directorios y rutas ──────────────────────────────────────────────────────
-os.makedirs(cfg["data"]["raw_dir"], exist_ok=True)
-os.makedirs(cfg["data"]["processed_dir"], exist_ok=True)
-
-HTML_AUX          = cfg["paths"]["html"]["aux"]
-HTML_CLAS_AUX     = cfg["paths"]["html"]["clas_aux"]
-HTML_MERCADO_AUX  = cfg["paths"]["html"]["mercado"]
-HTML_JORNADAS_AUX = cfg["paths"]["html"]["jornadas"]
-HTML_SUBIDASBAJADAS = cfg["paths"]["html"]["subidas_bajadas"]
-HTML_GAMEWEEK     = cfg["paths"]["html"]["gameweek"]
-HTML_QUINIELA     = cfg["paths"]["html"]["quiniela"]
-
-CSV_NOTIFICACIONES  = cfg["paths"]["csv"]["notificaciones"]
-CSV_CLASIFICACIONES = cfg["paths"]["csv"]["clasificaciones"]
-CSV_MERCADO         = cfg["paths"]["csv"]["mercado"]
-CSV_JORNADA         = cfg["paths"]["csv"]["jornada"]
-CSV_SUBIDASBAJADAS  = cfg["paths"]["csv"]["subidas_bajadas"]
-CSV_GAMEWEEK        = cfg["paths"]["csv"]["gameweek"]
-CSV_QUINIELA        = cfg["paths"]["csv"]["quiniela"]
-
-# ── 0. Scraping ───────────────────────────────────────────────────────────────
-# login() lanza excepción si falla críticamente, deteniendo el pipeline.
-logger.info("Iniciando proceso de scraping con Playwright...")
-try:
-    saved_paths = login()
-    logger.info("✅ Scraping completado. Archivos guardados: %s", list(saved_paths.keys()))
-except Exception as e:
-    logger.error("❌ El scraping falló: %s", e)
-    sys.exit(1)
-
-# Validar que los HTMLs principales existen y no están vacíos
-def validate_html(path: str, name: str) -> bool:
-    html = safe_read_html(path)
-    if html is None:
-        logger.warning("⚠️ HTML no disponible para %s (%s)", name, path)
-        return False
-    if len(html.strip()) < 200:
-        logger.warning("⚠️ HTML de %s parece vacío o incompleto (%d chars)", name, len(html.strip()))
-        return False
-    return True
-
-# Secciones saltadas por HTML no disponible/incompleto. Si al final del
-# proceso queda alguna, el script termina con código != 0 para que CI
-# marque el job como fallido y dispare el aviso — antes el script siempre
-# terminaba con éxito aunque se hubieran saltado secciones enteras.
-skipped_sections = []
-
-# ── 1. Notificaciones ─────────────────────────────────────────────────────────
-logger.info("Extrayendo notificaciones...")
-if not validate_html(HTML_AUX, "notificaciones"):
-    logger.warning("⏭️ Saltando notificaciones.")
-    skipped_sections.append("notificaciones")
-else:
-    new_html = safe_read_html(HTML_AUX)
-    new_notificaciones = extraer_notificaciones(new_html)
-    logger.info("✅ Nuevas notificaciones extraídas.")
-    csv_notificaciones = safe_read_csv(CSV_NOTIFICACIONES)
-    new_csv_notificaciones = merge_feed_cards_until_match(csv_notificaciones, new_notificaciones)
-    safe_save_csv(new_csv_notificaciones, CSV_NOTIFICACIONES)
-    logger.info("✅ Notificaciones guardadas.")
-
-# ── 2. Clasificación ──────────────────────────────────────────────────────────
-logger.info("Extrayendo clasificaciones...")
-if not validate_html(HTML_CLAS_AUX, "clasificaciones"):
-    logger.warning("⏭️ Saltando clasificaciones.")
-    skipped_sections.append("clasificaciones")
-else:
-    new_html_clas = safe_read_html(HTML_CLAS_AUX)
-    new_clasificaciones = extraer_clasificaciones(new_html_clas)
-    logger.info("✅ Nuevas clasificaciones extraídas.")
-    csv_clasificaciones = safe_read_csv(CSV_CLASIFICACIONES)
-    new_csv_clasificacion = merge_clasifications(csv_clasificaciones, new_clasificaciones)
-    safe_save_csv(new_csv_clasificacion, CSV_CLASIFICACIONES)
-    logger.info("✅ Clasificaciones guardadas.")
-
-# ── 3. Mercado ────────────────────────────────────────────────────────────────
-# Deduplicamos por todas las columnas para evitar duplicados si el script
-# se ejecuta varias veces el mismo día.
-logger.info("Extrayendo mercado...")
-if not validate_html(HTML_MERCADO_AUX, "mercado"):
-    logger.warning("⏭️ Saltando mercado.")
-    skipped_sections.append("mercado")
-else:
-    html_mercado = safe_read_html(HTML_MERCADO_AUX)
-    new_csv_mercado = extraer_mercado(html_mercado)
-    logger.info("✅ Nuevos datos de mercado extraídos.")
-    csv_mercado = safe_read_csv(CSV_MERCADO)
-    csv_mercado = normalize_date_column(csv_mercado, "date")
-    new_csv_mercado = normalize_date_column(new_csv_mercado, "date")
-    merged_csv_mercado = (
-        pd.concat([csv_mercado, new_csv_mercado], ignore_index=True)
-        .drop_duplicates()
-        .reset_index(drop=True)
+
+# ── Guardado de las secciones sin merge propio en src/data/ ─────────────────
+# Escritura incremental por la clave de src/utils/db.py -> TABLE_KEYS: solo
+# se insertan las filas cuya clave no está guardada, así que ejecutar el
+# script varias veces el mismo día no duplica filas y no hace falta leer ni
+# reescribir la tabla entera.
+
+def guardar_append(new_df: pd.DataFrame, csv_path: str) -> None:
+    if not safe_save_csv(normalize_date_column(new_df, "date"), csv_path, mode="append"):
+        raise db_utils.WriteError(f"No se pudo guardar {csv_path}")
+
+
+# Guardados incrementales: reciben (df_nuevo, ruta) y escriben solo las
+# filas nuevas sin leer ni reescribir la tabla entera. Devuelven cuántas
+# añadieron/cambiaron, o None si el recuento ya lo registra la propia
+# escritura (db.write_table). Si la escritura falla o se rechaza lanzan
+# db.WriteError: ni None ni 0 significan nunca "no se guardó".
+GUARDADO_INCREMENTAL = {append_new_notifications, upsert_clasificaciones, upsert_gameweek, guardar_append}
+
+
+def build_secciones(cfg: dict) -> list[tuple]:
+    """(sección, html, extractor, tabla/csv, merge) en el orden de siempre.
+
+    El merge es una función (viejo, nuevo) -> mergeado, o uno de
+    GUARDADO_INCREMENTAL.
+    """
+    html = cfg["paths"]["html"]
+    csv = cfg["paths"]["csv"]
+    return [
+        ("notificaciones", html["aux"], extraer_notificaciones, csv["notificaciones"],
+         append_new_notifications),
+        ("clasificaciones", html["clas_aux"], extraer_clasificaciones, csv["clasificaciones"], upsert_clasificaciones),
+        ("mercado", html["mercado"], extraer_mercado, csv["mercado"], guardar_append),
+        ("jornadas", html["jornadas"], extraer_jornadas, csv["jornada"], guardar_append),
+        ("subidas_bajadas", html["subidas_bajadas"], extraer_subidas_bajadas, csv["subidas_bajadas"],
+         guardar_append),
+        ("gameweek", html["gameweek"], extraer_gameweek, csv["gameweek"], upsert_gameweek),
+        ("quiniela", html["quiniela"], extraer_quinielas, csv["quiniela"], merge_quinielas),
+    ]
+
+
+# Secciones cuyo extractor sella cada fila con la fecha de extracción: el
+# mismo HTML otro día da filas distintas, así que en la caché de extracción
+# su clave incluye el día (ver src/data/extraction_cache.py). Con --fecha
+# ese día es el de la captura archivada, no hoy.
+SECCIONES_FECHADAS = frozenset({"notificaciones", "mercado", "jornadas", "subidas_bajadas", "gameweek"})
+
+
+def _agrupar_por_html(secciones: list[tuple]) -> dict[str, dict]:
+    """{html: {sección: extractor}} — cada página se parsea una sola vez
+    aunque la lean varios extractores (ver src/data/extraction_context.py)."""
+    paginas: dict[str, dict] = {}
+    for nombre, html_path, extractor, _, _ in secciones:
+        paginas.setdefault(html_path, {})[nombre] = extractor
+    return paginas
+
+
+def _guardar_seccion(nombre: str, new_df: pd.DataFrame, csv_path: str, merge_fn) -> tuple[float, bool]:
+    """Mergea `new_df` con lo ya guardado y lo escribe. Solo se llama desde el
+    proceso principal: es el único que escribe en data/mister.db.
+
+    Devuelve (segundos, si se guardó)."""
+    inicio = time.perf_counter()
+    if merge_fn in GUARDADO_INCREMENTAL:
+        try:
+            nuevas = merge_fn(new_df, csv_path)
+        except db_utils.WriteError as e:
+            logger.error("❌ %s no se guardó: %s", nombre, e)
+            return time.perf_counter() - inicio, False
+        if nuevas is None:
+            logger.info("✅ %s guardado.", nombre)
+        else:
+            logger.info("✅ %s guardado (%d filas nuevas).", nombre, nuevas)
+        return time.perf_counter() - inicio, True
+
+    csv_df = safe_read_csv(csv_path)
+    merged = merge_fn(csv_df, new_df)
+    if not safe_save_csv(merged, csv_path):
+        logger.error("❌ %s no se guardó.", nombre)
+        return time.perf_counter() - inicio, False
+    logger.info("✅ %s guardado (%d filas).", nombre, len(merged))
+    return time.perf_counter() - inicio, True
+
+
+def extraer_secciones(secciones: list[tuple], fecha: str | None = None, workers: int = 1,
+                      cache_dir: Path | None = None) -> tuple[list[str], dict]:
+    """Extrae y guarda todas las secciones.
+
+    Con workers > 1 el parseo (lo caro: BeautifulSoup sobre páginas de
+    varios MB) va a un pool de procesos, una tarea por página; los
+    resultados se mergean y escriben en el proceso principal según van
+    llegando, así que las escrituras a SQLite nunca son concurrentes.
+
+    Con `cache_dir`, las secciones cuyo HTML no ha cambiado desde la última
+    vez que se guardaron no se parsean ni se mergean. Una sección cuya
+    escritura falla cuenta como saltada y no entra en la caché, así que la
+    siguiente ejecución la vuelve a mergear.
+
+    Devuelve (secciones saltadas, {sección: {"extraccion": s, "guardado": s,
+    "cache_hit": bool}}).
+    """
+    destino = {nombre: (csv_path, merge_fn) for nombre, _, _, csv_path, merge_fn in secciones}
+    paginas = _agrupar_por_html(secciones)
+    skipped, tiempos = [], {}
+    parseadas = 0
+
+    def _procesar(resultados: dict) -> None:
+        nonlocal parseadas
+        for nombre, res in resultados.items():
+            tiempos[nombre] = {"extraccion": res["segundos"], "guardado": 0.0, "cache_hit": res["cache_hit"]}
+            if res["df"] is None:
+                logger.warning("⏭️ Saltando %s: %s", nombre, res["motivo"])
+                skipped.append(nombre)
+                continue
+            if res["cache_hit"]:
+                logger.info("♻️ %s sin cambios desde la última ejecución (caché), no se re-mergea.", nombre)
+                continue
+            parseadas += 1
+            logger.info("✅ Nuevos datos de %s extraídos (%d filas).", nombre, len(res["df"]))
+            tiempos[nombre]["guardado"], guardado = _guardar_seccion(nombre, res["df"], *destino[nombre])
+            if not guardado:
+                skipped.append(nombre)
+            elif res["clave"]:
+                guardar_cache(nombre, res["clave"], res["df"], cache_dir)
+
+    if workers <= 1:
+        for html_path, extractores in paginas.items():
+            logger.info("Extrayendo %s...", ", ".join(extractores))
+            _procesar(extraer_pagina(html_path, extractores, fecha, cache_dir, SECCIONES_FECHADAS))
+    else:
+        workers = min(workers, len(paginas))
+        logger.info("⚡ Extrayendo %d páginas con %d procesos...", len(paginas), workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(extraer_pagina, html_path, extractores, fecha, cache_dir, SECCIONES_FECHADAS)
+                for html_path, extractores in paginas.items()
+            ]
+            for future in as_completed(futures):
+                _procesar(future.result())
+
+    # Mismo orden que el modo secuencial, independientemente de qué página
+    # terminara antes.
+    orden = [nombre for nombre, *_ in secciones]
+    skipped.sort(key=orden.index)
+
+    if cache_dir is not None:
+        aciertos = sum(t["cache_hit"] for t in tiempos.values())
+        logger.info("🗃️ Caché de extracción: %d acierto(s), %d fallo(s).", aciertos, parseadas)
+    return skipped, tiempos
+
+
+def _log_tiempos(tiempos: dict, orden: list[str], total: float) -> None:
+    logger.info("⏱️ Tiempos por sección (extracción / guardado):")
+    for nombre in orden:
+        if nombre in tiempos:
+            t = tiempos[nombre]
+            logger.info("   %-16s %7.2fs / %6.2fs%s", nombre, t["extraccion"], t["guardado"],
+                        "  (caché)" if t["cache_hit"] else "")
+    logger.info("   %-16s %7.2fs", "total", total)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scrapea Mister Fantasy y extrae cada sección a data/mister.db.")
+    parser.add_argument(
+        "--fecha",
+        help="Reextrae desde las capturas archivadas de ese día (YYYY-MM-DD, ver "
+             "src/utils/html_archive.py) en vez de scrapear. Las filas se guardan con esa fecha.",
     )
-    safe_save_csv(merged_csv_mercado, CSV_MERCADO)
-    logger.info("✅ Mercado actualizado (%d filas).", len(merged_csv_mercado))
-
-# ── 4. Jornadas ───────────────────────────────────────────────────────────────
-logger.info("Extrayendo jornadas...")
-if not validate_html(HTML_JORNADAS_AUX, "jornadas"):
-    logger.warning("⏭️ Saltando jornadas.")
-    skipped_sections.append("jornadas")
-else:
-    html_jornadas = safe_read_html(HTML_JORNADAS_AUX)
-    new_csv_jornadas = extraer_jornadas(html_jornadas)
-    logger.info("✅ Nuevas jornadas extraídas.")
-    csv_jornadas = safe_read_csv(CSV_JORNADA)
-    csv_jornadas = normalize_date_column(csv_jornadas, "date")
-    new_csv_jornadas = normalize_date_column(new_csv_jornadas, "date")
-    merged_csv_jornadas = (
-        pd.concat([csv_jornadas, new_csv_jornadas], ignore_index=True)
-        .drop_duplicates(subset=["date", "jornada"])
-        .reset_index(drop=True)
+    parser.add_argument(
+        "--workers", type=int,
+        help="Procesos que parsean secciones a la vez (por defecto config.yaml -> extraction.workers).",
     )
-    safe_save_csv(merged_csv_jornadas, CSV_JORNADA)
-    logger.info("✅ Jornadas actualizadas (%d filas).", len(merged_csv_jornadas))
-
-# ── 5. Subidas y bajadas ──────────────────────────────────────────────────────
-logger.info("Extrayendo subidas y bajadas...")
-if not validate_html(HTML_SUBIDASBAJADAS, "subidas_bajadas"):
-    logger.warning("⏭️ Saltando subidas/bajadas.")
-    skipped_sections.append("subidas_bajadas")
-else:
-    html_subidas_bajadas = safe_read_html(HTML_SUBIDASBAJADAS)
-    new_csv_subidas_bajadas = extraer_subidas_bajadas(html_subidas_bajadas)
-    logger.info("✅ Nuevas subidas/bajadas extraídas.")
-    csv_subidas_bajadas = safe_read_csv(CSV_SUBIDASBAJADAS)
-    csv_subidas_bajadas = normalize_date_column(csv_subidas_bajadas, "date")
-    new_csv_subidas_bajadas = normalize_date_column(new_csv_subidas_bajadas, "date")
-    merged_csv_subidas_bajadas = (
-        pd.concat([csv_subidas_bajadas, new_csv_subidas_bajadas], ignore_index=True)
-        .drop_duplicates()
-        .reset_index(drop=True)
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Parsea y mergea todas las secciones aunque su HTML no haya cambiado.",
     )
-    safe_save_csv(merged_csv_subidas_bajadas, CSV_SUBIDASBAJADAS)
-    logger.info("✅ Subidas/bajadas actualizadas (%d filas).", len(merged_csv_subidas_bajadas))
-
-# ── 6. Gameweek ───────────────────────────────────────────────────────────────
-logger.info("Extrayendo gameweek...")
-if not validate_html(HTML_GAMEWEEK, "gameweek"):
-    logger.warning("⏭️ Saltando gameweek.")
-    skipped_sections.append("gameweek")
-else:
-    new_html_gameweek = safe_read_html(HTML_GAMEWEEK)
-    new_gameweek = extraer_gameweek(new_html_gameweek)
-    logger.info("✅ Nuevas gameweeks extraídas.")
-    csv_gameweek = safe_read_csv(CSV_GAMEWEEK)
-    new_csv_gameweek = merge_gameweek(csv_gameweek, new_gameweek)
-    safe_save_csv(new_csv_gameweek, CSV_GAMEWEEK)
-    logger.info("✅ Gameweek guardado.")
-
-# ── 7. Quiniela ───────────────────────────────────────────────────────────────
-# FIX: usaba new_html_clas en lugar de new_html_quin para la validación.
-logger.info("Extrayendo quiniela...")
-if not validate_html(HTML_QUINIELA, "quiniela"):
-    logger.warning("⏭️ Saltando quinielas.")
-    skipped_sections.append("quiniela")
-else:
-    new_html_quin = safe_read_html(HTML_QUINIELA)
-    new_quinielas = extraer_quinielas(new_html_quin)
-    logger.info("✅ Nuevas quinielas extraídas.")
-    csv_quinielas = safe_read_csv(CSV_QUINIELA)
-    new_csv_quinielas = merge_quinielas(csv_quinielas, new_quinielas)
-    safe_save_csv(new_csv_quinielas, CSV_QUINIELA)
-    logger.info("✅ Quinielas guardadas.")
-
-if skipped_sections:
-    logger.error(
-        "🛑 Proceso de extracción completado con %d sección(es) saltada(s): %s",
-        len(skipped_sections), ", ".join(skipped_sections),
+    args = parser.parse_args()
+
+    cfg = load_config(validate_env=False)
+
+    # ── Logging ──────────────────────────────────────────────────────────────
+    log_level = getattr(logging, cfg.get("logging", {}).get("level", "INFO").upper(), logging.INFO)
+    log_file = cfg.get("logging", {}).get("file", "logs/app.log")
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+
+    logging.basicConfig(
+        level=log_level,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.FileHandler(log_file, encoding="utf-8"),
+            logging.StreamHandler(sys.stdout),
+        ],
     )
-    sys.exit(1)
 
-logger.info("🏁 Proceso de extracción completado sin errores.")
+    # ── Directorios ──────────────────────────────────────────────────────────
+    os.makedirs(cfg["data"]["raw_dir"], exist_ok=True)
+    os.makedirs(cfg["data"]["processed_dir"], exist_ok=True)
+
+    # ── 0. Scraping ──────────────────────────────────────────────────────────
+    # login() lanza excepción si falla críticamente, deteniendo el pipeline.
+    if args.fecha:
+        logger.info("🗃️ Usando las capturas archivadas del %s (sin scraping).", args.fecha)
+    else:
+        logger.info("Iniciando proceso de scraping con Playwright...")
+        try:
+            saved_paths = login()
+            logger.info("✅ Scraping completado. Archivos guardados: %s", list(saved_paths.keys()))
+        except Exception as e:
+            logger.error("❌ El scraping falló: %s", e)
+            sys.exit(1)
+
+    # ── 1-7. Extracción ──────────────────────────────────────────────────────
+    workers = args.workers or cfg.get("extraction", {}).get("workers", 1)
+    secciones = build_secciones(cfg)
+    inicio = time.perf_counter()
+    usar_cache = cfg.get("extraction", {}).get("cache", True) and not args.no_cache
+    skipped_sections, tiempos = extraer_secciones(
+        secciones, args.fecha, workers, get_cache_dir() if usar_cache else None
+    )
+    _log_tiempos(tiempos, [nombre for nombre, *_ in secciones], time.perf_counter() - inicio)
+    logger.debug("config.yaml parseado %d vez/veces en esta ejecución.", get_parse_count())
+    db_utils.log_read_cache_stats()
+
+    # Secciones saltadas por HTML no disponible/incompleto o cuya escritura
+    # falló. Si queda alguna, el script termina con código != 0 para que CI
+    # marque el job como fallido y dispare el aviso — antes el script
+    # siempre terminaba con éxito aunque se hubieran saltado secciones
+    # enteras.
+    if skipped_sections:
+        logger.error(
+            "🛑 Proceso de extracción completado con %d sección(es) saltada(s): %s",
+            len(skipped_sections), ", ".join(skipped_sections),
+        )
+        sys.exit(1)
+
+    logger.info("🏁 Proceso de extracción completado sin errores.")
+
+
+if __name__ == "__main__":
+    main()
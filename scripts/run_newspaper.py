@@ -12,7 +12,9 @@ from src.utils.bootstrap import setup_project_root
 ROOT_DIR = setup_project_root(__file__)
 
 
-from src.AI_newspaper.generate_json import generate_json
+from src.AI_newspaper.generate_json import (
+    COLUMNAS_CLASIFICACION, COLUMNAS_GAMEWEEK, COLUMNAS_TRANSFERS, generate_json,
+)
 from src.AI_newspaper.generate_prompt import generate_prompts,build_final_prompt
 from src.AI_newspaper.generate_pdf import create_pdf
 from src.agents.orchestrator_agent import run_orchestrator
@@ -87,10 +89,12 @@ MISTER_BASE_URL = cfg["env"]["MISTER_BASE_URL"]
 fecha_hoy = datetime.today().strftime("%Y-%m-%d")
 # --- 1. Create JSONs ---
 logger.info("Creando Jsons...")
-csv_gameweek = safe_read_csv(CSV_GAMEWEEK)
-csv_notificaciones = safe_read_csv(CSV_NOTIFICACIONES_CLEAN)
-csv_clasificacion = safe_read_csv(CSV_CLASIFICACIONES)
-csv_quinielas = safe_read_csv(CSV_QUINIELAS)
+# Solo las columnas que usa generate_json, y de notificaciones solo los
+# transfers (filtro resuelto en SQLite).
+csv_gameweek = safe_read_csv(CSV_GAMEWEEK, columns=COLUMNAS_GAMEWEEK)
+csv_notificaciones = safe_read_csv(CSV_NOTIFICACIONES_CLEAN, columns=COLUMNAS_TRANSFERS, where={"type": "transfer"})
+csv_clasificacion = safe_read_csv(CSV_CLASIFICACIONES, columns=COLUMNAS_CLASIFICACION)
+csv_quinielas = safe_read_csv(CSV_QUINIELAS, columns=COLUMNAS_CLASIFICACION)
 
 if csv_gameweek.empty or csv_notificaciones.empty:
     logger.error("Sin datos de gameweek o notificaciones disponibles. Abortando.")
@@ -102,7 +106,7 @@ if csv_clasificacion.empty or csv_quinielas.empty:
 
 daily_json = generate_json(
     3,
-    csv_notificaciones[csv_notificaciones["type"] == "transfer"],
+    csv_notificaciones,
     csv_gameweek,
     csv_clasificacion,
     csv_quinielas,
@@ -222,6 +226,7 @@ portada_fichajes_path = os.path.join(IMG_NEWS, f"{fecha_hoy}_fichajes_news.png")
 portada_jornada_path = os.path.join(IMG_NEWS, f"{fecha_hoy}_jornada_news.png")
 card_save = safe_save_png(portada_fichajes,portada_fichajes_path)
 card_save = safe_save_png(portada_jornada,portada_jornada_path)
+db_utils.log_read_cache_stats()
 logger.info("🏁 Proceso de extracción completado sin errores.")
 
 
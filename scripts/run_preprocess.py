@@ -1,3 +1,4 @@
+import argparse
 import logging
 import os
 import sys
@@ -10,35 +11,19 @@ from src.utils.bootstrap import setup_project_root
 
 ROOT_DIR = setup_project_root(__file__)
 
-from src.preprocessing.process_ganancias import procesar_ganancias
-from src.preprocessing.process_ganancias_jugador import procesar_ganancias_jugador
-from src.preprocessing.process_clausulas_acuerdos import procesar_clausulas_acuerdos
+from src.preprocessing.process_notificaciones import procesar_notificaciones
+from src.preprocessing.incremental import guardar_marca, preprocesar_incremental, tablas_preprocesado
 
 # --- Cargar configuración ---
 from src.utils.config_loader import load_config
+from src.utils import db as db_utils
 from src.utils.file_utils import safe_read_csv, safe_save_csv
 
 
 cfg = load_config(validate_env=False)
 
-# --- Configurar logging ---
-log_level = getattr(logging, cfg.get("logging", {}).get("level", "INFO").upper(), logging.INFO)
-log_file = cfg.get("logging", {}).get("file", "logs/app.log")
-os.makedirs(os.path.dirname(log_file), exist_ok=True)
-
-logging.basicConfig(
-    level=log_level,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_file, encoding="utf-8"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger(__name__)
 
-# --- Asegurar directorios base ---
-os.makedirs(cfg["data"]["processed_dir"], exist_ok=True)
-
 # Directorios base
 DATA_PROCESSED = cfg["data"]["processed_dir"]
 
@@ -53,34 +38,79 @@ CSV_SUBIDASBAJADAS = cfg["paths"]["csv"]["subidas_bajadas"]
 CSV_NOTIFICACIONES_CLEAN = cfg["paths"]["csv"]["notificaciones_clean"]
 CSV_NOTIFICACIONES_JUGADOR = cfg["paths"]["csv"]["notificaciones_jugador"]
 CSV_NOTIFICACIONES_CLAUSULA_ACUERDO = cfg["paths"]["csv"]["clausulas_acuerdos"]
-# --- 1. CLEAN ---
-logger.info("Limpiando y estandarizando ganancias...")
-csv_notificaciones = safe_read_csv(CSV_NOTIFICACIONES)
-if csv_notificaciones.empty:
-    logger.warning("⏭️ Saltando limpieza de ganancias (sin datos disponibles).")
-else:
-    csv_notificaciones_clean = procesar_ganancias(csv_notificaciones)
-    safe_save_csv(csv_notificaciones_clean, CSV_NOTIFICACIONES_CLEAN)
-    logger.info("✅ Ganancias limpias guardadas en %s (%d filas).", CSV_NOTIFICACIONES_CLEAN, len(csv_notificaciones_clean))
-
-# --- 2. JUGADOR ---
-logger.info("Calculando ganancias netas por jugador (Diff compra/venta)...")
-csv_notificaciones_clean = safe_read_csv(CSV_NOTIFICACIONES_CLEAN)
-if csv_notificaciones_clean.empty:
-    logger.warning("⏭️ Saltando cálculo por jugador (sin datos de ganancias limpias disponibles).")
-else:
-    csv_jugador = procesar_ganancias_jugador(csv_notificaciones_clean)
-    safe_save_csv(csv_jugador, CSV_NOTIFICACIONES_JUGADOR)
-    logger.info("✅ Ganancias por jugador guardadas en %s (%d filas).", CSV_NOTIFICACIONES_JUGADOR, len(csv_jugador))
-
-# --- 3. CLAUSULAS ---
-logger.info("Extrayendo cláusulas y acuerdos...")
-csv_notificaciones = safe_read_csv(CSV_NOTIFICACIONES)
-if csv_notificaciones.empty:
-    logger.warning("⏭️ Saltando extracción de cláusulas (sin datos disponibles).")
-else:
-    csv_clausulas = procesar_clausulas_acuerdos(csv_notificaciones)
-    safe_save_csv(csv_clausulas, CSV_NOTIFICACIONES_CLAUSULA_ACUERDO)
-    logger.info("✅ Cláusulas y acuerdos guardados en %s (%d filas).", CSV_NOTIFICACIONES_CLAUSULA_ACUERDO, len(csv_clausulas))
 
 
+def preprocesar_completo(tablas: dict | None = None, temporada: str | None = None):
+    """Rehace las tres tablas desde el feed entero de la temporada. Devuelve
+    el feed leído.
+
+    El feed se lee una vez y las tres tablas salen de él en memoria
+    (procesar_notificaciones). Con las tablas en la BD (`tablas`, ver
+    tablas_preprocesado) se guardan en una sola transacción: o las tres o
+    ninguna. Con CSVs en disco, una a una.
+    """
+    logger.info("Preprocesando notificaciones (ganancias limpias, ganancias por jugador, cláusulas y acuerdos)...")
+    csv_notificaciones = safe_read_csv(CSV_NOTIFICACIONES)
+    if csv_notificaciones.empty:
+        logger.warning("⏭️ Saltando preprocesado (sin notificaciones disponibles).")
+        return csv_notificaciones
+
+    salidas = procesar_notificaciones(csv_notificaciones)
+    if tablas is not None:
+        if not db_utils.write_tables({tablas[clave]: df for clave, df in salidas.items()}, temporada):
+            return csv_notificaciones
+    else:
+        for clave, path in (("clean", CSV_NOTIFICACIONES_CLEAN), ("jugador", CSV_NOTIFICACIONES_JUGADOR),
+                            ("clausulas", CSV_NOTIFICACIONES_CLAUSULA_ACUERDO)):
+            safe_save_csv(salidas[clave], path)
+    logger.info(
+        "✅ Preprocesado guardado: %d ganancias limpias, %d ganancias por jugador, %d cláusulas/acuerdos.",
+        len(salidas["clean"]), len(salidas["jugador"]), len(salidas["clausulas"]),
+    )
+    return csv_notificaciones
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Genera ganancias_clean, ganancias_jugador y clausulas_acuerdos a partir de las notificaciones."
+    )
+    parser.add_argument(
+        "--full", action="store_true",
+        help="Rehace las tres tablas desde el feed entero de la temporada en vez de procesar solo las "
+             "notificaciones nuevas desde la última ejecución (ver src/preprocessing/incremental.py).",
+    )
+    args = parser.parse_args()
+
+    # --- Configurar logging ---
+    log_level = getattr(logging, cfg.get("logging", {}).get("level", "INFO").upper(), logging.INFO)
+    log_file = cfg.get("logging", {}).get("file", "logs/app.log")
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+
+    logging.basicConfig(
+        level=log_level,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.FileHandler(log_file, encoding="utf-8"),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+    # --- Asegurar directorios base ---
+    os.makedirs(cfg["data"]["processed_dir"], exist_ok=True)
+
+    # Con las tablas en data/mister.db, por defecto solo se procesan las
+    # notificaciones nuevas; si no se puede (primera ejecución, el feed se
+    # reescribió...), o con --full, o con CSVs en disco, se rehace todo.
+    tablas = tablas_preprocesado(cfg)
+    temporada = db_utils.get_active_season()
+    if tablas is None or args.full or not preprocesar_incremental(tablas, temporada):
+        version = db_utils.current_version()
+        feed = preprocesar_completo(tablas, temporada)
+        if tablas is not None:
+            guardar_marca(tablas, temporada, feed, desde_version=version)
+
+    db_utils.log_read_cache_stats()
+
+
+if __name__ == "__main__":
+    main()
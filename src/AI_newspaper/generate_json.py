@@ -3,6 +3,17 @@ from datetime import datetime, timedelta
 
 from src.utils.team_map import map_team, map_position
 
+# Columnas que leen generate_json / generate_json_for_jornada de cada
+# entrada: quien carga los datos (run_newspaper.py) pide solo estas.
+COLUMNAS_TRANSFERS = ["fecha", "subtype", "equipo", "ganancias", "jugador", "compra-venta", "equipoLiga"]
+COLUMNAS_GAMEWEEK = [
+    "Date", "Jornada", "EquipoLocal", "ResultadoLocal", "EquipoVisitante", "ResultadoVisitante",
+    "EquipoJugador", "Manager", "NombreJugador", "Posicion", "Puntos", "Suplente", "Cambio",
+    "Goles", "Asistencias", "GolPropia", "PenaltiMarcado", "PenaltiFallado", "PenaltiParado",
+    "Amarilla", "Roja",
+]
+COLUMNAS_CLASIFICACION = ["jornada", "nombre", "puntos"]
+
 
 def clasificacion_dict(df: pd.DataFrame) -> dict:
     """
@@ -1,4 +1,4 @@
-from bs4 import BeautifulSoup
+from src.utils.html_parsing import parse_html
 from src.utils.text_cleaning import  limpiar_entero, limpiar_dinero
 import re
 import pandas as pd
@@ -15,7 +15,7 @@ def extraer_clasificaciones(html: str) -> pd.DataFrame:
     Devuelve un DataFrame con: jornada, nombre, posición, puntos, valor_equipo.
     """
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = parse_html(html)
         clasificaciones = []
 
         paneles = soup.select("div.panel.panel-gameweek")
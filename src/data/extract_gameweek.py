@@ -1,22 +1,71 @@
-from bs4 import BeautifulSoup
+from src.utils.html_parsing import parse_html
 import re
 import pandas as pd
 import logging
 from datetime import date
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Eventos de cada jugador: (columna, subcadena del <use href>, solo presencia).
+# Las de "solo presencia" valen 0/1 aunque el evento aparezca varias veces.
+EVENTOS = (
+    ("Suplente", "events-sub_in", True),
+    ("Cambio", "events-sub_out", True),
+    ("Goles", "events-goal", False),
+    ("Asistencias", "events-assist", False),
+    ("GolPropia", "events-own_goal", False),
+    ("PenaltiMarcado", "events-penalty", False),
+    ("PenaltiFallado", "events-missed_penalty", False),
+    ("PenaltiParado", "events-saved_penalty", False),
+    ("Amarilla", "events-yellow", False),
+    ("Roja", "events-red", True),
+)
+
+COLUMNAS = [
+    "Date", "Jornada", "EquipoLocal", "ResultadoLocal", "EquipoVisitante",
+    "ResultadoVisitante", "EquipoJugador", "Manager", "NombreJugador",
+    "Posicion", "Puntos", "Suplente", "Cambio", "Goles", "Asistencias",
+    "GolPropia", "PenaltiMarcado", "PenaltiFallado", "PenaltiParado",
+    "Amarilla", "Roja",
+]
+
+
+@lru_cache(maxsize=None)
+def codigos_evento(href: str) -> tuple[int, ...]:
+    """Índices de EVENTOS a los que cuenta `href`.
+
+    Se mantiene la comparación por subcadena de siempre (un mismo href
+    puede contar para varias columnas), pero se evalúa una sola vez por
+    href distinto — hay muy pocos y se repiten en todos los jugadores de
+    toda la temporada — en lugar de nueve barridos por jugador.
+    """
+    return tuple(i for i, (_, patron, _) in enumerate(EVENTOS) if patron in href)
+
+
+def contar_eventos(event_hrefs) -> list[int]:
+    """Valor de cada columna de EVENTOS para un jugador, en una pasada."""
+    cuenta = [0] * len(EVENTOS)
+    for href in event_hrefs:
+        for i in codigos_evento(href):
+            cuenta[i] += 1
+    return [min(n, 1) if presencia else n for n, (_, _, presencia) in zip(cuenta, EVENTOS)]
+
 
-def extraer_gameweek(html: str) -> pd.DataFrame:
+def extraer_gameweek(html: str, fecha: str | None = None) -> pd.DataFrame:
     """
-    Extrae la información de una gameweek y la devuelve como DataFrame
+    Extrae la información de una gameweek y la devuelve como DataFrame.
+    `fecha` (YYYY-MM-DD) es la columna Date de todas las filas (por
+    defecto, hoy).
     """
 
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = parse_html(html)
 
-        filas = []
-        hoy = date.today().isoformat()
+        # Columna a columna: una lista por columna en vez de un dict de 21
+        # claves por jugador.
+        columnas = {col: [] for col in COLUMNAS}
+        fecha = fecha or date.today().isoformat()
 
         # Función auxiliar para extraer ID de equipo
         def extraer_team_id(href: str):
@@ -31,9 +80,6 @@ def extraer_gameweek(html: str) -> pd.DataFrame:
             if summary_title and summary_title.text.strip().startswith("Empieza en"):
                 continue
 
-            # 2.1 Date
-            fecha = hoy
-
             # 2.2 Jornada (buscar SOLO fuera de matches-summary)
             jornada = None
             for title in gw.select(':scope > .section-title h3'):
@@ -102,42 +148,17 @@ def extraer_gameweek(html: str) -> pd.DataFrame:
                             puntos = int(puntos_tag.text.strip()) if puntos_tag else 0
 
                             # 6.4 Eventos
-                            eventos = jugador.select('.events use')
-                            event_hrefs = [e.get('href', '') for e in eventos]
-
-                            def contar_evento(nombre):
-                                return sum(nombre in h for h in event_hrefs)
-
-                            cambio = int(any("events-sub_out" in h for h in event_hrefs))
-                            suplente = int(any("events-sub_in" in h for h in event_hrefs))
-
-                            fila = {
-                                "Date": fecha,
-                                "Jornada": int(jornada),
-                                "EquipoLocal": equipo_local,
-                                "ResultadoLocal": resultado_local,
-                                "EquipoVisitante": equipo_visitante,
-                                "ResultadoVisitante": resultado_visitante,
-                                "EquipoJugador": equipo_jugador,
-                                "Manager": manager,
-                                "NombreJugador": nombre,
-                                "Posicion": posicion,
-                                "Puntos": puntos,
-                                "Suplente": suplente,
-                                "Cambio": cambio,
-                                "Goles": contar_evento("events-goal"),
-                                "Asistencias": contar_evento("events-assist"),
-                                "GolPropia": contar_evento("events-own_goal"),
-                                "PenaltiMarcado": contar_evento("events-penalty"),
-                                "PenaltiFallado": contar_evento("events-missed_penalty"),
-                                "PenaltiParado": contar_evento("events-saved_penalty"),
-                                "Amarilla": contar_evento("events-yellow"),
-                                "Roja": int(any("events-red" in h for h in event_hrefs)),
-                            }
-
-                            filas.append(fila)
-
-        df = pd.DataFrame(filas)
+                            eventos = contar_eventos(e.get('href', '') for e in jugador.select('.events use'))
+
+                            fila = (
+                                fecha, int(jornada), equipo_local, resultado_local,
+                                equipo_visitante, resultado_visitante, equipo_jugador,
+                                manager, nombre, posicion, puntos, *eventos,
+                            )
+                            for col, valor in zip(COLUMNAS, fila):
+                                columnas[col].append(valor)
+
+        df = pd.DataFrame(columnas) if columnas["Date"] else pd.DataFrame()
 
         # Normalización final de columnas numéricas
         int_cols = [
@@ -1,21 +1,21 @@
-from bs4 import BeautifulSoup
+from src.utils.html_parsing import parse_html
 import re
 import pandas as pd
 import logging
 
 logger = logging.getLogger(__name__)
 
-def extraer_jornadas(html: str) -> pd.DataFrame:
+def extraer_jornadas(html: str, fecha: str | None = None) -> pd.DataFrame:
     """
     Extrae el listado de jornadas futuras o pasadas del HTML.
 
     Retorna un DataFrame con columnas:
-      - date: fecha de extracción
+      - date: fecha de extracción (`fecha`, YYYY-MM-DD, o hoy)
       - jornada: número de jornada
       - detalles: texto del estado (ej. 'Finalizada', 'En juego', etc.)
     """
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = parse_html(html)
         resultados = []
 
         # Contenedor de jornadas
@@ -39,8 +39,8 @@ def extraer_jornadas(html: str) -> pd.DataFrame:
             detalles = status_div.get_text(strip=True) if status_div else ""
             detalles = re.sub(r"\s+", " ", detalles)
 
-            # Fecha actual (normalizada)
-            today = pd.Timestamp.today().normalize()
+            # Fecha de extracción (normalizada)
+            today = pd.Timestamp(fecha) if fecha else pd.Timestamp.today().normalize()
 
             if jornada is not None:
                 resultados.append({
@@ -1,13 +1,15 @@
-from bs4 import BeautifulSoup
+from src.utils.html_parsing import parse_html
 import re
 import pandas as pd
 import logging
 
 logger = logging.getLogger(__name__)
 
-def extraer_mercado(html: str) -> pd.DataFrame:
+def extraer_mercado(html: str, fecha: str | None = None) -> pd.DataFrame:
     """
     Extrae el listado del mercado de jugadores en venta desde el HTML.
+    `fecha` (YYYY-MM-DD): día con el que se sellan las filas (por defecto,
+    hoy; run_extraction.py --fecha pasa el de la captura archivada).
 
     Devuelve un DataFrame con columnas:
       - date, manager, periodo, jugador, precio,
@@ -15,7 +17,7 @@ def extraer_mercado(html: str) -> pd.DataFrame:
         avgPoints, estado
     """
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = parse_html(html)
 
         wrapper = soup.find("div", class_="wrapper wrapper--spaced")
         if not wrapper:
@@ -28,7 +30,7 @@ def extraer_mercado(html: str) -> pd.DataFrame:
             return pd.DataFrame()
 
         mercado = []
-        today = pd.Timestamp.today().normalize()
+        today = pd.Timestamp(fecha) if fecha else pd.Timestamp.today().normalize()
 
         for item in lista_jugadores.find_all("li", recursive=False):
             try:
@@ -1,5 +1,5 @@
 # src/data/extract_notificaciones.py
-from bs4 import BeautifulSoup
+from src.utils.html_parsing import parse_html
 import re
 import pandas as pd
 import hashlib
@@ -23,12 +23,13 @@ def _text_of(tag):
     return tag.get_text(strip=True) if tag else ""
 
 
-def extraer_notificaciones(html: str) -> pd.DataFrame:
+def extraer_notificaciones(html: str, fecha: str | None = None) -> pd.DataFrame:
     """
     Extrae notificaciones desde el HTML proporcionado y devuelve un DataFrame.
     Tipos soportados: transfer, bonificacion (clasificacion/quiniela), marks (start_jornada/start_mercado).
+    La columna date es `fecha` (YYYY-MM-DD) o, por defecto, hoy.
     """
-    soup = BeautifulSoup(html or "", "html.parser")
+    soup = parse_html(html)
     notificaciones: List[Dict] = []
 
     feed = soup.find("div", class_="feed-cards")
@@ -211,7 +212,7 @@ def extraer_notificaciones(html: str) -> pd.DataFrame:
 
     # --- construir el DataFrame final ---
     df = pd.DataFrame(notificaciones)
-    today = pd.Timestamp.today().date()
+    today = pd.Timestamp(fecha).date() if fecha else pd.Timestamp.today().date()
     if not df.empty:
         df["date"] = today
     else:
@@ -6,7 +6,7 @@ Devuelve un DataFrame con: id, nombre, posicion, club, foto_url
 
 import re
 import pandas as pd
-from bs4 import BeautifulSoup
+from src.utils.html_parsing import parse_html
 
 POSICION_MAP = {
     "1": "Portero",
@@ -26,7 +26,7 @@ def extraer_jugadores(html: str) -> pd.DataFrame:
     Returns:
         DataFrame con columnas: id, nombre, posicion, club_id, foto_url
     """
-    soup = BeautifulSoup(html, "html.parser")
+    soup = parse_html(html)
     registros = []
 
     for li in soup.select("ul.player-list li"):
@@ -1,4 +1,4 @@
-from bs4 import BeautifulSoup
+from src.utils.html_parsing import parse_html
 import pandas as pd
 import re
 import logging
@@ -18,7 +18,7 @@ def extraer_quinielas(html: str) -> pd.DataFrame:
     jornada, nombre, posicion, puntos
     """
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = parse_html(html)
 
         # -------------------------------------------------
         # 1️⃣ Extraer jornada
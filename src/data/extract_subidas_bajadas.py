@@ -1,18 +1,19 @@
-from bs4 import BeautifulSoup
+from src.utils.html_parsing import parse_html
 import pandas as pd
 import logging
 
 logger = logging.getLogger(__name__)
 
-def extraer_subidas_bajadas(html: str) -> pd.DataFrame:
+def extraer_subidas_bajadas(html: str, fecha: str | None = None) -> pd.DataFrame:
     """
     Parsea una tabla HTML con clase 'thin-scrollbar' y extrae:
       - Nombre del jugador
       - Variación de valor
-    Devuelve un DataFrame con columnas ['date', 'nombre', 'variacion'].
+    Devuelve un DataFrame con columnas ['date', 'nombre', 'variacion'];
+    'date' es `fecha` (YYYY-MM-DD) o, por defecto, hoy.
     """
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = parse_html(html)
         tables = soup.find_all("table", class_="thin-scrollbar")
 
         if not tables:
@@ -20,7 +21,7 @@ def extraer_subidas_bajadas(html: str) -> pd.DataFrame:
             return pd.DataFrame(columns=["date", "nombre", "variacion"])
 
         jugadores = []
-        today = pd.Timestamp.today().normalize()
+        today = pd.Timestamp(fecha) if fecha else pd.Timestamp.today().normalize()
 
         for table in tables:
             for tr in table.find_all("tr"):
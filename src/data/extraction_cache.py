@@ -0,0 +1,83 @@
+"""
+extraction_cache.py — Caché de resultados de extracción por contenido del HTML.
+
+Entre jornadas, clasificacion.html o quiniela.html no cambian, y aun así
+run_extraction.py los volvía a parsear y a mergear cada día. Tras guardar
+una sección se apunta aquí el DataFrame extraído bajo una clave que depende
+de:
+
+  - el hash del contenido del HTML (el mismo que usa html_archive.py),
+  - la versión del extractor (hash del código de su módulo: cualquier cambio
+    en el extractor invalida la caché sin tener que acordarse de subir un
+    número),
+  - el backend de parseo (config.yaml -> parsing.backend),
+  - el día, solo para las secciones que sellan cada fila con la fecha de
+    extracción (mercado, notificaciones...): para ellas el mismo HTML otro
+    día produce filas distintas.
+
+Por sección solo se guarda la última entrada, así que un acierto significa
+"la página no ha cambiado desde la última vez que se guardó": el merge ya
+está hecho y se salta entero.
+
+    data/cache/extraction/<sección>/<clave>.pkl
+"""
+
+import hashlib
+import inspect
+import logging
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from src.utils.config_loader import get_base_dir, load_config
+from src.utils.html_parsing import get_parser_backend
+
+logger = logging.getLogger(__name__)
+
+
+def get_cache_dir() -> Path:
+    """Directorio de la caché (config.yaml -> extraction.cache_dir)."""
+    cfg = load_config(validate_env=False)
+    return get_base_dir() / cfg.get("extraction", {}).get("cache_dir", "data/cache/extraction")
+
+
+@lru_cache(maxsize=None)
+def version_extractor(extractor) -> str:
+    """Hash corto del código del módulo que define `extractor`."""
+    modulo = sys.modules[extractor.__module__]
+    return hashlib.sha256(inspect.getsource(modulo).encode("utf-8")).hexdigest()[:12]
+
+
+def clave_cache(html_hash: str, extractor, dia: str | None = None) -> str:
+    """Clave de la caché para un HTML y un extractor (y el día, si la
+    sección sella las filas con la fecha de extracción)."""
+    partes = [html_hash, version_extractor(extractor), get_parser_backend(), dia or ""]
+    return hashlib.sha256("|".join(partes).encode("utf-8")).hexdigest()
+
+
+def leer_cache(seccion: str, clave: str, cache_dir: Path | None = None) -> pd.DataFrame | None:
+    """DataFrame guardado para (`seccion`, `clave`), o None si no hay."""
+    path = (cache_dir or get_cache_dir()) / seccion / f"{clave}.pkl"
+    if not path.exists():
+        return None
+    try:
+        return pd.read_pickle(path)
+    except Exception as e:
+        logger.warning(f"Entrada de caché ilegible {path}, se ignora: {e}")
+        return None
+
+
+def guardar_cache(seccion: str, clave: str, df: pd.DataFrame, cache_dir: Path | None = None) -> None:
+    """Guarda `df` como la última entrada de `seccion` (borra las anteriores)."""
+    directorio = (cache_dir or get_cache_dir()) / seccion
+    try:
+        directorio.mkdir(parents=True, exist_ok=True)
+        for viejo in directorio.glob("*.pkl"):
+            viejo.unlink()
+        tmp = directorio / f"{clave}.tmp"
+        df.to_pickle(tmp)
+        tmp.replace(directorio / f"{clave}.pkl")
+    except Exception as e:
+        logger.error(f"Error al guardar la caché de {seccion}: {e}")
@@ -0,0 +1,101 @@
+"""
+extraction_context.py — Documento HTML compartido entre extractores.
+
+Antes run_extraction.py leía cada HTML de data/raw dos veces (una para
+validarlo y otra para extraer) y cada extractor construía su propio árbol.
+ExtractionContext lee y parsea cada archivo una única vez por ejecución y
+entrega el mismo árbol a todos los extractores que lo necesiten (parse_html
+acepta un árbol ya parseado y lo devuelve tal cual).
+
+Los extractores no modifican el árbol; extract_players.py sí (decompose de
+los SVG del nombre), así que no debe compartir documento con otros.
+"""
+
+import logging
+import time
+from datetime import date
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from src.data import extraction_cache
+from src.utils.file_utils import safe_read_html
+from src.utils.html_archive import content_hash
+from src.utils.html_parsing import parse_html
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionContext:
+    """Cache de HTML crudo y parseado por ruta, para una ejecución."""
+
+    def __init__(self, fecha: str | None = None):
+        # fecha != None -> lee las capturas archivadas de ese día (html_archive.py)
+        self.fecha = fecha
+        self._html: dict[str, str | None] = {}
+        self._soup: dict[str, BeautifulSoup] = {}
+        self.parse_count = 0
+
+    def html(self, path: str) -> str | None:
+        """Texto del HTML de `path` (None si no existe), leído una sola vez."""
+        if path not in self._html:
+            self._html[path] = safe_read_html(path, self.fecha)
+        return self._html[path]
+
+    def soup(self, path: str) -> BeautifulSoup:
+        """Árbol parseado de `path`, parseado una sola vez."""
+        if path not in self._soup:
+            self._soup[path] = parse_html(self.html(path))
+            self.parse_count += 1
+        return self._soup[path]
+
+
+# Por debajo de esto el HTML se considera vacío o una captura a medias
+# (la página de login, un error del servidor...).
+MIN_HTML_CHARS = 200
+
+
+def extraer_pagina(path: str, extractores: dict, fecha: str | None = None,
+                   cache_dir: Path | None = None, fechadas=frozenset()) -> dict[str, dict]:
+    """Lee y parsea `path` una sola vez y ejecuta sobre él cada extractor de
+    `extractores` ({sección: función}).
+
+    Es la unidad de trabajo de run_extraction.py: en modo paralelo se
+    ejecuta en un proceso del pool, así que solo recibe y devuelve objetos
+    serializables (funciones de módulo, rutas y DataFrames, nunca el árbol).
+
+    `fechadas` son las secciones cuya salida depende del día: sus
+    extractores reciben `fecha` (el día archivado, o None para hoy) para
+    sellar las filas, y su clave en la caché incluye ese día. Con
+    `cache_dir`, antes de parsear se busca el resultado en la caché de
+    extracción (extraction_cache.py); si todas las secciones de la página
+    aciertan, la página ni se parsea.
+
+    Devuelve {sección: {"df": DataFrame | None, "motivo": str | None,
+    "segundos": float, "clave": str | None, "cache_hit": bool}}; df es None
+    (con el motivo) si el HTML no está disponible o está incompleto. El
+    parseo cuenta en el tiempo de la primera sección que lo necesita.
+    """
+    ctx = ExtractionContext(fecha)
+    resultados = {}
+    for nombre, extractor in extractores.items():
+        inicio = time.perf_counter()
+        html = ctx.html(path)
+        df, motivo, clave, cache_hit = None, None, None, False
+        if html is None:
+            motivo = f"HTML no disponible ({path})"
+        elif len(html.strip()) < MIN_HTML_CHARS:
+            motivo = f"HTML vacío o incompleto ({len(html.strip())} chars)"
+        else:
+            if cache_dir is not None:
+                dia = (fecha or date.today().isoformat()) if nombre in fechadas else None
+                clave = extraction_cache.clave_cache(content_hash(html), extractor, dia)
+                df = extraction_cache.leer_cache(nombre, clave, cache_dir)
+                cache_hit = df is not None
+            if df is None:
+                df = extractor(ctx.soup(path), fecha=fecha) if nombre in fechadas else extractor(ctx.soup(path))
+        resultados[nombre] = {
+            "df": df, "motivo": motivo, "segundos": time.perf_counter() - inicio,
+            "clave": clave, "cache_hit": cache_hit,
+        }
+    return resultados
@@ -1,8 +1,15 @@
 import pandas as pd
 import logging
+from pathlib import Path
+
+from src.utils import db as db_utils
+from src.utils.file_utils import safe_read_csv, safe_save_csv
 
 logger = logging.getLogger(__name__)
 
+# Una fila por manager y jornada (src/utils/db.py -> TABLE_KEYS)
+CLASIFICACION_KEYS = db_utils.TABLE_KEYS["clasificaciones"]
+
 def merge_clasifications(df_viejo: pd.DataFrame, df_nuevo: pd.DataFrame) -> pd.DataFrame:
     """
     Fusiona clasificaciones antiguas y nuevas eliminando jornadas duplicadas.
@@ -39,3 +46,34 @@ def merge_clasifications(df_viejo: pd.DataFrame, df_nuevo: pd.DataFrame) -> pd.D
     except Exception as e:
         logger.exception(f"Error durante el merge de clasificaciones: {e}")
         return df_viejo.copy()
+
+
+def upsert_clasificaciones(df_nuevo: pd.DataFrame, path: str) -> int:
+    """
+    Versión en SQL de merge_clasifications para la tabla de la BD: clave
+    UNIQUE (jornada, nombre) e INSERT ... ON CONFLICT DO UPDATE, y las filas
+    guardadas de esas jornadas que no vienen en df_nuevo se borran — misma
+    semántica que "la jornada nueva reemplaza a la vieja", pero tocando solo
+    las filas de las jornadas extraídas.
+
+    Si `path` no corresponde a una tabla de la BD se usa merge_clasifications
+    sobre el CSV. Devuelve el nº de filas cambiadas; si la escritura falla o
+    se rechaza lanza db.WriteError.
+    """
+    table = Path(path).stem
+    if table not in db_utils.known_tables():
+        df_viejo = safe_read_csv(path)
+        if not safe_save_csv(merge_clasifications(df_viejo, df_nuevo), path):
+            raise db_utils.WriteError(f"No se pudo guardar {path}")
+        return len(df_nuevo)
+
+    if df_nuevo.empty:
+        logger.warning("Clasificación nueva vacía, no se toca la tabla.")
+        return 0
+    cambiadas = db_utils.upsert_rows(
+        df_nuevo, table, db_utils.get_active_season(), CLASIFICACION_KEYS, replace_scope="jornada"
+    )
+    if cambiadas is None:
+        raise db_utils.WriteError(f"Upsert de {table} fallido o rechazado")
+    logger.info(f"Merge completado correctamente. Filas cambiadas: {cambiadas}.")
+    return cambiadas
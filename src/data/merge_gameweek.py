@@ -1,8 +1,16 @@
 import pandas as pd
 import logging
+from pathlib import Path
+
+from src.utils import db as db_utils
+from src.utils.file_utils import safe_read_csv, safe_save_csv
 
 logger = logging.getLogger(__name__)
 
+# Columnas que identifican una fila única (SIN Date), declaradas en
+# src/utils/db.py -> TABLE_KEYS
+GAMEWEEK_KEYS = db_utils.TABLE_KEYS["gameweek"]
+
 def merge_gameweek(df_viejo: pd.DataFrame, df_nuevo: pd.DataFrame) -> pd.DataFrame:
     """
     Añade a df_viejo solo las filas nuevas de df_nuevo.
@@ -16,15 +24,7 @@ def merge_gameweek(df_viejo: pd.DataFrame, df_nuevo: pd.DataFrame) -> pd.DataFra
         if df_nuevo is None or df_nuevo.empty:
             return df_viejo.copy()
 
-        # Columnas que identifican una fila única (SIN Date)
-        subset_cols = [
-            "Jornada",
-            "EquipoLocal",
-            "EquipoVisitante",
-            "EquipoJugador",
-            "Manager",
-            "NombreJugador"
-        ]
+        subset_cols = list(GAMEWEEK_KEYS)
 
         # Verificación defensiva
         for col in subset_cols:
@@ -50,3 +50,32 @@ def merge_gameweek(df_viejo: pd.DataFrame, df_nuevo: pd.DataFrame) -> pd.DataFra
     except Exception as e:
         logger.exception(f"Error durante el merge de gameweek: {e}")
         return df_viejo.copy()
+
+
+def upsert_gameweek(df_nuevo: pd.DataFrame, path: str) -> int:
+    """
+    Versión en SQL de merge_gameweek para la tabla de la BD: la clave
+    GAMEWEEK_KEYS es un índice UNIQUE y las filas nuevas entran con
+    INSERT ... ON CONFLICT DO NOTHING (igual que keep="first": si la fila ya
+    existe se queda la guardada), así que solo se escriben las filas de la
+    jornada nueva en vez de borrar y reinsertar la temporada entera.
+
+    Si `path` no corresponde a una tabla de la BD se usa merge_gameweek
+    sobre el CSV. Devuelve el nº de filas añadidas; si la escritura falla o
+    se rechaza lanza db.WriteError.
+    """
+    table = Path(path).stem
+    if table not in db_utils.known_tables():
+        df_viejo = safe_read_csv(path)
+        df_final = merge_gameweek(df_viejo, df_nuevo)
+        if not safe_save_csv(df_final, path):
+            raise db_utils.WriteError(f"No se pudo guardar {path}")
+        return max(len(df_final) - len(df_viejo), 0)
+
+    cambiadas = db_utils.upsert_rows(
+        df_nuevo, table, db_utils.get_active_season(), GAMEWEEK_KEYS, update=False
+    )
+    if cambiadas is None:
+        raise db_utils.WriteError(f"Upsert de {table} fallido o rechazado")
+    logger.info(f"Merge gameweek OK | Nuevo recibido: {len(df_nuevo)} | Añadidas: {cambiadas}")
+    return cambiadas
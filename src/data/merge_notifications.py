@@ -1,8 +1,18 @@
 import pandas as pd
 import logging
+from pathlib import Path
+
+from src.utils import db as db_utils
+from src.utils.file_utils import safe_read_csv, safe_save_csv
 
 logger = logging.getLogger(__name__)
 
+ALL_COLUMNS = [
+    "type","subtype","mensaje","jugador","de_equipo","a_equipo","precio",
+    "posicionJugador","puntosJugador","equipoLiga","name","money","position",
+    "aciertos","points","jornada","date","idTransfer"
+]
+
 def find_last_position(new_notificaciones: pd.DataFrame, csv_notificaciones: pd.DataFrame):
     """
     Busca la posición de la última notificación del CSV que ya existe en las nuevas,
@@ -48,11 +58,7 @@ def merge_feed_cards_until_match(csv_notificaciones: pd.DataFrame, new_notificac
     Mantiene las filas nuevas (por encima de la coincidencia) y las antiguas (por debajo).
     """
     try:
-        all_columns = [
-            "type","subtype","mensaje","jugador","de_equipo","a_equipo","precio",
-            "posicionJugador","puntosJugador","equipoLiga","name","money","position",
-            "aciertos","points","jornada","date","idTransfer"
-        ]
+        all_columns = ALL_COLUMNS
 
         # Asegurar columnas
         for col in all_columns:
@@ -66,6 +72,8 @@ def merge_feed_cards_until_match(csv_notificaciones: pd.DataFrame, new_notificac
 
         # Buscar coincidencia
         idx_csv, idx_new = find_last_position(new_notificaciones, csv_notificaciones)
+        # Las filas nuevas conservan la fecha de extracción si la traen
+        # (run_extraction.py --fecha); si no, hoy.
         today = pd.Timestamp.today().date()
 
         if idx_csv is not None and idx_new is not None:
@@ -73,12 +81,12 @@ def merge_feed_cards_until_match(csv_notificaciones: pd.DataFrame, new_notificac
             new_part = new_notificaciones.iloc[:idx_new].copy()
             old_part = csv_notificaciones.iloc[idx_csv:].copy()
 
-            new_part["date"] = today
+            new_part["date"] = new_part["date"].fillna(today)
             merged = pd.concat([new_part, old_part], ignore_index=True)
             logger.info(f"Merge realizado con corte en new_index={idx_new}, csv_index={idx_csv}")
         else:
             # No hay coincidencia → concatenar todo
-            new_notificaciones["date"] = today
+            new_notificaciones["date"] = new_notificaciones["date"].fillna(today)
             merged = pd.concat([new_notificaciones, csv_notificaciones], ignore_index=True)
             logger.warning("No hubo coincidencia, se añadieron todas las filas nuevas.")
 
@@ -93,3 +101,53 @@ def merge_feed_cards_until_match(csv_notificaciones: pd.DataFrame, new_notificac
         except Exception as inner_e:
             logger.error(f"Error fatal en merge_feed_cards_until_match: {inner_e}")
             return csv_notificaciones.copy()
+
+
+def append_new_notifications(new_notificaciones: pd.DataFrame, path: str) -> int:
+    """
+    Versión incremental de merge_feed_cards_until_match para la tabla de la BD
+    (ganancias): en vez de leer la tabla entera, mergear en pandas y
+    reescribirla, busca en SQLite (índice sobre temporada + idTransfer) qué
+    idTransfer del feed nuevo ya están guardados y añade delante solo las
+    filas por encima del primero conocido — O(filas nuevas), no O(tabla).
+
+    Misma semántica que el merge completo: las filas guardadas por encima de
+    ese punto de corte (cabecera sin idTransfer: bonificaciones, marcas de
+    jornada...) se sustituyen por las del feed nuevo, y si no hay ninguna
+    coincidencia se añade el feed entero. Si `path` no corresponde a una
+    tabla de la BD se usa el merge completo sobre el CSV.
+
+    Devuelve el nº de filas añadidas; si la escritura falla o se rechaza
+    lanza db.WriteError.
+    """
+    table = Path(path).stem
+    if table not in db_utils.known_tables():
+        csv_notificaciones = safe_read_csv(path)
+        merged = merge_feed_cards_until_match(csv_notificaciones, new_notificaciones)
+        if not safe_save_csv(merged, path):
+            raise db_utils.WriteError(f"No se pudo guardar {path}")
+        return max(len(merged) - len(csv_notificaciones), 0)
+
+    new_notificaciones = new_notificaciones.reindex(columns=ALL_COLUMNS).reset_index(drop=True)
+    temporada = db_utils.get_active_season()
+    conocidos = db_utils.first_rowids(table, temporada, "idTransfer", new_notificaciones["idTransfer"])
+
+    corte, rowid_corte = len(new_notificaciones), None
+    for i, id_transfer in enumerate(new_notificaciones["idTransfer"]):
+        if id_transfer in conocidos:
+            corte, rowid_corte = i, conocidos[id_transfer]
+            break
+
+    if rowid_corte is None:
+        logger.warning("No hubo coincidencia, se añaden todas las filas nuevas.")
+    else:
+        logger.info(f"Coincidencia encontrada (id={new_notificaciones['idTransfer'].iloc[corte]}) → new_index={corte}")
+
+    # La fecha de extracción la pone extraer_notificaciones (la del día
+    # archivado con run_extraction.py --fecha); hoy solo si no viene.
+    new_part = new_notificaciones.iloc[:corte].copy()
+    new_part["date"] = new_part["date"].fillna(pd.Timestamp.today().date())
+    añadidas = db_utils.prepend_rows(new_part, table, temporada, replace_before_rowid=rowid_corte)
+    if añadidas is None:
+        raise db_utils.WriteError(f"Inserción en {table} fallida o rechazada")
+    return añadidas
@@ -18,32 +18,13 @@ def transformar_detalles(valor):
     # Para todo lo demás
     return 0.5
 
-def procesar_model_data(csv_mercado, csv_subidasBajadas, csv_jornada, csv_notificaciones_clean):
-    # --- Normalizar fechas ---
-    csv_mercado["date"] = pd.to_datetime(csv_mercado["date"], errors="coerce")
-    csv_subidasBajadas["date"] = pd.to_datetime(csv_subidasBajadas["date"], errors="coerce")
-    csv_jornada["date"] = pd.to_datetime(csv_jornada["date"], errors="coerce")
-    csv_notificaciones_clean["fecha"] = pd.to_datetime(csv_notificaciones_clean["fecha"], errors="coerce")
-
-    # --- Normalizar nombres de jugadores ---
-    csv_mercado["jugador"] = csv_mercado["jugador"].astype(str).str.strip().str.upper()
-    csv_subidasBajadas["nombre"] = csv_subidasBajadas["nombre"].astype(str).str.strip().str.upper()
-    csv_subidasBajadas["nombre"] = csv_subidasBajadas["nombre"].apply(abreviar_nombre)
-    csv_notificaciones_clean["jugador"] = csv_notificaciones_clean["jugador"].astype(str).str.strip().str.upper()
-    csv_notificaciones_clean["jugador"] = csv_notificaciones_clean["jugador"].apply(abreviar_nombre)
-
-
-    columnas_mercado = [
-        "date",
-        "jugador",
-        "precio",
-        "posicionJugador",
-        "puntosJugador",
-        "equipoLiga",
-        "avgPoints",
-        "estado"
-    ]
-    mapeo_estado = {
+
+# Nombre normalizado (strip + upper) -> abreviatura. Los mismos jugadores se
+# repiten en cada snapshot de subidas/bajadas y en cada temporada, así que
+# abreviar_nombre solo corre la primera vez que aparece cada nombre.
+_ABREVIATURAS: dict[str, str] = {}
+
+_ESTADOS = {
     np.nan: 0,       # NaN → 0
     'injury': 1,
     'red': 2,
@@ -51,65 +32,115 @@ def procesar_model_data(csv_mercado, csv_subidasBajadas, csv_jornada, csv_notifi
     'other': 4,
     'five': 5
 }
-    csv_mercado["estado"] = csv_mercado["estado"].map(mapeo_estado)
-
-    mercado_libre = csv_mercado[
-        csv_mercado["manager"] == "Libre"
-    ][columnas_mercado]
-
-    mercado_subida = mercado_libre.merge(
-        csv_subidasBajadas,
-        left_on=["date", "jugador"],
-        right_on=["date", "nombre"],
-        how="left"
-    )
-    mercado_subida = mercado_subida.drop(columns=["nombre"], errors="ignore")
-
-    csv_jornada = csv_jornada[(csv_jornada["detalles"] != "En juego") & (csv_jornada["detalles"] != "Finalizada")].copy()
-    csv_jornada["detalles"] = csv_jornada["detalles"].apply(transformar_detalles)
-    mercado_subida_jornada = mercado_subida.merge(
-        csv_jornada,
-        on="date",
-        how="left"
-    )
-
-    columnas_notificaciones = ["fecha", "equipo", "jugador", "ganancias"]
-    csv_notificaciones_clean = csv_notificaciones_clean.copy()
-    csv_notificaciones_clean["fecha"] -= pd.Timedelta(days=1)
 
+_COLUMNAS_MERCADO = [
+    "date",
+    "jugador",
+    "precio",
+    "posicionJugador",
+    "puntosJugador",
+    "equipoLiga",
+    "avgPoints",
+    "estado"
+]
+
+_COLUMNAS_NOTIFICACIONES = ["fecha", "equipo", "jugador", "ganancias"]
+
+
+def _normalizar_nombres(serie: pd.Series, abreviar: bool = False) -> pd.Series:
+    """strip + upper (y abreviar_nombre si `abreviar`), una vez por nombre
+    distinto en vez de fila a fila."""
+    codigos, unicos = pd.factorize(serie.astype(str))
+    normalizados = pd.Index(unicos, dtype=object).str.strip().str.upper()
+    if abreviar:
+        for nombre in normalizados:
+            if nombre not in _ABREVIATURAS:
+                _ABREVIATURAS[nombre] = abreviar_nombre(nombre)
+        normalizados = [_ABREVIATURAS[nombre] for nombre in normalizados]
+    return pd.Series(np.asarray(normalizados, dtype=object)[codigos], index=serie.index, name=serie.name)
+
+
+def _dias_hasta_jornada(detalles: pd.Series) -> pd.Series:
+    """transformar_detalles sobre la columna: la regex corre una vez por
+    valor distinto. Los nulos dan 0.5, como cualquier valor que no es texto."""
+    codigos, unicos = pd.factorize(detalles)
+    dias = np.array([transformar_detalles(v) for v in unicos] + [0.5], dtype=object)
+    return pd.Series(dias[codigos], index=detalles.index, name=detalles.name).infer_objects()
+
+
+def _unir(izquierda: pd.DataFrame, derecha: pd.DataFrame, claves: dict[str, str]) -> pd.DataFrame:
+    """merge(how="left") de `izquierda` con `derecha` por `claves` (columna
+    de la izquierda -> columna de la derecha), sin las claves de la derecha.
+
+    Las claves de los dos lados se codifican juntas (factorize) en un solo
+    entero por fila y se cruza por él: un merge por una columna int64 en vez
+    de por varias de objetos. Mismas filas, orden y repeticiones que el
+    merge, también con claves nulas (NaT con NaT, como en merge).
+    """
+    clave_izq = np.zeros(len(izquierda), dtype=np.int64)
+    clave_der = np.zeros(len(derecha), dtype=np.int64)
+    for col_izq, col_der in claves.items():
+        codigos, unicos = pd.factorize(pd.concat([izquierda[col_izq], derecha[col_der]], ignore_index=True))
+        # +1: el nulo (-1) también es una clave
+        clave_izq = clave_izq * (len(unicos) + 1) + codigos[:len(izquierda)] + 1
+        clave_der = clave_der * (len(unicos) + 1) + codigos[len(izquierda):] + 1
+    derecha = derecha.drop(columns=list(claves.values())).assign(_clave=clave_der)
+    return izquierda.assign(_clave=clave_izq).merge(derecha, on="_clave", how="left").drop(columns="_clave")
 
-    notificaciones_ventas = csv_notificaciones_clean[
-        (csv_notificaciones_clean["compra-venta"] == "compra") &
-        (csv_notificaciones_clean["subtype"] == "mercado")
-    ][columnas_notificaciones]
 
-    notificaciones_pujas = csv_notificaciones_clean[
-        (csv_notificaciones_clean["compra-venta"] == "compra") &
-        (csv_notificaciones_clean["subtype"] == "Puja")
-    ][columnas_notificaciones]
-
-    mercado_subida_jornada_compras = mercado_subida_jornada.merge(
-        notificaciones_ventas,
-        left_on=["date", "jugador"],
-        right_on=["fecha", "jugador"],
-        how="left"
+def procesar_model_data(csv_mercado, csv_subidasBajadas, csv_jornada, csv_notificaciones_clean):
+    """
+    Tabla data_model: una fila por jugador libre del mercado y día, con su
+    variación de precio, los días hasta la jornada, la compra de mercado que
+    hubo (si la hubo) y el nº de pujas por él.
+
+    Los nombres se normalizan una vez por nombre distinto (_ABREVIATURAS),
+    las notificaciones se agregan por (fecha, jugador) en una sola tabla
+    antes de cruzarlas y cada cruce va por una clave entera (_unir), en
+    lugar de normalizar fila a fila con apply y encadenar cuatro merges por
+    columnas de texto. El resultado es el mismo que el de la implementación
+    anterior, que sigue en scripts/run_benchmarks.py como referencia. No
+    modifica los DataFrames de entrada.
+    """
+    # --- Mercado: jugadores libres ---
+    mercado = csv_mercado.loc[csv_mercado["manager"] == "Libre", _COLUMNAS_MERCADO].copy()
+    mercado["date"] = pd.to_datetime(mercado["date"], errors="coerce")
+    mercado["jugador"] = _normalizar_nombres(mercado["jugador"])
+    mercado["estado"] = mercado["estado"].map(_ESTADOS)
+
+    # --- Subidas/bajadas por (date, nombre) ---
+    subidas = csv_subidasBajadas.assign(
+        date=pd.to_datetime(csv_subidasBajadas["date"], errors="coerce"),
+        nombre=_normalizar_nombres(csv_subidasBajadas["nombre"], abreviar=True),
     )
-    mercado_subida_jornada_compras = mercado_subida_jornada_compras.drop(columns=["fecha"], errors="ignore")
 
-    pujas_agrupadas = (
-    notificaciones_pujas
-    .groupby(["fecha", "jugador"])
-    .size()
-    .reset_index(name="num_pujas")
+    # --- Jornadas por date ---
+    jornada = csv_jornada[(csv_jornada["detalles"] != "En juego") & (csv_jornada["detalles"] != "Finalizada")]
+    jornada = jornada.assign(
+        date=pd.to_datetime(jornada["date"], errors="coerce"),
+        detalles=_dias_hasta_jornada(jornada["detalles"]),
     )
-    mercado_final = mercado_subida_jornada_compras.merge(
-    pujas_agrupadas,
-    left_on=["date", "jugador"],
-    right_on=["fecha", "jugador"],
-    how="left"
+
+    # --- Notificaciones por (fecha, jugador): la compra de mercado (si la
+    # hubo) y el nº de pujas, en una sola tabla ---
+    notificaciones = csv_notificaciones_clean[
+        (csv_notificaciones_clean["compra-venta"] == "compra")
+        & csv_notificaciones_clean["subtype"].isin(["mercado", "Puja"])
+    ]
+    notificaciones = notificaciones.assign(
+        fecha=pd.to_datetime(notificaciones["fecha"], errors="coerce") - pd.Timedelta(days=1),
+        jugador=_normalizar_nombres(notificaciones["jugador"], abreviar=True),
     )
+    es_puja = notificaciones["subtype"] == "Puja"
+    pujas = notificaciones[es_puja].groupby(["fecha", "jugador"]).size().rename("num_pujas")
+    compras = notificaciones.loc[~es_puja, _COLUMNAS_NOTIFICACIONES].join(pujas, on=["fecha", "jugador"])
+    claves_compras = pd.MultiIndex.from_frame(compras[["fecha", "jugador"]])
+    solo_pujas = pujas[~pujas.index.isin(claves_compras)].reset_index()
+    por_clave = pd.concat([compras, solo_pujas], ignore_index=True)
+
+    mercado_final = _unir(mercado, subidas, {"date": "date", "jugador": "nombre"})
+    mercado_final = _unir(mercado_final, jornada, {"date": "date"})
+    mercado_final = _unir(mercado_final, por_clave, {"date": "fecha", "jugador": "jugador"})
     mercado_final["num_pujas"] = mercado_final["num_pujas"].fillna(0).astype(int)
-    mercado_final = mercado_final.drop(columns=["fecha"], errors="ignore")
-
 
     return mercado_final
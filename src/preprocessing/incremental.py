@@ -0,0 +1,209 @@
+"""
+incremental.py — Preprocesado incremental de las notificaciones.
+
+run_preprocess.py rehacía ganancias_clean, ganancias_jugador y
+clausulas_acuerdos desde el feed entero de la temporada en cada ejecución.
+El feed (tabla ganancias) solo crece por arriba (prepend_rows: lo más
+reciente primero), así que basta con procesar su cabecera:
+
+- Ancla: la fila más reciente del feed que es un transfer con idTransfer y
+  de_equipo != 'Mister'. Cierra la sesión de mercado anterior (ver
+  _ids_de_sesion) y no es un start_mercado, así que lo que sale de ella y
+  de las filas más antiguas no depende de lo que haya por encima, salvo el
+  id de sesión, que se cuenta desde arriba y se desplaza en bloque.
+- Marca de agua (db.get_watermark): el ancla de la última ejecución
+  (rowid, idTransfer, id de sesión), cuántas filas de cada tabla derivada
+  salen de la cabecera (las filas del feed por encima del ancla) y la
+  versión de _changelog tras escribirlas.
+
+Una ejecución incremental procesa solo las filas del feed hasta el ancla,
+calcula el Diff solo de las ventas de la cabecera, contra las compras de
+sus (equipo, jugador), y en una sola transacción (db.prepend_tables)
+sustituye la cabecera de cada tabla derivada y suma al id del resto de
+ganancias_clean lo que se ha movido el del ancla. El resultado es el mismo
+que rehacerlo todo.
+
+Cuando eso no se puede garantizar (no hay marca, el feed se reescribió en
+vez de crecer por arriba, alguien escribió en una tabla derivada, el ancla
+ya no está...) preprocesar_incremental devuelve False y run_preprocess.py
+lo rehace todo.
+"""
+
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessing.process_clausulas_acuerdos import procesar_clausulas_acuerdos
+from src.preprocessing.process_ganancias import _procesar_ganancias
+from src.preprocessing.process_ganancias_jugador import procesar_ganancias_jugador
+from src.utils import db as db_utils
+
+logger = logging.getLogger(__name__)
+
+MARCA = "preprocess"
+
+# Tablas del preprocesado -> clave de config.yaml -> paths.csv
+_CSV = {
+    "feed": "notificaciones",
+    "clean": "notificaciones_clean",
+    "jugador": "notificaciones_jugador",
+    "clausulas": "clausulas_acuerdos",
+}
+_DERIVADAS = ("clean", "jugador", "clausulas")
+
+
+def tablas_preprocesado(cfg: dict) -> dict | None:
+    """{"feed", "clean", "jugador", "clausulas"} -> tabla de la BD, o None si
+    alguna no está en la BD (CSV en disco): entonces no hay modo incremental."""
+    csv = cfg["paths"]["csv"]
+    tablas = {clave: Path(csv[nombre]).stem for clave, nombre in _CSV.items()}
+    conocidas = db_utils.known_tables()
+    return tablas if all(t in conocidas for t in tablas.values()) else None
+
+
+def _es_ancla(feed: pd.DataFrame) -> np.ndarray:
+    if not {"type", "de_equipo", "idTransfer"} <= set(feed.columns):
+        return np.zeros(len(feed), dtype=bool)
+    return (
+        (feed["type"] == "transfer")
+        & feed["de_equipo"].notna()
+        & (feed["de_equipo"] != "Mister")
+        & feed["idTransfer"].notna()
+    ).to_numpy()
+
+
+def _registros_cabecera(prefijo: pd.DataFrame) -> tuple[pd.DataFrame, int, pd.DataFrame]:
+    """Para las filas del feed desde arriba hasta el ancla (la última):
+    (registros de ganancias_clean de las filas por encima del ancla, id de
+    sesión del ancla, filas de clausulas_acuerdos por encima del ancla)."""
+    registros, origen = _procesar_ganancias(prefijo)
+    del_ancla = origen == len(prefijo) - 1
+    id_ancla = int(registros["id"].to_numpy()[del_ancla][0])
+    clausulas = procesar_clausulas_acuerdos(prefijo.iloc[:-1])
+    return registros[~del_ancla], id_ancla, clausulas
+
+
+def _jugador_cabecera(registros: pd.DataFrame, tabla_clean: str, temporada: str,
+                      corte_clean: int | None, desplazamiento: int = 0) -> pd.DataFrame:
+    """Filas de ganancias_jugador de las ventas de `registros` (la cabecera).
+
+    La compra de una venta siempre es más antigua (id mayor), así que está
+    en la cabecera o en el resto de ganancias_clean (rowid >= corte_clean),
+    del que solo se leen las compras de los jugadores vendidos. Con
+    `desplazamiento`, a su id se le suma lo que todavía no se ha sumado en
+    la BD (las tablas se escriben después, todas juntas).
+    """
+    if "compra-venta" not in registros.columns:
+        return pd.DataFrame()
+    ventas = registros[(registros["type"] == "transfer") & (registros["compra-venta"] == "venta")
+                       & (registros["subtype"] != "Puja")]
+    if ventas.empty:
+        return pd.DataFrame()
+    compras = pd.DataFrame()
+    if corte_clean is not None:
+        compras = db_utils.read_table(
+            tabla_clean, temporada=temporada,
+            columns=["id", "type", "equipo", "jugador", "compra-venta", "ganancias"],
+            where={"rowid": (corte_clean, None), "compra-venta": "compra",
+                   "jugador": sorted(ventas["jugador"].dropna().unique())},
+        )
+        if desplazamiento and not compras.empty:
+            compras["id"] += desplazamiento
+    return procesar_ganancias_jugador(pd.concat([registros, compras], ignore_index=True))
+
+
+def guardar_marca(tablas: dict, temporada: str, feed: pd.DataFrame, desde_version: int | None = None) -> None:
+    """Guarda la marca de agua para la próxima ejecución incremental.
+
+    `feed`: las primeras filas del feed de la temporada (en su orden), por
+    lo menos hasta el ancla. Con `desde_version` (tras rehacerlo todo), solo
+    se guarda si las tres tablas derivadas se escribieron desde entonces; si
+    alguna escritura se saltó o se rechazó, la marca se borra y la próxima
+    ejecución vuelve a rehacerlo todo.
+    """
+    if desde_version is not None:
+        escritas = {c["tabla"] for c in db_utils.changes_since(desde_version, temporada=temporada)
+                    if c["operacion"] == "replace"}
+        if any(tablas[clave] not in escritas for clave in _DERIVADAS):
+            logger.warning("⚠️ No se guardaron todas las tablas del preprocesado: sin marca de agua.")
+            db_utils.set_watermark(MARCA, temporada, None)
+            return
+
+    anclas = np.flatnonzero(_es_ancla(feed))
+    if not len(anclas):
+        logger.info("Sin transfers con idTransfer en el feed: sin marca de agua, la próxima ejecución lo rehace todo.")
+        db_utils.set_watermark(MARCA, temporada, None)
+        return
+    i = int(anclas[0])
+    prefijo = feed.iloc[:i + 1].reset_index(drop=True)
+    registros, id_ancla, clausulas = _registros_cabecera(prefijo)
+    corte_clean = db_utils.rowid_at(tablas["clean"], temporada, len(registros))
+    jugador = _jugador_cabecera(registros, tablas["clean"], temporada, corte_clean)
+    db_utils.set_watermark(MARCA, temporada, {
+        "version": db_utils.current_version(),
+        "ancla": {
+            "rowid": db_utils.rowid_at(tablas["feed"], temporada, i),
+            "idTransfer": str(prefijo["idTransfer"].iloc[-1]),
+            "id": id_ancla,
+        },
+        "filas": {"clean": len(registros), "jugador": len(jugador), "clausulas": len(clausulas)},
+    })
+
+
+def preprocesar_incremental(tablas: dict, temporada: str) -> bool:
+    """Preprocesa solo las notificaciones nuevas desde la última ejecución.
+
+    Devuelve True si las tablas derivadas quedaron al día (o no había nada
+    nuevo), False si hay que rehacerlas enteras.
+    """
+    marca = db_utils.get_watermark(MARCA, temporada)
+    if marca is None:
+        logger.info("Sin marca de agua del preprocesado: se rehace todo.")
+        return False
+
+    cambios = [c for c in db_utils.changes_since(marca["version"], temporada=temporada)
+               if c["tabla"] in tablas.values()]
+    if any(c["tabla"] != tablas["feed"] or c["operacion"] != "prepend" for c in cambios):
+        logger.info("El feed o las tablas derivadas cambiaron por otra vía desde la última ejecución: se rehace todo.")
+        return False
+    if not cambios:
+        logger.info("✅ Sin notificaciones nuevas desde la última ejecución: nada que preprocesar.")
+        return True
+
+    ancla = marca["ancla"]
+    feed = db_utils.read_table(tablas["feed"], temporada=temporada, columns=["*", "rowid"],
+                               where={"rowid": (None, ancla["rowid"])})
+    if (feed.empty or feed["rowid"].iloc[-1] != ancla["rowid"]
+            or str(feed["idTransfer"].iloc[-1]) != ancla["idTransfer"]):
+        logger.info("El ancla de la última ejecución ya no está en el feed: se rehace todo.")
+        return False
+    feed = feed.drop(columns="rowid")
+
+    cortes = {clave: db_utils.rowid_at(tablas[clave], temporada, marca["filas"][clave]) for clave in _DERIVADAS}
+    if cortes["clean"] is None or any(cortes[c] is None and marca["filas"][c] for c in _DERIVADAS):
+        logger.info("Las tablas derivadas no cuadran con la marca de agua: se rehace todo.")
+        return False
+
+    registros, id_ancla, clausulas = _registros_cabecera(feed)
+    desplazamiento = id_ancla - ancla["id"]
+    jugador = _jugador_cabecera(registros, tablas["clean"], temporada, cortes["clean"], desplazamiento)
+
+    # Las tres cabeceras y el desplazamiento, en una sola transacción: si
+    # algo falla, las tablas derivadas se quedan como estaban (y la marca
+    # de agua sigue valiendo).
+    cabeceras = {"clean": registros, "jugador": jugador, "clausulas": clausulas}
+    if not db_utils.prepend_tables(
+        {tablas[clave]: (cabeceras[clave], cortes[clave]) for clave in _DERIVADAS}, temporada,
+        shifts={tablas["clean"]: ("id", desplazamiento, cortes["clean"])},
+    ):
+        return False
+
+    logger.info(
+        "✅ Preprocesado incremental: %d notificaciones hasta el ancla -> %d registros de ganancias, "
+        "%d de ganancias por jugador, %d cláusulas/acuerdos (id de sesión %+d en el resto).",
+        len(feed) - 1, len(registros), len(jugador), len(clausulas), desplazamiento,
+    )
+    guardar_marca(tablas, temporada, feed)
+    return True
@@ -1,127 +1,176 @@
 import logging
 
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Claves de cada tipo de registro, en el orden en que siempre se han
+# construido. El orden de columnas del resultado es el de su primera
+# aparición (como al construir el DataFrame desde una lista de dicts), así
+# que depende de qué tipo de registro sale primero en el feed.
+_CLAVES_MARCA = ["fecha", "id", "type", "subtype", "equipo", "ganancias"]
+_CLAVES_BAJADA = ["fecha", "id", "type", "equipo", "jugador", "equipoLiga", "ganancias"]
+_CLAVES_TRANSFER = ["fecha", "id", "type", "subtype", "equipo", "jugador", "compra-venta", "equipoLiga", "ganancias"]
+
+# Tipo de registro que genera cada fila del feed.
+_NINGUNO, _MARCA, _BAJADA, _TRANSFER = 0, 1, 2, 3
+
+
+def _columna(df: pd.DataFrame, col: str) -> pd.Series:
+    """`df[col]` como objetos Python (los mismos valores que da una fila de
+    iterrows), o NaN si la columna no existe."""
+    if col not in df.columns:
+        return pd.Series(np.nan, index=df.index, dtype=object)
+    return df[col].astype(object)
+
+
+def _start_mercado_duplicados(df: pd.DataFrame) -> np.ndarray:
+    """Máscara de los start_mercado seguidos de un transfer con de_equipo != 'Mister'."""
+    siguiente_type = df["type"].shift(-1)
+    siguiente_de = _columna(df, "de_equipo").shift(-1)
+    quitar = (df["subtype"] == "start_mercado") & (siguiente_type == "transfer") & (siguiente_de != "Mister")
+    return quitar.to_numpy()
+
+
+def _ids_de_sesion(df: pd.DataFrame) -> np.ndarray:
+    """Contador de sesión de mercado de cada fila.
+
+    Un start_mercado abre sesión nueva, y el id sube en la primera fila
+    posterior cuyo de_equipo no es 'Mister'. Es decir: una fila con
+    de_equipo != 'Mister' sube el id si hay algún start_mercado entre la
+    fila anterior con de_equipo != 'Mister' (incluida) y ella (excluida).
+    """
+    start = (df["subtype"] == "start_mercado").to_numpy()
+    no_mister = (_columna(df, "de_equipo") != "Mister").to_numpy()
+    # nº de start_mercado estrictamente antes de cada fila
+    starts_antes = np.concatenate(([0], np.cumsum(start)[:-1]))
+    en_no_mister = starts_antes[no_mister]
+    previos = np.concatenate(([0], en_no_mister[:-1]))
+    sube = np.zeros(len(df), dtype=bool)
+    sube[no_mister] = en_no_mister > previos
+    return np.cumsum(sube)
+
 
 def procesar_ganancias(df: pd.DataFrame) -> pd.DataFrame:
     """
     Procesa el CSV de ganancias, limpiando registros y estandarizando.
 
+    Vectorizado: el resultado es idéntico (valores, tipos, orden de filas y
+    columnas) al del recorrido fila a fila que había antes, que sigue en
+    scripts/run_benchmarks.py como referencia.
+
     Args:
-        filepath (str): Ruta al CSV de ganancias (ej. 'ganancias.csv').
+        df (pd.DataFrame): Feed de notificaciones (tabla ganancias).
 
     Returns:
         pd.DataFrame: DataFrame con datos procesados.
     """
+    return _procesar_ganancias(df)[0]
+
+
+def _procesar_ganancias(df: pd.DataFrame) -> tuple[pd.DataFrame, np.ndarray]:
+    """procesar_ganancias y, para cada registro del resultado, la posición en
+    `df` de la fila del feed de la que sale (ver incremental.py)."""
 
     # Eliminar start_mercado seguido de transfer con de_equipo != 'Mister'
-    # Usamos iloc para acceder por posición, independientemente del índice del DataFrame.
-    df = df.reset_index(drop=True)  # garantizar índice 0..n-1 antes del bucle
-    filas_a_eliminar = []
-    for i in range(len(df) - 1):
-        fila_actual = df.iloc[i]
-        fila_siguiente = df.iloc[i + 1]
-        if (
-            fila_actual["subtype"] == "start_mercado"
-            and fila_siguiente["type"] == "transfer"
-            and str(fila_siguiente.get("de_equipo", "")) != "Mister"
-        ):
-            filas_a_eliminar.append(i)
-    df = df.drop(filas_a_eliminar).reset_index(drop=True)
-
-    registros = []
-    new_id = 0
-    bool_new_id = False
-
-    for _, row in df.iterrows():
-        fecha = row['date']
-        if bool_new_id and row["de_equipo"]!="Mister":
-            new_id =new_id +1
-            bool_new_id = False
-        tipo = row["type"]
-        subtipo = row["subtype"]
-        if subtipo == "start_mercado":
-            bool_new_id = True
-            registros.append({
-                "fecha":fecha,
-                "id": new_id,
-                "type": tipo,
-                "subtype": subtipo,
-                "equipo": "Mercado diario",
-                "ganancias": 0
-            })
-        elif subtipo == "start_jornada":
-            registros.append({
-                "fecha":fecha,
-                "id": new_id,
-                "type": tipo,
-                "subtype": subtipo,
-                "equipo": row["jornada"],
-                "ganancias": 0
-            })
-        elif tipo in ["bonificacion"]:
-            if pd.notna(row.get("money")):
-                ganancia = row["money"]
-            else:
-                ganancia = 0
-            registros.append({
-                "fecha":fecha,
-                "id": new_id,
-                "type": tipo,
-                "subtype": subtipo,
-                "equipo": row["name"],
-                "ganancias": ganancia
-            })
-        elif tipo == "transfer":
-            try:
-                jugador = row["jugador"]
-                de_equipo = row["de_equipo"]
-                a_equipo = row["a_equipo"]
-
-                if pd.isna(a_equipo):
-                    registros.append({
-                        "fecha":fecha,
-                        "id": new_id,
-                        "type": "bajadaclausula",
-                        "equipo": de_equipo,
-                        "jugador": jugador,
-                        "equipoLiga": row["equipoLiga"],
-                        "ganancias": 0
-                    })
-                else:
-                    precio = row["precio"]
-                    if subtipo == "Puja":
-                        precio = 0
-                    registros.append({
-                        "fecha":fecha,
-                        "id": new_id,
-                        "type": "transfer",
-                        "subtype": subtipo,
-                        "equipo": de_equipo,
-                        "jugador": jugador,
-                        "compra-venta": "venta",
-                        "equipoLiga": row["equipoLiga"],
-                        "ganancias": precio
-                    })
-                    registros.append({
-                        "fecha":fecha,
-                        "id": new_id,
-                        "type": "transfer",
-                        "subtype": subtipo,
-                        "equipo": a_equipo,
-                        "jugador": jugador,
-                        "compra-venta": "compra",
-                        "equipoLiga": row["equipoLiga"],
-                        "ganancias": -precio
-                    })
-            except Exception as e:
-                logger.warning("Error procesando fila de transferencia: %s — %s", row.get("jugador"), e)
-
-    df_limpio = pd.DataFrame(registros)
+    df = df.reset_index(drop=True)
+    conservar = ~_start_mercado_duplicados(df)
+    posiciones = np.flatnonzero(conservar)
+    df = df[conservar].reset_index(drop=True)
+    ids = _ids_de_sesion(df)
+
+    tipo = df["type"].to_numpy()
+    subtipo = df["subtype"].to_numpy()
+    a_equipo = _columna(df, "a_equipo")
+    clase = np.select(
+        [
+            np.isin(subtipo, ["start_mercado", "start_jornada"]),
+            tipo == "bonificacion",
+            (tipo == "transfer") & a_equipo.isna().to_numpy(),
+            tipo == "transfer",
+        ],
+        [_MARCA, _MARCA, _BAJADA, _TRANSFER],
+        default=_NINGUNO,
+    )
+
+    precio = _columna(df, "precio")
+    es_transfer = clase == _TRANSFER
+    con_compra = es_transfer
+    if es_transfer.any() and "precio" in df.columns and df["precio"].dtype == object:
+        # Con un precio no numérico el bucle de antes fallaba al negarlo para
+        # la compra: avisaba y se quedaba solo con la venta. Se conserva.
+        numerico = precio.map(lambda v: pd.isna(v) or isinstance(v, (int, float, np.number)))
+        invalido = es_transfer & ~numerico.to_numpy() & (subtipo != "Puja")
+        for jugador in df.loc[invalido, "jugador"]:
+            logger.warning("Error procesando fila de transferencia: %s — precio no numérico", jugador)
+        con_compra = es_transfer & ~invalido
+
+    # Cada transfer da dos registros (venta y compra), el resto uno o ninguno.
+    repeticiones = np.select([con_compra, clase != _NINGUNO], [2, 1], default=0)
+    if not repeticiones.any():
+        return pd.DataFrame(), np.array([], dtype=int)
+    fila = np.repeat(np.arange(len(df)), repeticiones)
+    es_compra = np.zeros(len(fila), dtype=bool)
+    es_compra[1:] = (fila[1:] == fila[:-1])
+    clase_r = clase[fila]
+
+    def _r(serie: pd.Series) -> np.ndarray:
+        return serie.to_numpy(dtype=object)[fila]
+
+    nan = np.full(len(fila), np.nan, dtype=object)
+    de_equipo = _r(_columna(df, "de_equipo"))
+    jugador = _r(_columna(df, "jugador"))
+    equipo_liga = _r(_columna(df, "equipoLiga"))
+    subtipo_r = _r(df["subtype"])
+
+    equipo = np.select(
+        [
+            subtipo_r == "start_mercado",
+            subtipo_r == "start_jornada",
+            clase_r == _MARCA,  # bonificación
+            es_compra,
+        ],
+        ["Mercado diario", _r(_columna(df, "jornada")), _r(_columna(df, "name")), _r(a_equipo)],
+        default=de_equipo,
+    )
+
+    # Venta: precio (0 en las pujas); compra: el mismo importe en negativo.
+    precio_venta = np.where(subtipo == "Puja", 0, precio.to_numpy())
+    precio_compra = np.full(len(df), np.nan, dtype=object)
+    precio_compra[con_compra] = -precio_venta[con_compra]
+    money = _columna(df, "money")
+    ganancias = np.select(
+        [
+            np.isin(subtipo_r, ["start_mercado", "start_jornada"]),
+            clase_r == _MARCA,  # bonificación
+            clase_r == _BAJADA,
+            es_compra,
+        ],
+        [0, _r(money.where(money.notna(), 0)), 0, precio_compra[fila]],
+        default=precio_venta[fila],
+    )
+
+    columnas = {
+        "fecha": _r(_columna(df, "date")),
+        "id": ids[fila],
+        "type": np.where(clase_r == _BAJADA, "bajadaclausula", _r(df["type"])),
+        "subtype": np.where(clase_r == _BAJADA, nan, subtipo_r),
+        "equipo": equipo,
+        "jugador": np.where(clase_r == _MARCA, nan, jugador),
+        "compra-venta": np.where(clase_r == _TRANSFER, np.where(es_compra, "compra", "venta"), nan),
+        "equipoLiga": np.where(clase_r == _MARCA, nan, equipo_liga),
+        "ganancias": ganancias,
+    }
+
+    orden = []
+    for c in dict.fromkeys(clase_r):
+        claves = {_MARCA: _CLAVES_MARCA, _BAJADA: _CLAVES_BAJADA, _TRANSFER: _CLAVES_TRANSFER}[c]
+        orden += [k for k in claves if k not in orden]
+    df_limpio = pd.DataFrame({col: pd.Series(columnas[col], dtype=object) for col in orden}).infer_objects()
 
     # Filtrar filas donde equipo NO sea "Mister"
-    df_limpio = df_limpio[df_limpio["equipo"] != "Mister"]
+    no_mister = (df_limpio["equipo"] != "Mister").to_numpy()
+    df_limpio = df_limpio[no_mister]
 
-    return df_limpio
+    return df_limpio, posiciones[fila][no_mister]
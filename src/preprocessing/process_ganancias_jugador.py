@@ -1,5 +1,8 @@
 import pandas as pd
 
+_CLAVES = ['id', 'equipo', 'jugador']
+
+
 def procesar_ganancias_jugador(df: pd.DataFrame) -> pd.DataFrame:
     """
     Filtra el DataFrame para operaciones de 'transfer' de venta (no Puja),
@@ -7,48 +10,52 @@ def procesar_ganancias_jugador(df: pd.DataFrame) -> pd.DataFrame:
     (precio de venta + precio de compra, donde compra es negativo).
 
     La compra de referencia es la primera compra del mismo jugador/equipo
-    con id mayor que la venta (la compra más reciente en el historial).
+    con id mayor que la venta (la compra más reciente en el historial); con
+    varias en la misma sesión, la primera del historial.
+
+    El emparejamiento es un merge_asof por (equipo, jugador) sobre las
+    compras ordenadas por id: O(n log n), sin el cruce de cada venta con
+    todas las compras del mismo jugador/equipo que se hacía antes.
     """
     # Ventas relevantes
     df_ventas = df[
         (df['type'] == 'transfer') &
         (df['compra-venta'] == 'venta') &
         (df['subtype'] != 'Puja')
-    ].copy()
+    ].reset_index(drop=True)
 
-    # Compras relevantes
+    # Compras relevantes. Las que no tienen importe no cuentan: antes el
+    # first() del groupby se las saltaba y cogía la siguiente.
     df_compras = df[
         (df['type'] == 'transfer') &
-        (df['compra-venta'] == 'compra')
-    ][['id', 'equipo', 'jugador', 'ganancias']].copy()
+        (df['compra-venta'] == 'compra') &
+        df['ganancias'].notna()
+    ][['id', 'equipo', 'jugador', 'ganancias']]
     df_compras = df_compras.rename(columns={'id': 'id_compra', 'ganancias': 'ganancias_compra'})
 
-    # Para cada venta, buscar la compra del mismo jugador/equipo con id_compra > id_venta.
-    # Hacemos un merge cruzado por jugador+equipo y luego filtramos y cogemos el mínimo id_compra.
-    merged = df_ventas[['id', 'equipo', 'jugador', 'ganancias']].merge(
-        df_compras,
-        on=['equipo', 'jugador'],
-        how='left'
-    )
-    # Solo compras posteriores a la venta (id mayor = más antiguo en el historial)
-    merged = merged[merged['id_compra'] > merged['id']]
-
-    # La compra de referencia es la primera (id_compra mínimo entre las válidas)
-    merged = (
-        merged.sort_values('id_compra')
-        .groupby(['id', 'equipo', 'jugador'], as_index=False)
-        .first()
-    )
+    # Para cada venta, la compra del mismo jugador/equipo con el menor
+    # id_compra > id_venta (id mayor = más antiguo en el historial).
+    # merge_asof necesita las dos tablas ordenadas por su clave; el orden
+    # estable deja las compras de una misma sesión en orden de historial, y
+    # "forward" se queda con la primera.
+    ventas = df_ventas[_CLAVES].assign(_fila=range(len(df_ventas))).sort_values('id', kind='stable')
+    compras = df_compras.sort_values('id_compra', kind='stable')
+    emparejadas = pd.merge_asof(
+        ventas.astype({'id': 'int64'}),
+        compras.astype({'id_compra': 'int64'}),
+        left_on='id',
+        right_on='id_compra',
+        by=['equipo', 'jugador'],
+        direction='forward',
+        allow_exact_matches=False,
+    ).set_index('_fila').sort_index()
+
+    # Las ventas repetidas (mismo id, equipo y jugador) comparten el Diff de
+    # la primera con importe, como con el groupby(...).first() de antes.
+    ganancias_venta = df_ventas.groupby(_CLAVES)['ganancias'].transform('first')
 
     # Calcular Diff = ganancia_venta + ganancia_compra (compra es negativa, así que suma)
-    merged['Diff'] = merged['ganancias'] + merged['ganancias_compra']
-
-    # Unir Diff al DataFrame de ventas original
-    df_ventas = df_ventas.merge(
-        merged[['id', 'equipo', 'jugador', 'Diff']],
-        on=['id', 'equipo', 'jugador'],
-        how='left'
-    )
+    df_ventas['Diff'] = ganancias_venta + emparejadas['ganancias_compra']
 
     # Eliminar columnas innecesarias y filas sin Diff
     df_ventas = df_ventas.drop(["id", "type", "ganancias", "compra-venta"], axis=1, errors='ignore')
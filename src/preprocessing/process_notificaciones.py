@@ -0,0 +1,27 @@
+import pandas as pd
+
+from src.preprocessing.process_clausulas_acuerdos import procesar_clausulas_acuerdos
+from src.preprocessing.process_ganancias import procesar_ganancias
+from src.preprocessing.process_ganancias_jugador import procesar_ganancias_jugador
+
+
+def procesar_notificaciones(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Deriva las tres tablas del preprocesado a partir del feed de
+    notificaciones (tabla ganancias):
+
+    - "clean": ganancias_clean (procesar_ganancias).
+    - "jugador": ganancias_jugador, sobre ganancias_clean ya en memoria en
+      vez de releerla de la BD después de guardarla.
+    - "clausulas": clausulas_acuerdos.
+
+    Son los tres pasos de siempre, uno detrás de otro (no comparten
+    máscaras); lo único que se ahorra es releer ganancias_clean. El
+    resultado es el mismo que el de los tres pasos por separado; quien
+    llama decide cómo guardarlo (run_preprocess.py: db.write_tables, una
+    sola transacción para las tres).
+    """
+    clean = procesar_ganancias(df)
+    jugador = procesar_ganancias_jugador(clean) if 'compra-venta' in clean.columns else pd.DataFrame()
+    clausulas = procesar_clausulas_acuerdos(df)
+    return {"clean": clean, "jugador": jugador, "clausulas": clausulas}
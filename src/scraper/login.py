@@ -1,21 +1,31 @@
 # src/scraper/login.py
+import json
 import time
+import queue
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import urlparse
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-from src.utils.config_loader import load_config
+from src.utils.config_loader import get_base_dir, load_config
+from src.utils.html_archive import archivar_html
 
 logger = logging.getLogger(__name__)
 
-def scroll_infinite(page, scroll_pause=1.5, max_scrolls=50):
-    """Hace scroll infinito en la página para cargar todo el contenido."""
+def scroll_infinite(page, scroll_pause=1.5, max_scrolls=50) -> dict:
+    """Hace scroll infinito en la página para cargar todo el contenido.
+    Devuelve {"iteraciones", "segundos"} para poder comparar con el scroll
+    adaptativo."""
+    inicio = time.perf_counter()
+    iteraciones = 0
     try:
         last_height = page.evaluate("() => document.body.scrollHeight")
     except Exception as e:
         logger.warning("No se pudo obtener altura inicial del documento: %s", e)
-        return
+        return {"iteraciones": 0, "segundos": time.perf_counter() - inicio}
 
     for i in range(max_scrolls):
+        iteraciones = i + 1
         try:
             page.evaluate("() => window.scrollTo(0, document.body.scrollHeight)")
             time.sleep(scroll_pause)
@@ -29,6 +39,88 @@ def scroll_infinite(page, scroll_pause=1.5, max_scrolls=50):
             break
     else:
         logger.warning("⚠️ Límite de scroll alcanzado, puede que haya más contenido.")
+    return {"iteraciones": iteraciones, "segundos": time.perf_counter() - inicio}
+
+
+# Elementos de la lista que crece con el scroll, por archivo capturado. El
+# scroll adaptativo para en cuanto esa lista deja de crecer; para las
+# secciones sin entrada aquí mide la altura del documento.
+SELECTORES_SCROLL = {
+    "dashboard.html": "div.feed-cards > div.card-wrapper",
+    "mercado.html": "#list-on-sale > li",
+}
+
+
+def scroll_adaptativo(page, selector: str | None = None, pausa_inicial: float = 0.25,
+                      pausa_max: float = 2.0, max_scrolls: int = 60) -> dict:
+    """Scroll infinito guiado por eventos en vez de por sleeps fijos.
+
+    Tras cada scroll espera (con polling por mutación del DOM si hay
+    `selector`) a que la lista crezca, con un timeout que empieza en
+    `pausa_inicial`: si crece, vuelve en cuanto aparece el contenido nuevo y
+    la pausa se resetea; si no, la pausa se duplica. Las esperas seguidas
+    sin crecer suman como mucho `pausa_max` (la última se recorta): cuando se
+    agota, la lista se da por completa, así que el final nunca espera más que
+    el sleep fijo de scroll_infinite con la misma pausa.
+
+    Devuelve {"iteraciones", "segundos"}, igual que scroll_infinite.
+    """
+    inicio = time.perf_counter()
+    if selector:
+        medida = f"() => document.querySelectorAll({json.dumps(selector)}).length"
+        polling = "mutation"
+    else:
+        medida = "() => document.body.scrollHeight"
+        polling = "raf"
+
+    try:
+        ultimo = page.evaluate(medida)
+    except Exception as e:
+        logger.warning("No se pudo obtener el tamaño inicial de la lista: %s", e)
+        return {"iteraciones": 0, "segundos": time.perf_counter() - inicio}
+
+    pausa = pausa_inicial
+    sin_crecer = 0.0  # segundos esperados desde la última vez que creció
+    iteraciones = 0
+    for iteraciones in range(1, max_scrolls + 1):
+        espera = min(pausa, pausa_max - sin_crecer)
+        try:
+            page.evaluate("() => window.scrollTo(0, document.body.scrollHeight)")
+            page.wait_for_function(
+                f"(n) => ({medida})() > n", arg=ultimo, timeout=espera * 1000, polling=polling
+            )
+            ultimo = page.evaluate(medida)
+            pausa, sin_crecer = pausa_inicial, 0.0
+        except PlaywrightTimeoutError:
+            if espera >= pausa_max - sin_crecer:
+                logger.info("Scroll adaptativo finalizado tras %d iteraciones ✅", iteraciones)
+                break
+            sin_crecer += espera
+            pausa *= 2
+        except Exception as e:
+            logger.warning("Error durante scroll en iteración %d: %s", iteraciones, e)
+            break
+    else:
+        logger.warning("⚠️ Límite de scroll alcanzado, puede que haya más contenido.")
+    return {"iteraciones": iteraciones, "segundos": time.perf_counter() - inicio}
+
+
+def _scroll_pagina(page, archivo: str, scroll_opts: dict) -> None:
+    """Aplica el modo de scroll configurado (config.yaml -> scraper.scroll_mode)
+    y loggea iteraciones y tiempo de la página."""
+    if scroll_opts.get("mode") == "adaptive":
+        stats = scroll_adaptativo(
+            page,
+            selector=SELECTORES_SCROLL.get(archivo),
+            pausa_max=scroll_opts["pause"],
+            max_scrolls=scroll_opts["max_scrolls"],
+        )
+    else:
+        stats = scroll_infinite(page, scroll_pause=scroll_opts["pause"], max_scrolls=scroll_opts["max_scrolls"])
+    logger.info(
+        "📜 Scroll de %s: %d iteraciones en %.1fs (%s)",
+        archivo, stats["iteraciones"], stats["segundos"], scroll_opts.get("mode", "fixed"),
+    )
 
 def guardar_html(content, nombre_archivo, project_root=None):
     """Guarda HTML en data/raw/ y devuelve la ruta guardada."""
@@ -41,6 +133,13 @@ def guardar_html(content, nombre_archivo, project_root=None):
     with open(ruta_completa, "w", encoding="utf-8") as f:
         f.write(content)
     logger.info("💾 Guardado en: %s", ruta_completa)
+
+    # Copia histórica comprimida y deduplicada (ver src/utils/html_archive.py).
+    # No es crítica: si falla, el HTML de trabajo ya está guardado.
+    try:
+        archivar_html(content, nombre_archivo, archive_dir=carpeta / "archive")
+    except Exception as e:
+        logger.warning("No se pudo archivar %s: %s", nombre_archivo, e)
     return ruta_completa
 
 def safe_click(locator, description="", timeout=5000):
@@ -109,10 +208,275 @@ def login(max_retries: int = 3, backoff_seconds: int = 30) -> dict:
     raise last_exc
 
 
+def _debe_bloquear(resource_type: str, url: str, filtro: dict) -> bool:
+    """Decide si una petición se aborta: nunca si casa con la allowlist; sí
+    si es de un tipo bloqueado (imágenes, fuentes, media...) o va a un
+    dominio de publicidad/tracking (o a un subdominio suyo)."""
+    if any(permitido in url for permitido in filtro.get("allowlist", [])):
+        return False
+    if resource_type in filtro.get("resource_types", []):
+        return True
+    host = urlparse(url).hostname or ""
+    return any(host == d or host.endswith("." + d) for d in filtro.get("domains", []))
+
+
+def _nuevo_contexto(browser, filtro: dict | None = None, **kwargs):
+    """browser.new_context(**kwargs) con el filtro de recursos instalado.
+
+    Los extractores solo leen el HTML (los src de las imágenes siguen en el
+    DOM aunque no se descarguen), así que bloquear imágenes, fuentes, media
+    y redes de publicidad ahorra ancho de banda y tiempo de carga, y evita
+    de raíz buena parte de los popups que provocaban timeouts.
+    """
+    context = browser.new_context(**kwargs)
+    if filtro and filtro.get("enabled", False):
+        def _handler(route):
+            request = route.request
+            if _debe_bloquear(request.resource_type, request.url, filtro):
+                route.abort()
+            else:
+                route.continue_()
+        context.route("**/*", _handler)
+    return context
+
+
+# Secciones que se capturan tras el login: ruta relativa a base_url -> archivo
+# en data/raw/. El dashboard (página de aterrizaje del login) y
+# subidas/bajadas (necesita pulsar un botón) se tratan aparte.
+SECCIONES = {
+    "market": "mercado.html",
+    "team": "mi_equipo.html",
+    "standings": "clasificacion.html",
+    "feed#gameweek": "gameweek.html",
+    "feed#pool-private": "quiniela.html",
+}
+RUTA_SUBIDAS_BAJADAS = "market#market"
+ARCHIVO_SUBIDAS_BAJADAS = "MarketSubidasBajadas.html"
+
+
+def _realizar_login(page, base_url: str, email: str, password: str) -> bool:
+    """Rellena el formulario de login y espera al contenido principal.
+    Devuelve True si se llegó a ver #fg-content. Lanza RuntimeError si el
+    login falla críticamente."""
+    # Construir URL de login (usando el patrón que ya usabas)
+    login_url = f"{base_url}/new-onboarding/auth/email/check?email={email}"
+    logger.info("🌍 Navegando a: %s", login_url)
+    page.goto(login_url, wait_until="domcontentloaded", timeout=60000)
+
+    # Intentar aceptar cookies (español/inglés variantes)
+    try:
+        accepted = False
+        for text in ("Aceptar", "Accept", "Got it"):
+            if safe_click(page.locator(f"button:has-text('{text}')"), description=f"cookie-{text}", timeout=5000):
+                logger.info("🍪 Cookies aceptadas (%s) ✅", text)
+                accepted = True
+                break
+        if not accepted:
+            logger.debug("No había banner de cookies detectable.")
+    except Exception:
+        logger.debug("No se pudo manejar banner de cookies (no crítico).")
+
+    # Pulsar 'Continue with password' o su alternativa
+    if not safe_click(page.locator("button:has-text('Continue with password')"), "Continue with password", timeout=30000):
+        # intentar alternativa en español
+        safe_click(page.locator("button:has-text('Continuar con contraseña')"), "Continuar con contraseña", timeout=10000)
+
+    # Rellenar contraseña
+    try:
+        password_input = page.locator("input[type='password']")
+        password_input.wait_for(state="visible", timeout=30000)
+        password_input.fill(password)
+        logger.info("🔑 Contraseña introducida")
+    except PlaywrightTimeoutError:
+        raise RuntimeError("El campo de contraseña no apareció tras el intento de login.")
+
+    # Submit
+    if not safe_click(page.locator("button[type='submit']"), "submit", timeout=30000):
+        logger.warning("No se pudo pulsar el botón submit de forma normal; intentando presionar Enter.")
+        try:
+            password_input.press("Enter")
+        except Exception:
+            raise RuntimeError("No se pudo enviar el formulario de login.")
+
+    logger.info("⏳ Esperando posible publicidad (hasta 60s)...")
+    page.wait_for_timeout(2000)
+    cerrar_popup_publicidad(page, intentos=6, espera_ms=1000)
+
+    # Esperar contenido principal
+    try:
+        page.wait_for_selector("#fg-content", timeout=60000)
+        logger.info("✅ Login exitoso y contenido principal cargado.")
+        return True
+    except PlaywrightTimeoutError:
+        logger.warning("⚠️ No se detectó el contenido principal tras login. Continuando, puede que la página tenga estructura distinta.")
+        return False
+
+
+# Página de aterrizaje tras el login (la que se guarda como dashboard.html).
+RUTA_DASHBOARD = "feed"
+
+
+def _sesion_valida(page, base_url: str, timeout: int = 15000) -> bool:
+    """Comprueba si la página (con una sesión restaurada) llega a
+    #fg-content sin pasar por el formulario de login."""
+    try:
+        page.goto(f"{base_url}/{RUTA_DASHBOARD}", wait_until="domcontentloaded", timeout=60000)
+        cerrar_popup_publicidad(page)
+        page.wait_for_selector("#fg-content", timeout=timeout)
+        return True
+    except Exception as e:
+        logger.info("Sesión guardada no válida (%s); se hará login completo.", e)
+        return False
+
+
+def _guardar_sesion(context, state_path: Path) -> None:
+    """Guarda el storage state de `context` en `state_path` (sin propagar
+    errores: sin sesión guardada, la próxima ejecución hace login completo)."""
+    try:
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        context.storage_state(path=str(state_path))
+        logger.info("💾 Sesión guardada en: %s", state_path)
+    except Exception as e:
+        logger.warning("No se pudo guardar la sesión en %s: %s", state_path, e)
+
+
+def _abrir_sesion(browser, base_url: str, email: str, password: str, state_path: Path | None,
+                  filtro: dict | None = None):
+    """Devuelve (context, page) ya autenticados y en el dashboard.
+
+    Si existe `state_path` (storage state de Playwright guardado por una
+    ejecución anterior), lo reutiliza y se salta todo el baile de email,
+    cookies, 'Continue with password', submit y popup; solo si con esa
+    sesión no se alcanza #fg-content se cae al login completo. Tras entrar
+    (reutilizando la sesión o con login completo) guarda el storage state
+    para la próxima ejecución, así las cookies que el sitio renueva no
+    caducan con la copia vieja.
+    """
+    if state_path is not None and state_path.exists():
+        context = _nuevo_contexto(browser, filtro, storage_state=str(state_path))
+        page = context.new_page()
+        if _sesion_valida(page, base_url):
+            logger.info("♻️ Sesión reutilizada desde %s, sin login completo.", state_path)
+            _guardar_sesion(context, state_path)
+            return context, page
+        context.close()
+
+    context = _nuevo_contexto(browser, filtro)
+    page = context.new_page()
+    if _realizar_login(page, base_url, email, password) and state_path is not None:
+        _guardar_sesion(context, state_path)
+    return context, page
+
+
+def _capturar_seccion(page, url: str | None, archivo: str, scroll_opts: dict) -> Path:
+    """Navega a `url` (o se queda en la página actual si es None), hace
+    scroll infinito y guarda el HTML. Loggea el tiempo de pared de la sección."""
+    inicio = time.perf_counter()
+    if url is not None:
+        logger.info("➡️ Navegando a: %s", url)
+        try:
+            page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        except PlaywrightTimeoutError:
+            logger.warning("Timeout al cargar %s, intentando continuar.", url)
+        cerrar_popup_publicidad(page)
+
+    _scroll_pagina(page, archivo, scroll_opts)
+    ruta = guardar_html(page.content(), archivo)
+    logger.info("⏱️ Sección %s capturada en %.1fs", archivo, time.perf_counter() - inicio)
+    return ruta
+
+
+def _capturar_subidas_bajadas(page, base_url: str) -> Path:
+    """Captura la pestaña de subidas/bajadas del mercado (pulsando 'Bajadas')."""
+    inicio = time.perf_counter()
+    url_sb = f"{base_url}/{RUTA_SUBIDAS_BAJADAS}"
+    logger.info("➡️ Navegando a: %s", url_sb)
+    try:
+        page.goto(url_sb, wait_until="domcontentloaded", timeout=60000)
+    except PlaywrightTimeoutError:
+        logger.warning("Timeout al cargar %s, intentando continuar.", url_sb)
+
+    cerrar_popup_publicidad(page)
+
+    # Intentar click en 'Bajadas' (si existe)
+    try:
+        if not safe_click(page.locator("button:has-text('Bajadas')"), "Bajadas", timeout=5000):
+            logger.debug("Botón 'Bajadas' no encontrado o no visible.")
+        else:
+            logger.info("BOTON BAJADAS PULSADO")
+    except Exception:
+        logger.debug("Error al pulsar Bajadas, continuando.")
+
+    ruta = guardar_html(page.content(), ARCHIVO_SUBIDAS_BAJADAS)
+    logger.info("⏱️ Sección %s capturada en %.1fs", ARCHIVO_SUBIDAS_BAJADAS, time.perf_counter() - inicio)
+    return ruta
+
+
+def _worker_secciones(cola: queue.Queue, storage_state: dict, launch_args: dict, base_url: str,
+                      scroll_opts: dict, filtro: dict | None = None) -> dict:
+    """Worker del modo concurrente: abre su propio navegador (la API sync de
+    Playwright no se puede compartir entre hilos) con la sesión ya
+    autenticada del login y va sacando secciones de la cola hasta vaciarla."""
+    saved = {}
+    with sync_playwright() as p:
+        browser = p.chromium.launch(**launch_args)
+        try:
+            context = _nuevo_contexto(browser, filtro, storage_state=storage_state)
+            page = context.new_page()
+            while True:
+                try:
+                    ruta_name = cola.get_nowait()
+                except queue.Empty:
+                    return saved
+                if ruta_name == RUTA_SUBIDAS_BAJADAS:
+                    saved["subidas_bajadas"] = _capturar_subidas_bajadas(page, base_url)
+                else:
+                    saved[ruta_name] = _capturar_seccion(
+                        page, f"{base_url}/{ruta_name}", SECCIONES[ruta_name], scroll_opts
+                    )
+        finally:
+            try:
+                browser.close()
+            except Exception:
+                logger.debug("Error cerrando el navegador de un worker, ignorado.")
+
+
+def _capturar_en_paralelo(page, context, launch_args: dict, base_url: str, concurrency: int,
+                          scroll_opts: dict, filtro: dict | None = None) -> dict:
+    """Captura el dashboard en la página del login mientras hasta
+    `concurrency` workers capturan el resto de secciones en paralelo,
+    reutilizando la sesión autenticada (storage state) del contexto del login.
+
+    Si alguna sección lanza excepción, se relanza para que login() reintente
+    igual que en el modo secuencial.
+    """
+    storage_state = context.storage_state()
+    cola = queue.Queue()
+    for ruta_name in (*SECCIONES, RUTA_SUBIDAS_BAJADAS):
+        cola.put(ruta_name)
+
+    saved_paths = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(_worker_secciones, cola, storage_state, launch_args, base_url, scroll_opts, filtro)
+            for _ in range(concurrency)
+        ]
+        # El dashboard ya está cargado en la página del login: se scrollea
+        # en este hilo mientras los workers trabajan.
+        saved_paths["dashboard"] = _capturar_seccion(page, None, "dashboard.html", scroll_opts)
+        for future in futures:
+            saved_paths.update(future.result())
+    return saved_paths
+
+
 def _login_once() -> dict:
     """
     Un único intento de login. Devuelve un dict con las rutas guardadas.
     Lanza excepción si el login falla críticamente.
+
+    Con `scraper.concurrency` > 1 en config.yaml, las secciones se capturan
+    en paralelo (ver _capturar_en_paralelo); con 1 (por defecto), una tras
+    otra en la misma página, como siempre.
     """
     cfg = load_config(validate_env=False)
     base_url = cfg["env"].get("MISTER_BASE_URL", "https://mister.mundodeportivo.com")
@@ -121,9 +485,16 @@ def _login_once() -> dict:
 
     # Parámetros configurables (opcional en config.yaml bajo 'scraper')
     scraper_cfg = cfg.get("scraper", {})
-    scroll_pause = scraper_cfg.get("scroll_pause", 2)
-    max_scrolls = scraper_cfg.get("max_scrolls", 60)
+    scroll_opts = {
+        "mode": scraper_cfg.get("scroll_mode", "fixed"),
+        "pause": scraper_cfg.get("scroll_pause", 2),
+        "max_scrolls": scraper_cfg.get("max_scrolls", 60),
+    }
     headless = scraper_cfg.get("headless", True)  # recomendable True en Actions
+    concurrency = max(1, int(scraper_cfg.get("concurrency", 1)))
+    filtro = scraper_cfg.get("block_resources", {})
+    state_file = scraper_cfg.get("storage_state")
+    state_path = get_base_dir() / state_file if state_file else None
 
     if not (email and password):
         raise RuntimeError("MISTER_USERNAME o MISTER_PASSWORD no definidos en .env / secrets")
@@ -137,108 +508,25 @@ def _login_once() -> dict:
             # En entornos como Actions es necesario deshabilitar sandbox
             launch_args = {"headless": headless, "args": ["--no-sandbox", "--disable-setuid-sandbox"]}
             browser = p.chromium.launch(**launch_args)
-            context = browser.new_context()
-            page = context.new_page()
-
-            # Construir URL de login (usando el patrón que ya usabas)
-            login_url = f"{base_url}/new-onboarding/auth/email/check?email={email}"
-            logger.info("🌍 Navegando a: %s", login_url)
-            page.goto(login_url, wait_until="domcontentloaded", timeout=60000)
-
-            # Intentar aceptar cookies (español/inglés variantes)
-            try:
-                accepted = False
-                for text in ("Aceptar", "Accept", "Got it"):
-                    if safe_click(page.locator(f"button:has-text('{text}')"), description=f"cookie-{text}", timeout=5000):
-                        logger.info("🍪 Cookies aceptadas (%s) ✅", text)
-                        accepted = True
-                        break
-                if not accepted:
-                    logger.debug("No había banner de cookies detectable.")
-            except Exception:
-                logger.debug("No se pudo manejar banner de cookies (no crítico).")
-
-            # Pulsar 'Continue with password' o su alternativa
-            if not safe_click(page.locator("button:has-text('Continue with password')"), "Continue with password", timeout=30000):
-                # intentar alternativa en español
-                safe_click(page.locator("button:has-text('Continuar con contraseña')"), "Continuar con contraseña", timeout=10000)
-
-            # Rellenar contraseña
-            try:
-                password_input = page.locator("input[type='password']")
-                password_input.wait_for(state="visible", timeout=30000)
-                password_input.fill(password)
-                logger.info("🔑 Contraseña introducida")
-            except PlaywrightTimeoutError:
-                raise RuntimeError("El campo de contraseña no apareció tras el intento de login.")
-
-            # Submit
-            if not safe_click(page.locator("button[type='submit']"), "submit", timeout=30000):
-                logger.warning("No se pudo pulsar el botón submit de forma normal; intentando presionar Enter.")
-                try:
-                    password_input.press("Enter")
-                except Exception:
-                    raise RuntimeError("No se pudo enviar el formulario de login.")
+            context, page = _abrir_sesion(browser, base_url, email, password, state_path, filtro)
 
-            logger.info("⏳ Esperando posible publicidad (hasta 60s)...")
-            page.wait_for_timeout(2000)
-            cerrar_popup_publicidad(page, intentos=6, espera_ms=1000)
-
-            # Esperar contenido principal
-            try:
-                page.wait_for_selector("#fg-content", timeout=60000)
-                logger.info("✅ Login exitoso y contenido principal cargado.")
-            except PlaywrightTimeoutError:
-                logger.warning("⚠️ No se detectó el contenido principal tras login. Continuando, puede que la página tenga estructura distinta.")
-
-            # Scrollear y guardar dashboard
-            scroll_infinite(page, scroll_pause=scroll_pause, max_scrolls=max_scrolls)
-            saved_paths["dashboard"] = guardar_html(page.content(), "dashboard.html")
-
-            # Otras secciones
-            rutas = {
-                "market": "mercado.html",
-                "team": "mi_equipo.html",
-                "standings": "clasificacion.html",
-                "feed#gameweek":"gameweek.html",
-                "feed#pool-private":"quiniela.html"
-            }
-
-            for ruta_name, archivo in rutas.items():
-                url = f"{base_url}/{ruta_name}"
-                logger.info("➡️ Navegando a: %s", url)
-                try:
-                    page.goto(url, wait_until="domcontentloaded", timeout=60000)
-                except PlaywrightTimeoutError:
-                    logger.warning("Timeout al cargar %s, intentando continuar.", url)
-
-                cerrar_popup_publicidad(page)
-
-                scroll_infinite(page, scroll_pause=scroll_pause, max_scrolls=max_scrolls)
-                saved_paths[ruta_name] = guardar_html(page.content(), archivo)
-
-            # Subidas/Bajadas
-            ruta = "market#market"
-            archivoSB = "MarketSubidasBajadas.html"
-            url_sb = f"{base_url}/{ruta}"
-            logger.info("➡️ Navegando a: %s", url_sb)
-            try:
-                page.goto(url_sb, wait_until="domcontentloaded", timeout=60000)
-            except PlaywrightTimeoutError:
-                logger.warning("Timeout al cargar %s, intentando continuar.", url_sb)
-
-            cerrar_popup_publicidad(page)
+            if concurrency > 1:
+                logger.info("🔀 Capturando secciones en paralelo (concurrency=%d)", concurrency)
+                saved_paths = _capturar_en_paralelo(
+                    page, context, launch_args, base_url, concurrency, scroll_opts, filtro
+                )
+            else:
+                # Scrollear y guardar dashboard
+                saved_paths["dashboard"] = _capturar_seccion(page, None, "dashboard.html", scroll_opts)
 
-            # Intentar click en 'Bajadas' (si existe)
-            try:
-                if not safe_click(page.locator("button:has-text('Bajadas')"), "Bajadas", timeout=5000):
-                    logger.debug("Botón 'Bajadas' no encontrado o no visible.")
-                else:
-                    logger.info("BOTON BAJADAS PULSADO")
-            except Exception:
-                logger.debug("Error al pulsar Bajadas, continuando.")
+                # Otras secciones
+                for ruta_name, archivo in SECCIONES.items():
+                    saved_paths[ruta_name] = _capturar_seccion(
+                        page, f"{base_url}/{ruta_name}", archivo, scroll_opts
+                    )
 
-            saved_paths["subidas_bajadas"] = guardar_html(page.content(), archivoSB)
+                # Subidas/Bajadas
+                saved_paths["subidas_bajadas"] = _capturar_subidas_bajadas(page, base_url)
             logger.info("✅ Todos los HTML guardados correctamente.")
 
         except Exception as exc:
@@ -1,4 +1,6 @@
+import copy
 import os
+import threading
 import yaml
 import logging
 from pathlib import Path
@@ -30,17 +32,61 @@ def resolve_path(cfg: dict, *keys: str) -> Path:
     return _BASE_DIR / value
 
 
+# Caché del YAML parseado (y de la última carga del .env), invalidada por
+# mtime. load_config se llama desde get_db_path, get_active_season,
+# known_tables... es decir, varias veces por cada safe_read_csv/safe_save_csv;
+# parsear el YAML en cada llamada costaba más que muchas de las lecturas de
+# tabla. Ahora cada llamada cuesta un stat() de los dos archivos.
+_cache: dict = {"yaml_mtime": None, "yaml": None, "env_loaded": False, "env_mtime": None}
+_cache_lock = threading.Lock()
+_parse_count = 0
+
+
+def _mtime(path: Path) -> float | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_parse_count() -> int:
+    """Veces que se ha parseado config.yaml en este proceso."""
+    return _parse_count
+
+
+def reload(validate_env: bool = False) -> dict:
+    """Descarta la caché y vuelve a leer .env y config.yaml."""
+    with _cache_lock:
+        _cache.update(yaml_mtime=None, yaml=None, env_loaded=False, env_mtime=None)
+    return load_config(validate_env=validate_env)
+
+
 def load_config(validate_env: bool = True) -> dict:
     """
     Carga las configuraciones desde .env y config.yaml, combinadas en un solo dict.
     Si validate_env=True lanza EnvironmentError si faltan variables críticas.
+
+    config.yaml solo se parsea de nuevo si cambia su mtime (o tras reload());
+    cada llamada devuelve una copia, así que modificarla no afecta a las demás.
     """
+    global _parse_count
     dotenv_path = _BASE_DIR / "config" / ".env"
-    load_dotenv(dotenv_path)
-
     config_path = _BASE_DIR / "config" / "config.yaml"
-    with config_path.open("r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f)
+
+    with _cache_lock:
+        env_mtime = _mtime(dotenv_path)
+        if not _cache["env_loaded"] or env_mtime != _cache["env_mtime"]:
+            load_dotenv(dotenv_path)
+            _cache.update(env_loaded=True, env_mtime=env_mtime)
+
+        yaml_mtime = _mtime(config_path)
+        if _cache["yaml"] is None or yaml_mtime != _cache["yaml_mtime"]:
+            with config_path.open("r", encoding="utf-8") as f:
+                _cache["yaml"] = yaml.safe_load(f)
+            _cache["yaml_mtime"] = yaml_mtime
+            _parse_count += 1
+            logger.debug(f"config.yaml parseado (vez nº {_parse_count} en este proceso)")
+        cfg = copy.deepcopy(_cache["yaml"])
 
     cfg["env"] = {
         "MISTER_USERNAME": os.getenv("MISTER_USERNAME"),
@@ -1,4 +1,11 @@
+import atexit
+import importlib.util
+import json
+import os
 import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timezone
 import logging
 from pathlib import Path
 
@@ -12,6 +19,80 @@ logger = logging.getLogger(__name__)
 # (artefactos de pruebas/desarrollo, no datos de temporada reales).
 _EXCLUDED_TABLES = {"test"}
 
+# Clave natural (sin temporada) de las tablas que admiten escritura
+# incremental (write_table con mode="append"/"upsert"): se declara como
+# índice UNIQUE (temporada, *clave). Las tablas que no aparecen aquí solo
+# se pueden sobreescribir enteras por temporada (mode="replace").
+TABLE_KEYS = {
+    "gameweek": ("Jornada", "EquipoLocal", "EquipoVisitante", "EquipoJugador", "Manager", "NombreJugador"),
+    "clasificaciones": ("jornada", "nombre"),
+    "mercado": ("date", "jugador"),
+    "jornadas": ("date", "jornada"),
+    "subidasBajadas": ("date", "nombre", "variacion"),
+}
+
+WRITE_MODES = ("replace", "append", "upsert")
+
+# Tipos declarados por columna. Al escribir se convierten las columnas
+# declaradas ("int"/"float" a numérico, "date" a texto ISO YYYY-MM-DD), así
+# que la BD guarda siempre la misma representación venga el DataFrame del
+# extractor, de un CSV o de una lectura anterior — y las claves de
+# upsert_rows comparan 1 con 1, no con '1'. Al leer con
+# read_table(typed=True) se aplican una sola vez: "date" -> datetime64,
+# "category" -> category, "int" -> int64 (Int64 si hay nulos). "text" se
+# deja tal cual. Las columnas no declaradas no se tocan.
+_GAMEWEEK_INTS = (
+    "Jornada", "EquipoLocal", "ResultadoLocal", "EquipoVisitante", "ResultadoVisitante",
+    "EquipoJugador", "Posicion", "Puntos", "Suplente", "Cambio", "Goles", "Asistencias",
+    "GolPropia", "PenaltiMarcado", "PenaltiFallado", "PenaltiParado", "Amarilla", "Roja",
+)
+TABLE_SCHEMAS = {
+    "gameweek": {"Date": "date", "Manager": "text", "NombreJugador": "text",
+                 **{c: "int" for c in _GAMEWEEK_INTS}},
+    "clasificaciones": {"jornada": "int", "nombre": "text", "posicion": "int", "puntos": "int",
+                        "valor_equipo": "float"},
+    "quiniela": {"jornada": "int", "nombre": "text", "posicion": "int", "puntos": "int"},
+    "ganancias_clean": {"fecha": "date", "type": "category", "subtype": "category", "equipo": "text",
+                        "ganancias": "float", "jugador": "text", "compra-venta": "category"},
+    "jornadas": {"date": "date", "jornada": "int"},
+    "subidasBajadas": {"date": "date", "nombre": "text", "variacion": "float"},
+    "mercado": {"date": "date", "jugador": "text", "precio": "float"},
+}
+
+
+# Índices compuestos (temporada, *columnas) por tabla, según los filtros que
+# hace de verdad el pipeline: por jornada (gameweek, clasificaciones), por
+# fecha (ganancias_clean, mercado...), por manager y por jugador. Todos se
+# crean con IF NOT EXISTS en cada escritura (ensure_indexes), junto al de
+# temporada sola; las columnas que la tabla no tenga se saltan. Los tests
+# comprueban con EXPLAIN QUERY PLAN que esos filtros no recorren la tabla
+# entera.
+TABLE_INDEXES = {
+    "gameweek": [("Jornada",), ("Manager",), ("NombreJugador",)],
+    "clasificaciones": [("jornada",), ("nombre",)],
+    "quiniela": [("jornada",), ("nombre",)],
+    "ganancias": [("idTransfer",), ("date",)],
+    "ganancias_clean": [("fecha",), ("equipo",), ("jugador",)],
+    "ganancias_jugador": [("fecha",), ("jugador",)],
+    "clausulas_acuerdos": [("date",), ("jugador",)],
+    "mercado": [("date",), ("jugador",)],
+    "jornadas": [("date",)],
+    "subidasBajadas": [("date",), ("nombre",)],
+    "data_model": [("date",), ("jugador",)],
+}
+
+
+def ensure_indexes(conn: sqlite3.Connection, table: str) -> None:
+    """Crea (si no existen) el índice por temporada y los de TABLE_INDEXES."""
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_temporada ON {table}(temporada)")
+    existing = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+    for cols in TABLE_INDEXES.get(table, ()):
+        if all(c in existing for c in cols):
+            quoted = ", ".join(f'"{c}"' for c in cols)
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_{'_'.join(cols)} ON {table}(temporada, {quoted})"
+            )
+
 
 def known_tables() -> set:
     """Nombres de tabla derivados de config.yaml -> paths.csv.* (stem del archivo)."""
@@ -26,10 +107,91 @@ def get_db_path() -> Path:
     return get_base_dir() / db_path
 
 
+# Conexiones abiertas por (proceso, hilo, ruta de la BD). Abrir una
+# conexión nueva en cada read_table/write_table/table_exists cuesta más que
+# la propia consulta en las tablas pequeñas; así cada hilo reutiliza la
+# suya. La clave incluye el pid para que un proceso hijo (fork del pool de
+# run_extraction.py) no use la conexión heredada del padre.
+_connections: dict[tuple, sqlite3.Connection] = {}
+_connections_lock = threading.Lock()
+
+_DEFAULT_DB_SETTINGS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "mmap_size": 268435456,
+    "cache_size": -65536,
+    "busy_timeout": 5.0,
+    "read_cache": True,
+}
+
+
+def get_db_settings() -> dict:
+    """Pragmas de la BD (config.yaml -> database), con los valores por defecto."""
+    cfg = load_config(validate_env=False)
+    return {**_DEFAULT_DB_SETTINGS, **(cfg.get("database") or {})}
+
+
+def _open_connection(path: Path) -> sqlite3.Connection:
+    settings = get_db_settings()
+    # check_same_thread=False solo para que close_connections() pueda cerrar
+    # desde el hilo principal las conexiones de otros hilos: cada hilo sigue
+    # usando únicamente la suya.
+    conn = sqlite3.connect(path, timeout=float(settings["busy_timeout"]), check_same_thread=False)
+    # WAL: los lectores (regeneración de la web, dashboards) no bloquean al
+    # escritor de la extracción ni este a ellos. Con WAL, synchronous=NORMAL
+    # sigue siendo seguro ante caídas del proceso (solo una caída del SO
+    # puede perder la última transacción) y evita un fsync por commit.
+    conn.execute(f"PRAGMA journal_mode={settings['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous={settings['synchronous']}")
+    conn.execute(f"PRAGMA mmap_size={int(settings['mmap_size'])}")
+    conn.execute(f"PRAGMA cache_size={int(settings['cache_size'])}")
+    return conn
+
+
 def get_connection() -> sqlite3.Connection:
+    """Conexión a data/mister.db compartida por el hilo actual.
+
+    Se abre la primera vez con los pragmas de config.yaml -> database y se
+    reutiliza en las siguientes llamadas (si alguien la cerró, se abre otra).
+    `with get_connection() as conn:` sigue delimitando la transacción
+    (commit o rollback al salir), pero no cierra la conexión.
+    """
     path = get_db_path()
+    key = (os.getpid(), threading.get_ident(), str(path))
+    conn = _connections.get(key)
+    if conn is not None:
+        try:
+            conn.total_changes  # ProgrammingError si ya está cerrada
+            return conn
+        except sqlite3.ProgrammingError:
+            pass
     path.parent.mkdir(parents=True, exist_ok=True)
-    return sqlite3.connect(path)
+    conn = _open_connection(path)
+    with _connections_lock:
+        _connections[key] = conn
+    return conn
+
+
+def close_connections() -> None:
+    """Cierra las conexiones compartidas de este proceso.
+
+    Antes hace checkpoint del WAL para que todo lo escrito quede en el
+    propio mister.db (los workflows de CI hacen `git add data/mister.db`
+    sin los ficheros -wal/-shm). Se llama automáticamente al salir.
+    """
+    pid = os.getpid()
+    with _connections_lock:
+        keys = [k for k in _connections if k[0] == pid]
+        conns = [_connections.pop(k) for k in keys]
+    for conn in conns:
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+atexit.register(close_connections)
 
 
 def get_active_season() -> str:
@@ -44,21 +206,415 @@ def table_exists(conn: sqlite3.Connection, table: str) -> bool:
     return cur.fetchone() is not None
 
 
-def read_table(table: str, temporada: str | None = None) -> pd.DataFrame:
-    """Lee una tabla de la BD, opcionalmente filtrada por temporada.
+# ── Registro de cambios (CDC) ─────────────────────────────────────────────
+# write_table, prepend_rows, upsert_rows y shift_values apuntan cada
+# escritura en _changelog, en la misma transacción que la propia escritura:
+# tabla, temporada, operación, filas cambiadas y, en los upserts, las claves
+# (TABLE_KEYS) de las filas insertadas/actualizadas/borradas. `version` es
+# AUTOINCREMENT: crece siempre, aunque se borren entradas antiguas. Los
+# consumidores incrementales guardan la última versión que procesaron y
+# piden changes_since(version).
+CHANGELOG_TABLE = "_changelog"
 
-    Devuelve DataFrame vacío si la tabla todavía no existe (misma semántica
-    que safe_read_csv con un archivo inexistente).
+# Por encima de tantas claves una entrada no las guarda (claves=None, igual
+# que un replace: "toda la partición"). Una carga inicial de gameweek
+# serían miles de claves que ningún consumidor va a recorrer una a una.
+_CHANGELOG_MAX_KEYS = 1000
+
+
+def _record_change(conn: sqlite3.Connection, table: str, temporada: str, operacion: str, filas: int,
+                   claves: list | None = None) -> None:
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {CHANGELOG_TABLE} ("
+        f"version INTEGER PRIMARY KEY AUTOINCREMENT, tabla TEXT NOT NULL, temporada TEXT NOT NULL, "
+        f"operacion TEXT NOT NULL, filas INTEGER NOT NULL, claves TEXT, fecha TEXT NOT NULL)"
+    )
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS idx{CHANGELOG_TABLE}_tabla_temporada "
+        f"ON {CHANGELOG_TABLE}(tabla, temporada, version)"
+    )
+    if claves is not None and len(claves) > _CHANGELOG_MAX_KEYS:
+        claves = None
+    conn.execute(
+        f"INSERT INTO {CHANGELOG_TABLE} (tabla, temporada, operacion, filas, claves, fecha) "
+        f"VALUES (?, ?, ?, ?, ?, ?)",
+        (table, temporada, operacion, filas, None if claves is None else json.dumps(claves, ensure_ascii=False),
+         datetime.now(timezone.utc).isoformat(timespec="seconds")),
+    )
+
+
+def current_version() -> int:
+    """Última versión del registro de cambios (0 si todavía no hay ninguna)."""
+    with get_connection() as conn:
+        if not table_exists(conn, CHANGELOG_TABLE):
+            return 0
+        return conn.execute(f"SELECT COALESCE(MAX(version), 0) FROM {CHANGELOG_TABLE}").fetchone()[0]
+
+
+def changes_since(version: int, table: str | None = None, temporada: str | None = None) -> list[dict]:
+    """Escrituras registradas con versión > `version`, de la más antigua a la
+    más reciente, opcionalmente solo de una tabla y/o temporada.
+
+    Cada cambio es un dict con version, tabla, temporada, operacion
+    ("replace", "prepend", "upsert" o "update"), filas (las de la partición
+    nueva en un replace, las insertadas en un prepend, las cambiadas en un
+    upsert o un update),
+    claves y fecha (UTC). `claves`
+    es la lista de claves [valores de TABLE_KEYS/keys, en orden] que cambió
+    un upsert, o None si cambió toda la partición (replace) o no se conocen
+    (prepend, o demasiadas claves): el consumidor debe tratarla entera.
     """
+    with get_connection() as conn:
+        if not table_exists(conn, CHANGELOG_TABLE):
+            return []
+        conditions, params = ["version > ?"], [version]
+        if table is not None:
+            conditions.append("tabla = ?")
+            params.append(table)
+        if temporada is not None:
+            conditions.append("temporada = ?")
+            params.append(temporada)
+        cur = conn.execute(
+            f"SELECT version, tabla, temporada, operacion, filas, claves, fecha FROM {CHANGELOG_TABLE} "
+            f"WHERE {' AND '.join(conditions)} ORDER BY version",
+            params,
+        )
+        cols = [d[0] for d in cur.description]
+        changes = [dict(zip(cols, row)) for row in cur.fetchall()]
+    for change in changes:
+        change["claves"] = None if change["claves"] is None else json.loads(change["claves"])
+    return changes
+
+
+# ── Marcas de agua ────────────────────────────────────────────────────────
+# Estado de los procesos incrementales (hasta dónde procesaron, por
+# temporada), como JSON. Tabla interna: no sale en data_tables ni en los
+# exports, y escribir en ella no pasa por _changelog.
+WATERMARK_TABLE = "_watermarks"
+
+
+def get_watermark(nombre: str, temporada: str) -> dict | None:
+    """Marca de agua guardada por set_watermark, o None si no hay."""
+    with get_connection() as conn:
+        if not table_exists(conn, WATERMARK_TABLE):
+            return None
+        row = conn.execute(
+            f"SELECT valor FROM {WATERMARK_TABLE} WHERE nombre = ? AND temporada = ?", (nombre, temporada)
+        ).fetchone()
+    if row is None:
+        return None
+    try:
+        return json.loads(row[0])
+    except ValueError as e:
+        logger.warning(f"Marca de agua ilegible {nombre}/{temporada}, se ignora: {e}")
+        return None
+
+
+def set_watermark(nombre: str, temporada: str, valor: dict | None) -> None:
+    """Guarda (o con None, borra) la marca de agua de un proceso incremental."""
+    with get_connection() as conn:
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (nombre TEXT NOT NULL, temporada TEXT NOT NULL, "
+            f"valor TEXT NOT NULL, fecha TEXT NOT NULL, PRIMARY KEY (nombre, temporada))"
+        )
+        if valor is None:
+            conn.execute(f"DELETE FROM {WATERMARK_TABLE} WHERE nombre = ? AND temporada = ?", (nombre, temporada))
+        else:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {WATERMARK_TABLE} (nombre, temporada, valor, fecha) VALUES (?, ?, ?, ?)",
+                (nombre, temporada, json.dumps(valor, ensure_ascii=False),
+                 datetime.now(timezone.utc).isoformat(timespec="seconds")),
+            )
+        conn.commit()
+
+
+def data_tables(conn: sqlite3.Connection) -> list[str]:
+    """Tablas de datos de la BD (sin las internas: _changelog, staging...)."""
+    cur = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' "
+        "AND name NOT LIKE 'sqlite_%' AND name NOT LIKE '\\_%' ESCAPE '\\' ORDER BY name"
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def change_marker(table: str, temporada: str) -> str | None:
+    """Marcador de la partición (tabla, temporada): cambia cada vez que se
+    escribe en ella. None si la tabla no existe o la temporada no tiene filas.
+
+    Combina la última versión de la partición en _changelog con el nº de
+    filas y el rowid máximo, para detectar también las escrituras hechas
+    fuera de este módulo (conn.execute a mano, BDs anteriores al registro).
+    """
+    with get_connection() as conn:
+        if not table_exists(conn, table):
+            return None
+        filas, max_rowid = conn.execute(
+            f"SELECT COUNT(*), MAX(rowid) FROM {table} WHERE temporada = ?", (temporada,)
+        ).fetchone()
+        if not filas:
+            return None
+        version = 0
+        if table_exists(conn, CHANGELOG_TABLE):
+            version = conn.execute(
+                f"SELECT COALESCE(MAX(version), 0) FROM {CHANGELOG_TABLE} WHERE tabla = ? AND temporada = ?",
+                (table, temporada),
+            ).fetchone()[0]
+    return f"v{version}-n{filas}-r{max_rowid}"
+
+
+def _to_write_type(col: pd.Series, kind: str) -> pd.Series | None:
+    """`col` convertida a su tipo declarado para guardarla, o None si la
+    conversión perdería datos (valores no numéricos, decimales en una
+    columna entera, horas en una fecha...)."""
+    if kind in ("int", "float"):
+        num = pd.to_numeric(col, errors="coerce")
+        if (num.isna() & col.notna()).any():
+            return None
+        if kind == "float":
+            return num.astype("float64")
+        if (num.dropna() % 1 != 0).any():
+            return None
+        return num.astype("Int64") if num.isna().any() else num.astype("int64")
+    if kind == "date":
+        parsed = pd.to_datetime(col, errors="coerce")
+        valid = parsed.dropna()
+        if (parsed.isna() & col.notna()).any() or (valid != valid.dt.normalize()).any():
+            return None
+        return parsed.dt.strftime("%Y-%m-%d").astype(object).where(parsed.notna(), None)
+    return col
+
+
+def apply_schema(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Copia de `df` con las columnas declaradas en TABLE_SCHEMAS[table]
+    convertidas a su tipo de almacenamiento. Una columna que no se puede
+    convertir sin perder datos se deja como viene, con un warning."""
+    schema = TABLE_SCHEMAS.get(table)
+    if not schema:
+        return df
+    df = df.copy()
+    for col, kind in schema.items():
+        if col not in df.columns:
+            continue
+        converted = _to_write_type(df[col], kind)
+        if converted is None:
+            logger.warning(f"Tabla {table}: la columna {col} no se puede guardar como {kind}, se deja como viene.")
+        else:
+            df[col] = converted
+    return df
+
+
+def apply_read_types(df: pd.DataFrame, table: str, arrow: bool = False) -> pd.DataFrame:
+    """Aplica a `df` (leído de `table`) los tipos de TABLE_SCHEMAS.
+
+    Con `arrow` (df leído con read_table(arrow=True)) las columnas
+    numéricas ya vienen con su tipo Arrow y se dejan así; solo se
+    convierten fechas y categóricas.
+    """
+    for col, kind in TABLE_SCHEMAS.get(table, {}).items():
+        if col not in df.columns or (arrow and kind in ("int", "float")):
+            continue
+        try:
+            if kind == "date":
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+            elif kind == "category":
+                df[col] = df[col].astype("category")
+            elif kind == "int":
+                df[col] = df[col].astype("Int64" if df[col].isna().any() else "int64")
+            elif kind == "float":
+                df[col] = df[col].astype("float64")
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Tabla {table}: no se pudo leer {col} como {kind}: {e}")
+    return df
+
+
+def _where_sql(table: str, where: dict) -> tuple[list[str], list]:
+    """Condiciones SQL (y sus parámetros) para los predicados de read_table:
+
+        {"Manager": "Dani"}                 -> "Manager" = ?
+        {"Manager": ["Dani", "Bea"]}         -> "Manager" IN (?, ?)
+        {"Jornada": (10, 15)}                -> "Jornada" >= ? AND "Jornada" <= ?
+        {"Date": (date(2026, 10, 1), None)}  -> "Date" >= ?   (None = sin límite)
+
+    Las fechas se comparan como texto ISO, que es como se guardan las
+    columnas "date" (ver apply_schema).
+    """
+    schema = TABLE_SCHEMAS.get(table, {})
+    conditions, params = [], []
+
+    def _valor(col, v):
+        if schema.get(col) == "date" and isinstance(v, (date, datetime)):
+            return pd.Timestamp(v).strftime("%Y-%m-%d")
+        return _sql_value(v)
+
+    for col, cond in where.items():
+        if isinstance(cond, tuple):
+            lo, hi = cond
+            if lo is not None:
+                conditions.append(f'"{col}" >= ?')
+                params.append(_valor(col, lo))
+            if hi is not None:
+                conditions.append(f'"{col}" <= ?')
+                params.append(_valor(col, hi))
+        elif isinstance(cond, (list, set, frozenset)):
+            values = list(cond)
+            if not values:
+                conditions.append("0")
+                continue
+            conditions.append(f'"{col}" IN ({", ".join("?" * len(values))})')
+            params.extend(_valor(col, v) for v in values)
+        elif cond is None:
+            conditions.append(f'"{col}" IS NULL')
+        else:
+            conditions.append(f'"{col}" = ?')
+            params.append(_valor(col, cond))
+    return conditions, params
+
+
+def arrow_available() -> bool:
+    """True si pyarrow está instalado (dependencia opcional: lecturas
+    Arrow y export a Parquet)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _read_table(table: str, temporada: str | None, columns: list[str] | None, where: dict | None,
+                typed: bool, arrow: bool = False) -> pd.DataFrame:
     with get_connection() as conn:
         if not table_exists(conn, table):
             logger.warning(f"Tabla no encontrada, devolviendo vacío: {table}")
             return pd.DataFrame()
-        if temporada is None:
-            return pd.read_sql_query(f"SELECT * FROM {table}", conn)
-        return pd.read_sql_query(
-            f"SELECT * FROM {table} WHERE temporada = ?", conn, params=(temporada,)
-        )
+
+        select = "*"
+        if columns is not None or where:
+            # rowid: pseudocolumna con el orden de las tablas tipo feed (ver
+            # prepend_rows), para leerla o filtrar por ella.
+            table_cols = [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+            existing = set(table_cols) | {"rowid"}
+            if columns is not None:
+                # "*": todas las columnas de la tabla, p. ej. ["*", "rowid"]
+                columns = [c for col in columns for c in (table_cols if col == "*" else [col])]
+                missing = [c for c in columns if c not in existing]
+                if missing:
+                    logger.warning(f"Tabla {table}: columnas inexistentes ignoradas: {missing}")
+                columns = [c for c in columns if c in existing]
+                select = ", ".join(f'"{c}"' for c in columns)
+            if where and any(c not in existing for c in where):
+                logger.warning(f"Tabla {table}: filtro sobre columnas inexistentes, devolviendo vacío.")
+                return pd.DataFrame(columns=columns)
+            if not select:
+                return pd.DataFrame()
+
+        conditions, params = _where_sql(table, where or {})
+        if temporada is not None:
+            conditions.insert(0, "temporada = ?")
+            params.insert(0, temporada)
+        query = f"SELECT {select} FROM {table}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        # ORDER BY rowid: orden de inserción explícito. Las tablas tipo feed
+        # (ver prepend_rows) dependen de él y, con varios índices sobre
+        # temporada, SQLite podría recorrer otro y devolverlas desordenadas.
+        backend = {"dtype_backend": "pyarrow"} if arrow else {}
+        df = pd.read_sql_query(query + " ORDER BY rowid", conn, params=params, **backend)
+    return apply_read_types(df, table, arrow) if typed else df
+
+
+# ── Caché de lecturas ─────────────────────────────────────────────────────
+# Un mismo script puede leer varias veces las mismas tablas de temporada.
+# read_table guarda el último resultado de cada (tabla, temporada,
+# columnas, filtros) y lo da por bueno mientras no cambie:
+#   - el contador de escrituras de la tabla, que suben write_table,
+#     upsert_rows y prepend_rows (escrituras de este proceso), ni
+#   - PRAGMA data_version, que SQLite cambia cuando otra conexión (otro
+#     hilo u otro proceso) hace commit en la BD.
+# Las escrituras hechas a mano sobre la conexión (conn.execute) no avisan:
+# después hay que llamar a invalidate_read_cache().
+_READ_CACHE_MAX_ENTRIES = 32
+_read_cache: OrderedDict = OrderedDict()
+_table_versions: dict[tuple, int] = {}
+_read_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _bump_table_version(table: str) -> None:
+    key = (str(get_db_path()), table)
+    _table_versions[key] = _table_versions.get(key, 0) + 1
+
+
+def invalidate_read_cache() -> None:
+    """Vacía la caché de lecturas de read_table."""
+    _read_cache.clear()
+
+
+def read_cache_stats() -> dict:
+    """Aciertos y fallos de la caché de lecturas en este proceso."""
+    return dict(_read_cache_stats)
+
+
+def log_read_cache_stats() -> None:
+    """Loguea los aciertos de la caché de lecturas (al final de cada script)."""
+    hits, misses = _read_cache_stats["hits"], _read_cache_stats["misses"]
+    total = hits + misses
+    if total:
+        logger.info(f"🗃️ Caché de lecturas de BD: {hits}/{total} aciertos ({hits / total:.0%}).")
+
+
+def read_table(table: str, temporada: str | None = None, columns: list[str] | None = None,
+               where: dict | None = None, typed: bool = False, arrow: bool = False) -> pd.DataFrame:
+    """Lee una tabla de la BD, opcionalmente filtrada por temporada.
+
+    `columns`: solo esas columnas (SELECT de ellas, no SELECT *). Las que no
+    existen en la tabla se omiten con un warning.
+    `where`: predicados simples que se evalúan en SQLite, ver _where_sql
+    (igualdad, IN y rangos de jornada/fecha). Un predicado sobre una columna
+    inexistente no casa con ninguna fila.
+    Ambos admiten la pseudocolumna `rowid` (el orden de las tablas tipo
+    feed, ver prepend_rows); `columns=["*", "rowid"]` lee la tabla entera
+    con su rowid.
+    `typed`: aplica los tipos de TABLE_SCHEMAS (fechas a datetime64...).
+    `arrow`: columnas respaldadas por Arrow (dtype_backend="pyarrow") en vez
+    de numpy: texto sin objetos Python por celda y enteros con nulos sin
+    pasar a float, para los análisis sobre tablas grandes. Requiere pyarrow
+    (opcional); sin él se lee como siempre, con un warning.
+
+    Devuelve DataFrame vacío si la tabla todavía no existe (misma semántica
+    que safe_read_csv con un archivo inexistente).
+
+    Pasa por la caché de lecturas (config.yaml -> database.read_cache):
+    cada llamada devuelve su propia copia, así que modificarla no afecta a
+    las siguientes lecturas.
+    """
+    if arrow and not arrow_available():
+        logger.warning("pyarrow no está instalado: read_table(arrow=True) lee con numpy.")
+        arrow = False
+    if not get_db_settings()["read_cache"]:
+        return _read_table(table, temporada, columns, where, typed, arrow)
+
+    path = str(get_db_path())
+    key = (os.getpid(), threading.get_ident(), path, table, temporada,
+           tuple(columns) if columns is not None else None, repr(where) if where else None, typed, arrow)
+    token = (get_connection().execute("PRAGMA data_version").fetchone()[0],
+             _table_versions.get((path, table), 0))
+    entry = _read_cache.get(key)
+    if entry is not None and entry[0] == token:
+        _read_cache.move_to_end(key)
+        _read_cache_stats["hits"] += 1
+        return entry[1].copy()
+
+    _read_cache_stats["misses"] += 1
+    df = _read_table(table, temporada, columns, where, typed, arrow)
+    if len(df.columns):  # una tabla inexistente no se cachea
+        _read_cache[key] = (token, df.copy())
+        _read_cache.move_to_end(key)
+        while len(_read_cache) > _READ_CACHE_MAX_ENTRIES:
+            _read_cache.popitem(last=False)
+    return df
+
+
+class WriteError(RuntimeError):
+    """Una escritura de datos falló o se rechazó (p. ej. por la protección
+    contra encogimiento). La lanzan los guardados incrementales de
+    run_extraction.py para que "no había nada nuevo" (0) no se confunda con
+    "no se pudo guardar"; las funciones de este módulo siguen devolviendo
+    False/None."""
 
 
 # Si una tabla ya tiene al menos este número de filas para la temporada,
@@ -69,13 +625,21 @@ _SHRINK_GUARD_MIN_ROWS = 10
 _SHRINK_GUARD_MIN_KEEP_RATIO = 0.5
 
 
-def write_table(df: pd.DataFrame, table: str, temporada: str, allow_shrink: bool = False) -> bool:
-    """Sobreescribe las filas de una temporada en una tabla.
+def write_table(df: pd.DataFrame, table: str, temporada: str, allow_shrink: bool = False,
+                mode: str = "replace") -> bool:
+    """Escribe las filas de una temporada en una tabla.
+
+    mode="replace" (por defecto, el de las migraciones): sobreescribe la
+    temporada entera. Reproduce el patrón actual de los scripts (leer todo,
+    concatenar/deduplicar en pandas, sobreescribir el archivo entero) pero
+    acotado a la temporada, en vez de al fichero completo. Idempotente: se
+    puede volver a llamar sin duplicar filas.
 
-    Reproduce el patrón actual de los scripts (leer todo, concatenar/deduplicar
-    en pandas, sobreescribir el archivo entero) pero acotado a la temporada,
-    en vez de al fichero completo. Idempotente: se puede volver a llamar sin
-    duplicar filas.
+    mode="append" / "upsert": escritura incremental por la clave declarada
+    en TABLE_KEYS (ver upsert_rows). "append" solo añade las filas cuya
+    clave no está guardada (gana la guardada, como
+    drop_duplicates(keep="first") sobre viejo + nuevo); "upsert" además
+    actualiza las que sí lo están. No hace falta leer la tabla antes.
 
     Antes de borrar y reescribir, compara el tamaño del DataFrame nuevo contra
     las filas que ya existen para esa temporada. Si el nuevo trae sospechosamente
@@ -87,7 +651,19 @@ def write_table(df: pd.DataFrame, table: str, temporada: str, allow_shrink: bool
 
     Devuelve True si escribió, False si rechazó la escritura o falló.
     """
-    df = df.copy()
+    if mode not in WRITE_MODES:
+        logger.error(f"Modo de escritura desconocido '{mode}' para {table} (usa uno de {WRITE_MODES}).")
+        return False
+    _bump_table_version(table)
+    if mode != "replace":
+        keys = TABLE_KEYS.get(table)
+        if keys is None:
+            logger.error(f"Tabla {table} sin clave declarada en TABLE_KEYS: no admite mode='{mode}'.")
+            return False
+        return upsert_rows(df, table, temporada, keys, update=(mode == "upsert"),
+                           allow_shrink=allow_shrink) is not None
+
+    df = apply_schema(df, table).copy()
     df["temporada"] = temporada
     try:
         with get_connection() as conn:
@@ -111,15 +687,470 @@ def write_table(df: pd.DataFrame, table: str, temporada: str, allow_shrink: bool
                 )
                 return False
 
+            # Antes de to_sql, que hace commit al terminar: así el registro
+            # entra en la misma transacción que el borrado y la inserción.
+            _record_change(conn, table, temporada, "replace", len(df))
+            changes_before = conn.total_changes
             if table_exists(conn, table):
                 conn.execute(f"DELETE FROM {table} WHERE temporada = ?", (temporada,))
             df.to_sql(table, conn, if_exists="append", index=False)
-            conn.execute(
-                f"CREATE INDEX IF NOT EXISTS idx_{table}_temporada ON {table}(temporada)"
-            )
+            ensure_indexes(conn, table)
+            changed = conn.total_changes - changes_before
             conn.commit()
-        logger.info(f"Guardado en BD: tabla={table} temporada={temporada} filas={len(df)}")
+        logger.info(
+            f"Guardado en BD: tabla={table} temporada={temporada} filas={len(df)} cambiadas={changed}"
+        )
         return True
     except Exception as e:
         logger.error(f"Error al guardar tabla {table} (temporada={temporada}): {e}")
         return False
+
+
+def write_tables(dfs: dict[str, pd.DataFrame], temporada: str, allow_shrink: bool = False) -> bool:
+    """Como write_table(mode="replace") para varias tablas a la vez, en una
+    sola transacción: o se sustituyen todas las particiones de `temporada`
+    o ninguna (p. ej. las tres tablas que deriva run_preprocess.py de las
+    notificaciones, que nunca quedan a medias entre sí).
+
+    Las filas se insertan con executemany y no con to_sql, que hace commit
+    al terminar y partiría la transacción. La guardia contra escrituras
+    sospechosamente pequeñas se aplica a cada tabla: si alguna se rechaza,
+    no se escribe ninguna.
+
+    Devuelve True si escribió, False si rechazó la escritura o falló.
+    """
+    preparados = {}
+    for table, df in dfs.items():
+        _bump_table_version(table)
+        df = apply_schema(df, table).copy()
+        df["temporada"] = temporada
+        preparados[table] = df
+    try:
+        with get_connection() as conn:
+            existing_rows = {}
+            for table, df in preparados.items():
+                _ensure_table(conn, table, df)
+                existing_rows[table] = conn.execute(
+                    f"SELECT COUNT(*) FROM {table} WHERE temporada = ?", (temporada,)
+                ).fetchone()[0]
+
+            rechazadas = [
+                table for table, df in preparados.items()
+                if not allow_shrink
+                and existing_rows[table] >= _SHRINK_GUARD_MIN_ROWS
+                and len(df) < existing_rows[table] * _SHRINK_GUARD_MIN_KEEP_RATIO
+            ]
+            if rechazadas:
+                logger.error(
+                    f"Escritura rechazada: temporada={temporada}, {', '.join(rechazadas)} quedarían con menos "
+                    f"del {_SHRINK_GUARD_MIN_KEEP_RATIO:.0%} de sus filas. Probable fallo silencioso aguas "
+                    f"arriba; usa allow_shrink=True si es intencional. No se escribe ninguna tabla."
+                )
+                return False
+
+            for table, df in preparados.items():
+                _record_change(conn, table, temporada, "replace", len(df))
+                conn.execute(f"DELETE FROM {table} WHERE temporada = ?", (temporada,))
+                quoted = ", ".join(f'"{c}"' for c in df.columns)
+                conn.executemany(
+                    f"INSERT INTO {table} ({quoted}) VALUES ({', '.join('?' * len(df.columns))})",
+                    _sql_rows(df),
+                )
+            conn.commit()
+        logger.info(
+            f"Guardado en BD (una transacción): temporada={temporada} "
+            + ", ".join(f"{table}={len(df)}" for table, df in preparados.items())
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Error al guardar tablas {', '.join(dfs)} (temporada={temporada}): {e}")
+        return False
+
+
+# Límite de variables por sentencia de SQLite (999 en versiones antiguas).
+_MAX_SQL_VARS = 900
+
+
+def first_rowids(table: str, temporada: str, column: str, values) -> dict:
+    """{valor: rowid más bajo} de los `values` de `column` que ya existen en
+    la temporada. Con un índice sobre (temporada, column) cuesta
+    O(len(values)), no O(tabla).
+    """
+    values = list(dict.fromkeys(v for v in values if v is not None and not pd.isna(v)))
+    found = {}
+    with get_connection() as conn:
+        if not values or not table_exists(conn, table):
+            return found
+        for i in range(0, len(values), _MAX_SQL_VARS):
+            chunk = values[i:i + _MAX_SQL_VARS]
+            placeholders = ",".join("?" * len(chunk))
+            cur = conn.execute(
+                f"SELECT {column}, MIN(rowid) FROM {table} "
+                f"WHERE temporada = ? AND {column} IN ({placeholders}) GROUP BY {column}",
+                (temporada, *chunk),
+            )
+            found.update(cur.fetchall())
+    return found
+
+
+def _ensure_table(conn: sqlite3.Connection, table: str, df: pd.DataFrame) -> None:
+    """Crea `table` vacía con el esquema de `df` si no existe, le añade las
+    columnas de `df` que le falten y crea sus índices. Va antes de la
+    transacción de la escritura: to_sql hace commit al terminar, y crear la
+    tabla o añadirle columnas no cambia ningún dato."""
+    if not table_exists(conn, table):
+        df.iloc[:0].to_sql(table, conn, index=False)
+    existing = [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+    for col in df.columns:
+        if col not in existing:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN "{col}"')
+    ensure_indexes(conn, table)
+
+
+def _prepend(conn: sqlite3.Connection, df: pd.DataFrame, table: str, temporada: str,
+             replace_before_rowid: int | None) -> int | None:
+    """Borrado de la cabecera e inserción de prepend_rows dentro de la
+    transacción abierta en `conn`, sin commit. `df` ya viene con
+    apply_schema y la columna temporada. None si se rechaza."""
+    replaced = 0
+    if replace_before_rowid is not None:
+        replaced = conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE temporada = ? AND rowid < ?",
+            (temporada, replace_before_rowid),
+        ).fetchone()[0]
+    if replaced > len(df):
+        logger.error(
+            f"Inserción rechazada: tabla={table} temporada={temporada} sustituiría "
+            f"{replaced} filas por {len(df)}. Probable coincidencia con una fila antigua."
+        )
+        return None
+    if replaced:
+        conn.execute(
+            f"DELETE FROM {table} WHERE temporada = ? AND rowid < ?",
+            (temporada, replace_before_rowid),
+        )
+    if df.empty:
+        return 0
+
+    # rowids explícitos por debajo del mínimo actual, en el orden de df
+    min_rowid = conn.execute(f"SELECT MIN(rowid) FROM {table}").fetchone()[0]
+    start = 0 if min_rowid is None else min_rowid - len(df) - 1
+    quoted = ", ".join(f'"{c}"' for c in df.columns)
+    conn.executemany(
+        f"INSERT INTO {table} (rowid, {quoted}) VALUES ({', '.join('?' * (len(df.columns) + 1))})",
+        [(start + i, *fila) for i, fila in enumerate(_sql_rows(df), 1)],
+    )
+    _record_change(conn, table, temporada, "prepend", len(df))
+    return len(df)
+
+
+def prepend_rows(df: pd.DataFrame, table: str, temporada: str,
+                 replace_before_rowid: int | None = None) -> int | None:
+    """Inserta `df` delante de las filas existentes de una tabla tipo feed
+    (lo más reciente primero, como ganancias) sin leer ni reescribir el
+    resto de la tabla.
+
+    Las filas nuevas reciben rowids menores que el mínimo actual, en el
+    orden de `df`, así que read_table (ORDER BY rowid) las devuelve primero.
+    Con `replace_before_rowid`, antes se borran las filas de la temporada
+    con rowid menor (las que `df` sustituye: la cabecera del feed que ya se
+    había guardado). Si eso borrara más filas de las que se insertan, se
+    rechaza: el punto de corte sería una coincidencia antigua, no la
+    cabecera guardada. Borrado e inserción van en la misma transacción
+    (executemany, no to_sql, que hace commit al terminar).
+
+    Las búsquedas de first_rowids usan el índice (temporada, columna) de
+    TABLE_INDEXES (ganancias: idTransfer).
+
+    Devuelve el nº de filas insertadas (0 si no había nada que insertar), o
+    None si se rechazó o falló — como upsert_rows.
+    """
+    if df.empty:
+        return 0
+    _bump_table_version(table)
+    df = apply_schema(df, table).copy()
+    df["temporada"] = temporada
+    try:
+        with get_connection() as conn:
+            _ensure_table(conn, table, df)
+            if _prepend(conn, df, table, temporada, replace_before_rowid) is None:
+                conn.rollback()
+                return None
+            conn.commit()
+        logger.info(f"Añadidas al principio en BD: tabla={table} temporada={temporada} filas={len(df)}")
+        return len(df)
+    except Exception as e:
+        logger.error(f"Error al añadir filas a {table} (temporada={temporada}): {e}")
+        return None
+
+
+def prepend_tables(dfs: dict[str, tuple[pd.DataFrame, int | None]], temporada: str,
+                   shifts: dict[str, tuple[str, int, int | None]] | None = None) -> bool:
+    """Como prepend_rows (y shift_values) para varias tablas a la vez, en una
+    sola transacción: o se sustituyen todas las cabeceras y se aplican todos
+    los desplazamientos, o nada (p. ej. las tres tablas que actualiza el
+    preprocesado incremental, que nunca quedan a medias entre sí).
+
+    `dfs`: {tabla: (df, replace_before_rowid)}, como en prepend_rows; un df
+    vacío no inserta nada, así que si tuviera que sustituir filas se
+    rechaza. `shifts`: {tabla: (columna, delta, from_rowid)}, como en
+    shift_values. Si alguna cabecera se rechaza, no se escribe ninguna.
+
+    Devuelve True si escribió, False si rechazó la escritura o falló.
+    """
+    shifts = {table: shift for table, shift in (shifts or {}).items() if shift[1]}
+    preparados = {}
+    for table, (df, corte) in dfs.items():
+        _bump_table_version(table)
+        df = apply_schema(df, table).copy()
+        df["temporada"] = temporada
+        preparados[table] = (df, corte)
+    for table in shifts:
+        _bump_table_version(table)
+    try:
+        with get_connection() as conn:
+            # Sin filas y sin tabla no hay nada que insertar ni que sustituir
+            preparados = {table: (df, corte) for table, (df, corte) in preparados.items()
+                          if not df.empty or table_exists(conn, table)}
+            for table, (df, _) in preparados.items():
+                _ensure_table(conn, table, df)
+
+            for table, (df, corte) in preparados.items():
+                if _prepend(conn, df, table, temporada, corte) is None:
+                    conn.rollback()
+                    logger.error(f"No se escribe ninguna tabla de {', '.join(dfs)} (temporada={temporada}).")
+                    return False
+            for table, (column, delta, from_rowid) in shifts.items():
+                _shift(conn, table, temporada, column, delta, from_rowid)
+            conn.commit()
+        logger.info(
+            f"Añadidas al principio en BD (una transacción): temporada={temporada} "
+            + ", ".join(f"{table}={len(df)}" for table, (df, _) in preparados.items())
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Error al añadir filas a {', '.join(dfs)} (temporada={temporada}): {e}")
+        return False
+
+
+def rowid_at(table: str, temporada: str, position: int) -> int | None:
+    """rowid de la fila nº `position` (desde 0, en el orden de read_table)
+    de la temporada; si tiene `position` filas o menos, uno más que el
+    último. None si la tabla no existe o la temporada no tiene filas.
+
+    Es el punto de corte de prepend_rows(replace_before_rowid=...) para
+    sustituir las `position` primeras filas.
+    """
+    with get_connection() as conn:
+        if not table_exists(conn, table):
+            return None
+        row = conn.execute(
+            f"SELECT rowid FROM {table} WHERE temporada = ? ORDER BY rowid LIMIT 1 OFFSET ?",
+            (temporada, position),
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        last = conn.execute(f"SELECT MAX(rowid) FROM {table} WHERE temporada = ?", (temporada,)).fetchone()[0]
+    return None if last is None else last + 1
+
+
+def _shift(conn: sqlite3.Connection, table: str, temporada: str, column: str, delta: int,
+           from_rowid: int | None) -> int:
+    """UPDATE de shift_values dentro de la transacción abierta en `conn`,
+    sin commit."""
+    conditions, params = ["temporada = ?"], [temporada]
+    if from_rowid is not None:
+        conditions.append("rowid >= ?")
+        params.append(from_rowid)
+    changed = conn.execute(
+        f'UPDATE {table} SET "{column}" = "{column}" + ? WHERE {" AND ".join(conditions)}',
+        (delta, *params),
+    ).rowcount
+    _record_change(conn, table, temporada, "update", changed)
+    return changed
+
+
+def shift_values(table: str, temporada: str, column: str, delta: int, from_rowid: int | None = None) -> int:
+    """Suma `delta` a `column` en las filas de la temporada con rowid >=
+    `from_rowid` (todas si es None), con un UPDATE en SQLite sin leer la
+    tabla. Devuelve el nº de filas cambiadas (0 si falló).
+    """
+    if not delta:
+        return 0
+    _bump_table_version(table)
+    try:
+        with get_connection() as conn:
+            if not table_exists(conn, table):
+                return 0
+            changed = _shift(conn, table, temporada, column, delta, from_rowid)
+            conn.commit()
+        logger.info(f"Actualizado en BD: tabla={table} temporada={temporada} {column}+={delta} filas={changed}")
+        return changed
+    except Exception as e:
+        logger.error(f"Error al actualizar {column} en {table} (temporada={temporada}): {e}")
+        return 0
+
+
+def _sql_value(v):
+    """Valor nativo para sqlite3, con la misma representación que usa
+    pandas.to_sql (NaN/NaT -> NULL, fechas como texto ISO)."""
+    if v is None or v is pd.NaT or v is pd.NA:
+        return None
+    if isinstance(v, (date, datetime)):  # incluye pd.Timestamp
+        return str(v)
+    if hasattr(v, "item"):  # escalares de numpy
+        v = v.item()
+    if isinstance(v, float) and v != v:
+        return None
+    return v
+
+
+def _sql_rows(df: pd.DataFrame) -> list[tuple]:
+    """Filas de `df` como tuplas de tipos nativos para executemany.
+
+    Por columnas: los nulos pasan a None de golpe, y astype(object) ya da
+    int/float/bool de Python en las numéricas; solo lo que no es nativo
+    (fechas, escalares de numpy en columnas object) pasa por _sql_value.
+    """
+    columnas = []
+    for _, col in df.items():
+        valores = col.astype(object).where(col.notna(), None).tolist()
+        if col.dtype.kind not in "biuf":
+            valores = [v if type(v) in _NATIVOS else _sql_value(v) for v in valores]
+        columnas.append(valores)
+    return list(zip(*columnas))
+
+
+_NATIVOS = {str, int, float, bool, type(None)}
+
+
+def _ensure_unique_key(conn: sqlite3.Connection, table: str, key_cols: tuple) -> None:
+    """Crea el índice UNIQUE sobre `key_cols` ("temporada", *clave) si no
+    existe. Si la tabla viene de escrituras completas anteriores y tiene
+    claves repetidas, antes se queda con la primera fila de cada clave (como
+    drop_duplicates(keep="first")). Ese borrado queda en _changelog (un
+    "upsert" por temporada con las claves afectadas) y va en la transacción
+    de quien llama, así que su guardia de tamaño también lo cuenta."""
+    name = f"ux_{table}_{'_'.join(key_cols[1:])}"
+    cols = ", ".join(key_cols)
+    try:
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table}({cols})")
+    except sqlite3.IntegrityError:
+        borradas = conn.execute(
+            f"DELETE FROM {table} WHERE rowid NOT IN (SELECT MIN(rowid) FROM {table} GROUP BY {cols}) "
+            f"RETURNING {cols}"
+        ).fetchall()
+        logger.warning(f"Tabla {table}: eliminadas {len(borradas)} filas con clave repetida para crear {name}.")
+        por_temporada: dict[str, list] = {}
+        for temporada, *clave in borradas:
+            por_temporada.setdefault(temporada, []).append(tuple(clave))
+        for temporada, claves in por_temporada.items():
+            _record_change(conn, table, temporada, "upsert", len(claves), [list(k) for k in dict.fromkeys(claves)])
+        conn.execute(f"CREATE UNIQUE INDEX {name} ON {table}({cols})")
+
+
+def upsert_rows(df: pd.DataFrame, table: str, temporada: str, keys: tuple, update: bool = True,
+                replace_scope: str | None = None, allow_shrink: bool = False) -> int | None:
+    """Inserta o actualiza las filas de `df` por su clave natural, sin tocar
+    el resto de la temporada.
+
+    La clave (temporada, *keys) se declara como índice UNIQUE (se crea si no
+    existe) y las filas se escriben con `INSERT ... ON CONFLICT` en una sola
+    transacción: con `update=True` la fila nueva sustituye a la guardada
+    (DO UPDATE, solo si cambia algún valor), con `update=False` gana la
+    guardada (DO NOTHING). Las claves cambiadas quedan en _changelog.
+
+    `replace_scope`: columna de la clave cuyos valores presentes en `df` se
+    reemplazan enteros — las filas guardadas con ese valor que no vienen en
+    `df` se borran (ej. clasificaciones: una jornada re-extraída sustituye a
+    la anterior completa).
+
+    Misma guardia que write_table: si la temporada tenía >= 10 filas y tras
+    la escritura quedaría con menos de la mitad, se deshace todo.
+
+    Devuelve el nº de filas cambiadas (insertadas + actualizadas + borradas)
+    o None si rechazó la escritura o falló.
+    """
+    if df.empty:
+        return 0
+    _bump_table_version(table)
+    df = apply_schema(df, table).copy()
+    df["temporada"] = temporada
+    key_cols = ("temporada", *keys)
+    try:
+        with get_connection() as conn:
+            _ensure_table(conn, table, df)
+            # Antes de _ensure_unique_key: si tiene que deduplicar, esas
+            # filas también cuentan para la guardia de tamaño.
+            existing_rows = conn.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE temporada = ?", (temporada,)
+            ).fetchone()[0]
+            _ensure_unique_key(conn, table, key_cols)
+            changes_before = conn.total_changes
+
+            # RETURNING de las claves en cada sentencia: son las filas que
+            # de verdad se borraron/insertaron/actualizaron, para _changelog.
+            returning = "RETURNING " + ", ".join(f'"{k}"' for k in keys)
+            affected = []
+            other_keys = [k for k in keys if k != replace_scope]
+            if replace_scope is not None and other_keys:
+                fila = "(" + ", ".join("?" * len(other_keys)) + ")"
+                for valor, grupo in df.groupby(replace_scope, sort=False):
+                    keep = _sql_rows(grupo[other_keys].drop_duplicates())
+                    affected += conn.execute(
+                        f"DELETE FROM {table} WHERE temporada = ? AND {replace_scope} = ? "
+                        f"AND ({', '.join(other_keys)}) NOT IN (VALUES {', '.join([fila] * len(keep))}) "
+                        f"{returning}",
+                        (temporada, _sql_value(valor), *[v for row in keep for v in row]),
+                    ).fetchall()
+
+            cols = list(df.columns)
+            quoted = ", ".join(f'"{c}"' for c in cols)
+            values = [c for c in cols if c not in key_cols]
+            if update and values:
+                sets = ", ".join(f'"{c}" = excluded."{c}"' for c in values)
+                # Solo si algo cambia: reescribir una fila idéntica no es un
+                # cambio (ni para total_changes ni para el registro).
+                current = ", ".join(f'"{c}"' for c in values)
+                incoming = ", ".join(f'excluded."{c}"' for c in values)
+                conflict = f"DO UPDATE SET {sets} WHERE ({current}) IS NOT ({incoming})"
+            else:
+                conflict = "DO NOTHING"
+            rows = _sql_rows(df)
+            per_statement = max(1, _MAX_SQL_VARS // len(cols))
+            fila = "(" + ", ".join("?" * len(cols)) + ")"
+            for i in range(0, len(rows), per_statement):
+                chunk = rows[i:i + per_statement]
+                affected += conn.execute(
+                    f"INSERT INTO {table} ({quoted}) VALUES {', '.join([fila] * len(chunk))} "
+                    f"ON CONFLICT({', '.join(key_cols)}) {conflict} {returning}",
+                    [v for row in chunk for v in row],
+                ).fetchall()
+            changed = conn.total_changes - changes_before
+
+            final_rows = conn.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE temporada = ?", (temporada,)
+            ).fetchone()[0]
+            if (
+                not allow_shrink
+                and existing_rows >= _SHRINK_GUARD_MIN_ROWS
+                and final_rows < existing_rows * _SHRINK_GUARD_MIN_KEEP_RATIO
+            ):
+                conn.rollback()
+                logger.error(
+                    f"Escritura rechazada: tabla={table} temporada={temporada} pasaría de "
+                    f"{existing_rows} a {final_rows} filas (< {_SHRINK_GUARD_MIN_KEEP_RATIO:.0%}). "
+                    f"Probable fallo silencioso aguas arriba; usa allow_shrink=True si es intencional."
+                )
+                return None
+            if changed:
+                claves = [list(k) for k in dict.fromkeys(affected)]
+                _record_change(conn, table, temporada, "upsert", changed, claves)
+            conn.commit()
+        logger.info(
+            f"Upsert en BD: tabla={table} temporada={temporada} filas={len(df)} cambiadas={changed}"
+        )
+        return changed
+    except Exception as e:
+        logger.error(f"Error en upsert de {table} (temporada={temporada}): {e}")
+        return None
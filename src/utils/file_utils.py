@@ -1,5 +1,6 @@
 import json
 import os
+from datetime import date, datetime
 from pathlib import Path
 
 import pandas as pd
@@ -7,6 +8,7 @@ import logging
 from PIL import Image
 
 from src.utils import db as db_utils
+from src.utils import html_archive
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +24,14 @@ def _resolve_table_name(path: str):
     stem = Path(path).stem
     return stem if stem in _known_tables_cache else None
 
-def safe_read_html(path: str):
-    """Lee un archivo HTML si existe; de lo contrario, devuelve None."""
+def safe_read_html(path: str, fecha: str | None = None):
+    """Lee un archivo HTML si existe; de lo contrario, devuelve None.
+
+    Con `fecha` (YYYY-MM-DD) no lee `path` sino la captura archivada de esa
+    sección (mismo nombre de archivo) de ese día, ver html_archive.py.
+    """
+    if fecha is not None:
+        return html_archive.leer_html_archivado(Path(path).name, fecha)
     if not os.path.exists(path):
         logger.warning(f"No se encontró el HTML: {path}")
         return None
@@ -35,39 +43,92 @@ def safe_read_html(path: str):
         return None
 
 
-def safe_read_csv(path: str):
+def _filtrar(df: pd.DataFrame, where: dict) -> pd.DataFrame:
+    """Los mismos predicados que db.read_table(where=...), en pandas, para
+    los CSV en disco."""
+    mask = pd.Series(True, index=df.index)
+    for col, cond in where.items():
+        if col not in df.columns:
+            return df.iloc[0:0]
+        serie = df[col]
+        valores = [v for v in (cond if isinstance(cond, (tuple, list, set, frozenset)) else [cond])
+                   if v is not None]
+        if any(isinstance(v, (date, datetime)) for v in valores):
+            serie = pd.to_datetime(serie, errors="coerce")
+        if isinstance(cond, tuple):
+            lo, hi = (pd.Timestamp(v) if isinstance(v, (date, datetime)) else v for v in cond)
+            if lo is not None:
+                mask &= serie >= lo
+            if hi is not None:
+                mask &= serie <= hi
+        elif isinstance(cond, (list, set, frozenset)):
+            mask &= serie.isin(list(cond))
+        elif cond is None:
+            mask &= serie.isna()
+        else:
+            mask &= serie == cond
+    return df[mask]
+
+
+def safe_read_csv(path: str, columns: list[str] | None = None, where: dict | None = None,
+                  typed: bool = False):
     """Lee los datos de `path`. Si corresponde a una tabla de temporada
     conocida, lee de la BD (data/mister.db) filtrado por la temporada activa;
-    si no, lee el CSV en disco. Devuelve DataFrame vacío si no hay datos."""
+    si no, lee el CSV en disco. Devuelve DataFrame vacío si no hay datos.
+
+    `columns`, `where` y `typed` como en db.read_table: en la BD se resuelven
+    en la consulta; en un CSV en disco, después de leerlo."""
     table = _resolve_table_name(path)
     if table:
-        return db_utils.read_table(table, temporada=db_utils.get_active_season())
+        return db_utils.read_table(table, temporada=db_utils.get_active_season(),
+                                   columns=columns, where=where, typed=typed)
 
     if not os.path.exists(path):
         logger.warning(f"CSV no encontrado, creando vacío: {path}")
         return pd.DataFrame()
     try:
-        return pd.read_csv(path)
+        df = pd.read_csv(path)
     except Exception as e:
         logger.error(f"Error al leer CSV {path}: {e}")
         return pd.DataFrame()
+    if where:
+        df = _filtrar(df, where).reset_index(drop=True)
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return db_utils.apply_read_types(df, Path(path).stem) if typed else df
 
 
-def safe_save_csv(df: pd.DataFrame, path: str):
+def safe_save_csv(df: pd.DataFrame, path: str, mode: str = "replace") -> bool:
     """Guarda `df` en los datos de `path`. Si corresponde a una tabla de
     temporada conocida, guarda en la BD (data/mister.db) etiquetado con la
-    temporada activa; si no, guarda el CSV en disco."""
+    temporada activa; si no, guarda el CSV en disco.
+
+    `mode` como en db.write_table: "replace" sobreescribe; "append" y
+    "upsert" añaden/actualizan por la clave de db.TABLE_KEYS. Sobre un CSV
+    en disco se emulan leyendo el archivo y deduplicando por esa clave (o
+    por todas las columnas si la tabla no declara clave).
+
+    Devuelve True si guardó, False si la escritura se rechazó o falló (ya
+    registrado en el log)."""
     table = _resolve_table_name(path)
     if table:
-        db_utils.write_table(df, table, temporada=db_utils.get_active_season())
-        return
+        return db_utils.write_table(df, table, temporada=db_utils.get_active_season(), mode=mode)
+
+    if mode != "replace" and os.path.exists(path):
+        viejo = safe_read_csv(path)
+        combinado = pd.concat([viejo, df], ignore_index=True)
+        keys = list(db_utils.TABLE_KEYS.get(Path(path).stem, combinado.columns))
+        repetidas = combinado[keys].astype(str).duplicated(keep="first" if mode == "append" else "last")
+        df = combinado[~repetidas].reset_index(drop=True)
 
     try:
         os.makedirs(os.path.dirname(path), exist_ok=True)
         df.to_csv(path, index=False)
         logger.info(f"💾 Guardado CSV: {path}")
+        return True
     except Exception as e:
         logger.error(f"Error al guardar CSV {path}: {e}")
+        return False
 
 
 def safe_read_json(path: str):
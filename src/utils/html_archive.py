@@ -0,0 +1,121 @@
+"""
+html_archive.py — Archivo histórico de los HTML scrapeados.
+
+`guardar_html` sobreescribe `data/raw/*.html` en cada ejecución, así que sin
+esto no hay forma de volver a extraer un día pasado sin re-scrapear. Cada
+página capturada se guarda además comprimida (gzip) bajo su hash de
+contenido, y cada día tiene un manifiesto con qué hash corresponde a cada
+sección:
+
+    data/raw/archive/
+    ├── objects/ab/ab12…ef.html.gz        ← una vez por contenido distinto
+    └── manifests/2026-10-18.json         ← [{fecha, seccion, hash, size, hora}, ...]
+
+Si la página es byte a byte idéntica a una captura anterior, el objeto ya
+existe y no se vuelve a escribir (solo se apunta en el manifiesto del día).
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from src.utils.config_loader import get_base_dir, load_config
+
+logger = logging.getLogger(__name__)
+
+# El scraper puede guardar varias secciones a la vez desde hilos distintos
+# (scraper.concurrency > 1); el manifiesto del día es un único JSON que se
+# lee y reescribe, así que las actualizaciones se serializan.
+_manifest_lock = threading.Lock()
+
+
+def get_archive_dir() -> Path:
+    """Raíz del archivo: <data.raw_dir>/archive."""
+    cfg = load_config(validate_env=False)
+    return get_base_dir() / cfg.get("data", {}).get("raw_dir", "data/raw") / "archive"
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 hex del HTML (utf-8)."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _object_path(archive_dir: Path, digest: str) -> Path:
+    return archive_dir / "objects" / digest[:2] / f"{digest}.html.gz"
+
+
+def _manifest_path(archive_dir: Path, fecha: str) -> Path:
+    return archive_dir / "manifests" / f"{fecha}.json"
+
+
+def read_manifest(fecha: str, archive_dir: Path | None = None) -> list[dict]:
+    """Entradas del manifiesto de `fecha` (YYYY-MM-DD); lista vacía si no hay."""
+    archive_dir = archive_dir or get_archive_dir()
+    path = _manifest_path(archive_dir, fecha)
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def archivar_html(content: str, seccion: str, archive_dir: Path | None = None,
+                  fecha: str | None = None) -> str:
+    """Guarda `content` comprimido bajo su hash y lo apunta en el manifiesto
+    del día para `seccion` (nombre del archivo, ej. "mercado.html").
+
+    Devuelve el hash. Si ese contenido ya estaba archivado no reescribe el
+    objeto.
+    """
+    archive_dir = archive_dir or get_archive_dir()
+    ahora = datetime.now()
+    fecha = fecha or ahora.date().isoformat()
+    data = content.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+
+    obj = _object_path(archive_dir, digest)
+    if obj.exists():
+        logger.info("🗃️ %s idéntico a una captura anterior (%s…), no se reescribe.", seccion, digest[:12])
+    else:
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        tmp = obj.with_suffix(".tmp")
+        with gzip.open(tmp, "wb") as f:
+            f.write(data)
+        tmp.replace(obj)
+        logger.info("🗃️ Archivado %s (%d bytes → %d comprimido)", seccion, len(data), obj.stat().st_size)
+
+    with _manifest_lock:
+        entries = read_manifest(fecha, archive_dir)
+        entries.append({
+            "fecha": fecha,
+            "seccion": seccion,
+            "hash": digest,
+            "size": len(data),
+            "hora": ahora.strftime("%H:%M:%S"),
+        })
+        path = _manifest_path(archive_dir, fecha)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2)
+
+    return digest
+
+
+def leer_html_archivado(seccion: str, fecha: str, archive_dir: Path | None = None) -> str | None:
+    """HTML de `seccion` capturado en `fecha` (la última captura de ese día),
+    o None si no hay captura archivada."""
+    archive_dir = archive_dir or get_archive_dir()
+    entries = [e for e in read_manifest(fecha, archive_dir) if e.get("seccion") == seccion]
+    if not entries:
+        logger.warning(f"No hay captura archivada de {seccion} para {fecha}")
+        return None
+    obj = _object_path(archive_dir, entries[-1]["hash"])
+    try:
+        with gzip.open(obj, "rb") as f:
+            return f.read().decode("utf-8")
+    except Exception as e:
+        logger.error(f"Error al leer HTML archivado {obj}: {e}")
+        return None
@@ -0,0 +1,48 @@
+"""
+html_parsing.py — Construcción del árbol HTML que usan los extractores de src/data/.
+
+Todos los extractores trabajan con la API de BeautifulSoup (find, find_all,
+select...), así que el backend de parseo se cambia por debajo sin tocar
+ninguno: `html.parser` (stdlib, el de siempre) o `lxml` (mucho más rápido en
+el HTML del dashboard tras 60 scrolls). Se elige en
+config.yaml -> parsing.backend; si lxml no está instalado se cae a
+html.parser con un warning en vez de romper la extracción.
+"""
+
+import logging
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from src.utils.config_loader import load_config
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("html.parser", "lxml")
+DEFAULT_BACKEND = "html.parser"
+
+
+def get_parser_backend() -> str:
+    """Backend configurado en config.yaml -> parsing.backend (html.parser por defecto)."""
+    cfg = load_config(validate_env=False)
+    backend = cfg.get("parsing", {}).get("backend", DEFAULT_BACKEND)
+    if backend not in BACKENDS:
+        logger.warning(f"Backend de parseo desconocido '{backend}', usando {DEFAULT_BACKEND}.")
+        return DEFAULT_BACKEND
+    return backend
+
+
+def parse_html(html: "str | BeautifulSoup | None", backend: str | None = None) -> BeautifulSoup:
+    """Parsea `html` con el backend indicado (o el de config.yaml).
+
+    Si `html` ya es un árbol parseado (ver src/data/extraction_context.py),
+    se devuelve tal cual: así los extractores aceptan indistintamente el
+    texto o el documento compartido sin volver a parsearlo.
+    """
+    if isinstance(html, BeautifulSoup):
+        return html
+    backend = backend or get_parser_backend()
+    try:
+        return BeautifulSoup(html or "", backend)
+    except FeatureNotFound:
+        logger.warning(f"Backend '{backend}' no disponible (¿falta instalarlo?), usando {DEFAULT_BACKEND}.")
+        return BeautifulSoup(html or "", DEFAULT_BACKEND)
@@ -0,0 +1,141 @@
+"""
+parquet_export.py — Export columnar de data/mister.db a Parquet.
+
+Para los análisis que recorren temporadas enteras (notebooks de eda/,
+dashboards) leer Parquet es mucho más barato que consultar SQLite fila a
+fila: columnas tipadas, comprimidas y que se pueden leer por separado. El
+export se particiona por tabla y temporada, al estilo Hive, así que
+pd.read_parquet("data/export/parquet/tabla=ganancias") devuelve todas las
+temporadas de la tabla, con la columna `temporada` sacada de la ruta:
+
+    data/export/parquet/tabla=ganancias/temporada=2025-26/part.parquet
+    data/export/parquet/_manifest.json
+
+Es incremental por partición: `_manifest.json` guarda el marcador de
+cambios de cada (tabla, temporada) que se exportó (db.change_marker), y
+solo se reescriben las particiones cuyo marcador ha cambiado desde
+entonces. Las particiones que ya no existen en la BD se borran.
+
+Requiere pyarrow (dependencia opcional); sin él no se exporta nada.
+"""
+
+import json
+import logging
+import shutil
+from pathlib import Path
+
+from src.utils import db as db_utils
+from src.utils.config_loader import get_base_dir, load_config
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "_manifest.json"
+
+
+def get_export_dir() -> Path:
+    """Directorio del export (config.yaml -> export.parquet_dir)."""
+    cfg = load_config(validate_env=False)
+    return get_base_dir() / (cfg.get("export") or {}).get("parquet_dir", "data/export/parquet")
+
+
+def partition_dir(out_dir: Path, table: str, temporada: str) -> Path:
+    return out_dir / f"tabla={table}" / f"temporada={temporada}"
+
+
+def _load_manifest(out_dir: Path) -> dict:
+    path = out_dir / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Manifest ilegible {path}, se reexporta todo: {e}")
+        return {}
+
+
+def _save_manifest(out_dir: Path, manifest: dict) -> None:
+    tmp = out_dir / f"{MANIFEST_NAME}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(out_dir / MANIFEST_NAME)
+
+
+def _partitions(temporada: str | None) -> list[tuple[str, str]]:
+    """(tabla, temporada) de todas las particiones con filas en la BD."""
+    partitions = []
+    with db_utils.get_connection() as conn:
+        for table in db_utils.data_tables(conn):
+            if table in db_utils._EXCLUDED_TABLES:
+                continue
+            cols = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+            if "temporada" not in cols:
+                continue
+            if temporada is not None:
+                seasons = [temporada]
+            else:
+                seasons = [r[0] for r in conn.execute(f"SELECT DISTINCT temporada FROM {table}")]
+            partitions.extend((table, t) for t in seasons if t is not None)
+    return partitions
+
+
+def export_parquet(out_dir: Path | None = None, temporada: str | None = None,
+                   full: bool = False) -> dict | None:
+    """Exporta a Parquet las particiones (tabla, temporada) que han cambiado.
+
+    `temporada`: solo esa temporada (por defecto, todas las de la BD).
+    `full`: reescribe todas las particiones aunque no hayan cambiado.
+
+    Devuelve {"exportadas": [...], "sin_cambios": [...], "borradas": [...]}
+    con las particiones como "tabla/temporada", o None si falta pyarrow.
+    """
+    if not db_utils.arrow_available():
+        logger.error("❌ Export a Parquet no disponible: instala pyarrow (dependencia opcional).")
+        return None
+
+    out_dir = Path(out_dir or get_export_dir())
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(out_dir)
+    result = {"exportadas": [], "sin_cambios": [], "borradas": []}
+
+    vivas = set()
+    for table, season in _partitions(temporada):
+        name = f"{table}/{season}"
+        marker = db_utils.change_marker(table, season)
+        if marker is None:
+            continue
+        vivas.add(name)
+        dest = partition_dir(out_dir, table, season) / "part.parquet"
+        if not full and manifest.get(name) == marker and dest.exists():
+            result["sin_cambios"].append(name)
+            continue
+
+        df = db_utils.read_table(table, temporada=season, typed=True, arrow=True)
+        df = df.drop(columns=["temporada"], errors="ignore")
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_suffix(".tmp")
+        try:
+            df.to_parquet(tmp, index=False)
+            tmp.replace(dest)
+        except Exception as e:
+            logger.error(f"Error al exportar {name} a Parquet: {e}")
+            tmp.unlink(missing_ok=True)
+            continue
+        manifest[name] = marker
+        result["exportadas"].append(name)
+
+    # Particiones exportadas antes que ya no tienen filas en la BD (solo
+    # dentro del alcance de esta ejecución: con `temporada`, las de otras
+    # temporadas no se tocan).
+    for name in sorted(manifest):
+        table, season = name.split("/", 1)
+        if name in vivas or (temporada is not None and season != temporada):
+            continue
+        shutil.rmtree(partition_dir(out_dir, table, season), ignore_errors=True)
+        del manifest[name]
+        result["borradas"].append(name)
+
+    _save_manifest(out_dir, manifest)
+    logger.info(
+        f"📦 Export Parquet en {out_dir}: {len(result['exportadas'])} exportadas, "
+        f"{len(result['sin_cambios'])} sin cambios, {len(result['borradas'])} borradas."
+    )
+    return result
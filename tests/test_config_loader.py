@@ -1,12 +1,14 @@
 """
 Tests unitarios para src/utils/config_loader.py
-Cubre: get_base_dir, resolve_path, load_config (con env variables mockeadas)
+Cubre: get_base_dir, resolve_path, load_config (con env variables mockeadas) y su caché
 """
+import os
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
+from src.utils import config_loader
 from src.utils.config_loader import get_base_dir, load_config, resolve_path
 
 
@@ -93,3 +95,44 @@ class TestLoadConfig:
         with patch("src.utils.config_loader.os.getenv", return_value=None):
             with pytest.raises(EnvironmentError, match="Faltan variables de entorno"):
                 load_config(validate_env=True)
+
+
+class TestCacheConfig:
+    """config.yaml solo se parsea de nuevo si cambia su mtime o tras reload()."""
+
+    @pytest.fixture
+    def config_tmp(self, tmp_path, monkeypatch):
+        (tmp_path / "config").mkdir()
+        path = tmp_path / "config" / "config.yaml"
+        path.write_text("season:\n  current: '2026-27'\n", encoding="utf-8")
+        monkeypatch.setattr(config_loader, "_BASE_DIR", tmp_path)
+        config_loader.reload()
+        yield path
+        monkeypatch.undo()
+        config_loader.reload()
+
+    def test_llamadas_repetidas_no_reparsean(self, config_tmp):
+        antes = config_loader.get_parse_count()
+
+        for _ in range(5):
+            load_config(validate_env=False)
+
+        assert config_loader.get_parse_count() == antes
+
+    def test_cambio_de_mtime_invalida_la_cache(self, config_tmp):
+        config_tmp.write_text("season:\n  current: '2027-28'\n", encoding="utf-8")
+        os.utime(config_tmp, ns=(0, config_tmp.stat().st_mtime_ns + 1_000_000_000))
+
+        assert load_config(validate_env=False)["season"]["current"] == "2027-28"
+
+    def test_reload_fuerza_el_parseo(self, config_tmp):
+        antes = config_loader.get_parse_count()
+
+        config_loader.reload()
+
+        assert config_loader.get_parse_count() == antes + 1
+
+    def test_modificar_el_dict_devuelto_no_altera_la_cache(self, config_tmp):
+        load_config(validate_env=False)["season"]["current"] = "otra"
+
+        assert load_config(validate_env=False)["season"]["current"] == "2026-27"
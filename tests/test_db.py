@@ -25,6 +25,54 @@ class TestGetConnection:
         assert nested.exists()
 
 
+class TestConexionCompartida:
+    """get_connection reutiliza la conexión del hilo, en modo WAL y con los
+    pragmas de config.yaml -> database."""
+
+    def test_reutiliza_la_conexion_del_hilo(self, db_path):
+        assert db_utils.get_connection() is db_utils.get_connection()
+
+    def test_reabre_si_la_cerraron(self, db_path):
+        conn = db_utils.get_connection()
+        conn.close()
+
+        nueva = db_utils.get_connection()
+
+        assert nueva is not conn
+        assert nueva.execute("SELECT 1").fetchone() == (1,)
+
+    def test_aplica_los_pragmas_de_config(self, db_path, monkeypatch):
+        monkeypatch.setattr(db_utils, "get_db_settings", lambda: {**db_utils._DEFAULT_DB_SETTINGS, "cache_size": -1234})
+        conn = db_utils.get_connection()
+
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -1234
+
+    def test_un_lector_abierto_no_bloquea_al_escritor(self, db_path):
+        import sqlite3
+
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+        lector = sqlite3.connect(db_path, timeout=0)
+        lector.execute("BEGIN")
+        assert lector.execute("SELECT COUNT(*) FROM t").fetchone() == (1,)
+
+        assert db_utils.write_table(pd.DataFrame([{"x": 1}, {"x": 2}]), "t", "2026-27") is True
+        # El lector sigue viendo su instantánea hasta terminar la transacción
+        assert lector.execute("SELECT COUNT(*) FROM t").fetchone() == (1,)
+        lector.rollback()
+        assert lector.execute("SELECT COUNT(*) FROM t").fetchone() == (2,)
+        lector.close()
+
+    def test_close_connections_vuelca_el_wal_en_la_bd(self, db_path):
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+
+        db_utils.close_connections()
+
+        wal = db_path.with_name(db_path.name + "-wal")
+        assert not wal.exists() or wal.stat().st_size == 0
+
+
 class TestTableExists:
     def test_tabla_inexistente_devuelve_false(self, db_path):
         conn = db_utils.get_connection()
@@ -133,6 +181,56 @@ class TestWriteTable:
         assert len(out) == 1
 
 
+class TestWriteTables:
+    """Varias tablas en una sola transacción: todas o ninguna."""
+
+    def test_escribe_tablas_nuevas_y_existentes(self, db_path):
+        db_utils.write_table(pd.DataFrame({"x": [1, 2]}), "a", "2026-27")
+        db_utils.write_table(pd.DataFrame({"x": [0]}), "a", "2025-26")
+
+        escrito = db_utils.write_tables(
+            {"a": pd.DataFrame({"x": [3], "y": ["nueva"]}), "b": pd.DataFrame({"z": [5, 6]})}, "2026-27"
+        )
+
+        assert escrito is True
+        assert db_utils.read_table("a", "2026-27")[["x", "y"]].values.tolist() == [[3, "nueva"]]
+        assert db_utils.read_table("a", "2025-26")["x"].tolist() == [0]
+        assert db_utils.read_table("b", "2026-27")["z"].tolist() == [5, 6]
+        assert {c["tabla"] for c in db_utils.changes_since(0) if c["operacion"] == "replace"} >= {"a", "b"}
+
+    def test_si_una_tabla_encoge_mucho_no_escribe_ninguna(self, db_path):
+        db_utils.write_table(pd.DataFrame({"x": range(20)}), "a", "2026-27")
+        db_utils.write_table(pd.DataFrame({"x": [1]}), "b", "2026-27")
+
+        escrito = db_utils.write_tables({"b": pd.DataFrame({"x": [7]}), "a": pd.DataFrame({"x": [1]})}, "2026-27")
+
+        assert escrito is False
+        assert db_utils.read_table("a", "2026-27")["x"].tolist() == list(range(20))
+        assert db_utils.read_table("b", "2026-27")["x"].tolist() == [1]
+
+    def test_si_falla_a_medias_no_escribe_ninguna(self, db_path, monkeypatch):
+        import sqlite3
+
+        db_utils.write_table(pd.DataFrame({"x": [1]}), "a", "2026-27")
+        db_utils.write_table(pd.DataFrame({"x": [1]}), "b", "2026-27")
+        real = db_utils._record_change
+        llamadas = []
+
+        def falla_en_la_segunda(conn, table, *args):
+            llamadas.append(table)
+            if len(llamadas) == 2:
+                raise sqlite3.OperationalError("disk I/O error")
+            real(conn, table, *args)
+
+        monkeypatch.setattr(db_utils, "_record_change", falla_en_la_segunda)
+        escrito = db_utils.write_tables({"a": pd.DataFrame({"x": [2]}), "b": pd.DataFrame({"x": [2]})}, "2026-27")
+
+        assert escrito is False
+        assert llamadas == ["a", "b"]
+        assert db_utils.read_table("a", "2026-27")["x"].tolist() == [1]
+        assert db_utils.read_table("b", "2026-27")["x"].tolist() == [1]
+
+
 class TestKnownTables:
     def test_incluye_las_tablas_de_config_yaml(self):
         tables = db_utils.known_tables()
@@ -148,3 +246,532 @@ class TestGetActiveSeason:
     def test_devuelve_un_string_no_vacio(self):
         season = db_utils.get_active_season()
         assert isinstance(season, str) and season
+
+
+class TestPrependRows:
+    """Tablas tipo feed (ganancias): las filas nuevas van delante sin
+    reescribir la tabla."""
+
+    def test_filas_nuevas_se_leen_primero_en_su_orden(self, db_path):
+        db_utils.write_table(pd.DataFrame({"id": ["c", "d"]}), "feed", "2025-26")
+
+        añadidas = db_utils.prepend_rows(pd.DataFrame({"id": ["a", "b"]}), "feed", "2025-26")
+
+        assert añadidas == 2
+        assert db_utils.read_table("feed", "2025-26")["id"].tolist() == ["a", "b", "c", "d"]
+
+    def test_sustituye_la_cabecera_por_encima_del_corte(self, db_path):
+        db_utils.write_table(pd.DataFrame({"id": [None, "c", "d"]}), "feed", "2025-26")
+        rowid_c = db_utils.first_rowids("feed", "2025-26", "id", ["c"])["c"]
+
+        db_utils.prepend_rows(pd.DataFrame({"id": ["a", None]}), "feed", "2025-26", replace_before_rowid=rowid_c)
+
+        assert db_utils.read_table("feed", "2025-26")["id"].tolist() == ["a", None, "c", "d"]
+
+    def test_rechaza_si_sustituiria_mas_filas_de_las_que_inserta(self, db_path):
+        db_utils.write_table(pd.DataFrame({"id": ["x", "y", "z", "c"]}), "feed", "2025-26")
+        rowid_c = db_utils.first_rowids("feed", "2025-26", "id", ["c"])["c"]
+
+        añadidas = db_utils.prepend_rows(pd.DataFrame({"id": ["a"]}), "feed", "2025-26", replace_before_rowid=rowid_c)
+
+        assert añadidas is None
+        assert db_utils.read_table("feed", "2025-26")["id"].tolist() == ["x", "y", "z", "c"]
+
+    def test_no_toca_otras_temporadas(self, db_path):
+        db_utils.write_table(pd.DataFrame({"id": ["viejo"]}), "feed", "2024-25")
+        db_utils.write_table(pd.DataFrame({"id": ["c"]}), "feed", "2025-26")
+
+        db_utils.prepend_rows(pd.DataFrame({"id": ["a"]}), "feed", "2025-26")
+
+        assert db_utils.read_table("feed", "2024-25")["id"].tolist() == ["viejo"]
+        assert db_utils.first_rowids("feed", "2024-25", "id", ["a", "c"]) == {}
+
+    def test_prepend_tables_escribe_todas_o_ninguna(self, db_path):
+        db_utils.write_table(pd.DataFrame({"id": ["c", "d"], "n": [1, 2]}), "feed", "2025-26")
+        db_utils.write_table(pd.DataFrame({"id": ["x", "y", "z"]}), "otra", "2025-26")
+        rowid_z = db_utils.first_rowids("otra", "2025-26", "id", ["z"])["z"]
+
+        # "otra" sustituiría 2 filas por 1: se rechaza y "feed" tampoco cambia
+        assert not db_utils.prepend_tables(
+            {"feed": (pd.DataFrame({"id": ["a"], "n": [0]}), None), "otra": (pd.DataFrame({"id": ["w"]}), rowid_z)},
+            "2025-26", shifts={"feed": ("n", 10, None)},
+        )
+        assert db_utils.read_table("feed", "2025-26")["id"].tolist() == ["c", "d"]
+
+        assert db_utils.prepend_tables(
+            {"feed": (pd.DataFrame({"id": ["a"], "n": [0]}), None), "otra": (pd.DataFrame(), None)},
+            "2025-26", shifts={"feed": ("n", 10, db_utils.rowid_at("feed", "2025-26", 0))},
+        )
+        assert db_utils.read_table("feed", "2025-26")[["id", "n"]].values.tolist() == [["a", 0], ["c", 11], ["d", 12]]
+        assert db_utils.read_table("otra", "2025-26")["id"].tolist() == ["x", "y", "z"]
+
+
+class TestRowids:
+    """rowid como posición del feed: leerlo, filtrar por él, cortes para
+    prepend_rows y desplazar valores en bloque (preprocesado incremental)."""
+
+    def test_read_table_lee_y_filtra_por_rowid(self, db_path):
+        db_utils.write_table(pd.DataFrame({"id": ["a", "b", "c"]}), "feed", "2025-26")
+        rowids = db_utils.read_table("feed", "2025-26", columns=["rowid"])["rowid"].tolist()
+
+        df = db_utils.read_table("feed", "2025-26", where={"rowid": (None, rowids[1])})
+
+        assert df["id"].tolist() == ["a", "b"]
+
+    def test_asterisco_lee_todas_las_columnas_con_el_rowid(self, db_path):
+        db_utils.write_table(pd.DataFrame({"id": ["a", "b"], "x": [1, 2]}), "feed", "2025-26")
+
+        df = db_utils.read_table("feed", "2025-26", columns=["*", "rowid"])
+
+        assert list(df.columns) == ["id", "x", "temporada", "rowid"]
+        assert df["rowid"].tolist() == db_utils.read_table("feed", "2025-26", columns=["rowid"])["rowid"].tolist()
+
+    def test_rowid_at_da_la_fila_n_o_uno_mas_que_la_ultima(self, db_path):
+        db_utils.write_table(pd.DataFrame({"id": ["c", "d"]}), "feed", "2025-26")
+        db_utils.prepend_rows(pd.DataFrame({"id": ["a", "b"]}), "feed", "2025-26")
+        rowids = db_utils.read_table("feed", "2025-26", columns=["rowid"])["rowid"].tolist()
+
+        assert [db_utils.rowid_at("feed", "2025-26", i) for i in range(6)] == rowids + [rowids[-1] + 1] * 2
+        assert db_utils.rowid_at("feed", "2024-25", 0) is None
+        assert db_utils.rowid_at("no_existe", "2025-26", 0) is None
+
+    def test_shift_values_suma_desde_el_rowid_y_lo_registra(self, db_path):
+        db_utils.write_table(pd.DataFrame({"id": [0, 1, 2]}), "t", "2025-26")
+        db_utils.write_table(pd.DataFrame({"id": [0]}), "t", "2024-25")
+        v = db_utils.current_version()
+
+        cambiadas = db_utils.shift_values("t", "2025-26", "id", 3, from_rowid=db_utils.rowid_at("t", "2025-26", 1))
+
+        assert cambiadas == 2
+        assert db_utils.read_table("t", "2025-26")["id"].tolist() == [0, 4, 5]
+        assert db_utils.read_table("t", "2024-25")["id"].tolist() == [0]
+        assert [(c["operacion"], c["filas"]) for c in db_utils.changes_since(v)] == [("update", 2)]
+
+
+class TestMarcasDeAgua:
+    def test_guarda_lee_y_borra(self, db_path):
+        assert db_utils.get_watermark("proceso", "2025-26") is None
+
+        db_utils.set_watermark("proceso", "2025-26", {"version": 3, "ancla": {"rowid": -5}})
+        db_utils.set_watermark("proceso", "2025-26", {"version": 4})
+
+        assert db_utils.get_watermark("proceso", "2025-26") == {"version": 4}
+        assert db_utils.get_watermark("proceso", "2024-25") is None
+        db_utils.set_watermark("proceso", "2025-26", None)
+        assert db_utils.get_watermark("proceso", "2025-26") is None
+
+    def test_es_tabla_interna(self, db_path):
+        db_utils.set_watermark("proceso", "2025-26", {"version": 1})
+
+        assert db_utils.data_tables(db_utils.get_connection()) == []
+        assert db_utils.current_version() == 0
+
+
+class TestUpsertRows:
+    KEYS = ("jornada", "nombre")
+
+    @staticmethod
+    def _df(*filas):
+        return pd.DataFrame([{"jornada": j, "nombre": n, "puntos": p} for j, n, p in filas])
+
+    def test_inserta_nuevas_y_actualiza_existentes(self, db_path):
+        db_utils.upsert_rows(self._df((1, "Dani", 10)), "t", "2025-26", self.KEYS)
+
+        cambiadas = db_utils.upsert_rows(self._df((1, "Dani", 12), (2, "Dani", 5)), "t", "2025-26", self.KEYS)
+
+        assert cambiadas == 2
+        out = db_utils.read_table("t", "2025-26")
+        assert out.sort_values("jornada")["puntos"].tolist() == [12, 5]
+
+    def test_sin_update_gana_la_fila_guardada(self, db_path):
+        db_utils.upsert_rows(self._df((1, "Dani", 10)), "t", "2025-26", self.KEYS)
+
+        cambiadas = db_utils.upsert_rows(self._df((1, "Dani", 99)), "t", "2025-26", self.KEYS, update=False)
+
+        assert cambiadas == 0
+        assert db_utils.read_table("t", "2025-26")["puntos"].tolist() == [10]
+
+    def test_replace_scope_borra_las_filas_que_no_vienen(self, db_path):
+        db_utils.upsert_rows(self._df((1, "Dani", 10), (1, "Antiguo", 3), (2, "Antiguo", 4)), "t", "2025-26", self.KEYS)
+
+        db_utils.upsert_rows(self._df((1, "Dani", 11)), "t", "2025-26", self.KEYS, replace_scope="jornada")
+
+        out = db_utils.read_table("t", "2025-26").sort_values("jornada")
+        assert out[["jornada", "nombre"]].values.tolist() == [[1, "Dani"], [2, "Antiguo"]]
+
+    def test_guardia_deshace_si_la_temporada_encoge_demasiado(self, db_path):
+        db_utils.upsert_rows(self._df(*[(1, f"m{i}", i) for i in range(12)]), "t", "2025-26", self.KEYS)
+
+        cambiadas = db_utils.upsert_rows(self._df((1, "m0", 0)), "t", "2025-26", self.KEYS, replace_scope="jornada")
+
+        assert cambiadas is None
+        assert len(db_utils.read_table("t", "2025-26")) == 12
+
+    def test_tabla_con_claves_repetidas_se_deduplica_al_crear_el_indice(self, db_path):
+        db_utils.write_table(self._df((1, "Dani", 10), (1, "Dani", 99)), "t", "2025-26")
+
+        db_utils.upsert_rows(self._df((2, "Dani", 5)), "t", "2025-26", self.KEYS)
+
+        out = db_utils.read_table("t", "2025-26").sort_values("jornada")
+        assert out["puntos"].tolist() == [10, 5]
+
+    def test_deduplicar_queda_en_el_registro_de_cambios(self, db_path):
+        db_utils.write_table(self._df((1, "Dani", 10), (1, "Dani", 99), (1, "Bea", 3)), "t", "2025-26")
+        v = db_utils.current_version()
+
+        db_utils.upsert_rows(self._df((2, "Dani", 5)), "t", "2025-26", self.KEYS)
+
+        assert [(c["operacion"], c["filas"], c["claves"]) for c in db_utils.changes_since(v)] == [
+            ("upsert", 1, [[1, "Dani"]]), ("upsert", 1, [[2, "Dani"]]),
+        ]
+
+    def test_guardia_cuenta_las_filas_borradas_al_deduplicar(self, db_path):
+        db_utils.write_table(self._df(*[(1, "Dani", i) for i in range(12)]), "t", "2025-26")
+
+        cambiadas = db_utils.upsert_rows(self._df((2, "Dani", 5)), "t", "2025-26", self.KEYS)
+
+        assert cambiadas is None
+        assert len(db_utils.read_table("t", "2025-26")) == 12
+
+
+class TestWriteTableModos:
+    """mode="append"/"upsert": escritura incremental por la clave declarada
+    en TABLE_KEYS; mode="replace" (por defecto) sigue sobreescribiendo."""
+
+    @staticmethod
+    def _df(*filas):
+        return pd.DataFrame([{"date": d, "jornada": j, "puntos": p} for d, j, p in filas])
+
+    def test_append_solo_anade_claves_nuevas(self, db_path):
+        db_utils.write_table(self._df(("2026-10-18", 1, 10)), "jornadas", "2026-27", mode="append")
+
+        db_utils.write_table(self._df(("2026-10-18", 1, 99), ("2026-10-18", 2, 7)), "jornadas", "2026-27",
+                             mode="append")
+
+        out = db_utils.read_table("jornadas", "2026-27")
+        assert out[["jornada", "puntos"]].values.tolist() == [[1, 10], [2, 7]]
+
+    def test_upsert_actualiza_las_claves_guardadas(self, db_path):
+        db_utils.write_table(self._df(("2026-10-18", 1, 10)), "jornadas", "2026-27", mode="upsert")
+
+        db_utils.write_table(self._df(("2026-10-18", 1, 99)), "jornadas", "2026-27", mode="upsert")
+
+        assert db_utils.read_table("jornadas", "2026-27")["puntos"].tolist() == [99]
+
+    def test_tabla_sin_clave_declarada_rechaza_el_modo_incremental(self, db_path):
+        assert db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27", mode="append") is False
+        assert db_utils.read_table("t").empty
+
+    def test_modo_desconocido_no_escribe(self, db_path):
+        assert db_utils.write_table(self._df(("2026-10-18", 1, 10)), "jornadas", "2026-27", mode="merge") is False
+
+    def test_replace_sigue_disponible_tras_escrituras_incrementales(self, db_path):
+        db_utils.write_table(self._df(("2026-10-18", 1, 10), ("2026-10-18", 2, 7)), "jornadas", "2026-27",
+                             mode="append")
+
+        db_utils.write_table(self._df(("2026-10-19", 3, 1)), "jornadas", "2026-27", allow_shrink=True)
+
+        assert db_utils.read_table("jornadas", "2026-27")["jornada"].tolist() == [3]
+
+
+class TestEsquemaYLecturaProyectada:
+    """TABLE_SCHEMAS se aplica al escribir; read_table(columns=, where=,
+    typed=) resuelve proyección y filtros en SQLite."""
+
+    @staticmethod
+    def _gameweek():
+        return pd.DataFrame([
+            {"Date": "2026-10-04", "Jornada": "7", "Manager": "Dani", "Puntos": 5.0},
+            {"Date": "2026-10-11", "Jornada": "8", "Manager": "Bea", "Puntos": 9.0},
+            {"Date": "2026-10-18", "Jornada": "9", "Manager": "Dani", "Puntos": 2.0},
+        ])
+
+    def test_al_escribir_se_guardan_los_tipos_declarados(self, db_path):
+        db_utils.write_table(self._gameweek(), "gameweek", "2026-27")
+
+        conn = db_utils.get_connection()
+        tipos = conn.execute('SELECT typeof("Date"), typeof(Jornada), typeof(Puntos) FROM gameweek').fetchone()
+        assert tipos == ("text", "integer", "integer")
+
+    def test_columna_no_convertible_se_guarda_como_viene(self, db_path):
+        df = pd.DataFrame([{"jornada": "J1", "nombre": "Dani", "puntos": 3}])
+
+        db_utils.write_table(df, "clasificaciones", "2026-27")
+
+        assert db_utils.read_table("clasificaciones", "2026-27")["jornada"].tolist() == ["J1"]
+
+    def test_proyeccion_y_filtros(self, db_path):
+        from datetime import date
+
+        db_utils.write_table(self._gameweek(), "gameweek", "2026-27")
+
+        por_rango = db_utils.read_table("gameweek", "2026-27", columns=["Jornada", "Puntos"], where={"Jornada": (8, None)})
+        por_fecha = db_utils.read_table("gameweek", "2026-27", where={"Date": (date(2026, 10, 5), date(2026, 10, 18))})
+        por_manager = db_utils.read_table("gameweek", "2026-27", columns=["Jornada"], where={"Manager": ["Dani"]})
+
+        assert list(por_rango.columns) == ["Jornada", "Puntos"]
+        assert por_rango["Jornada"].tolist() == [8, 9]
+        assert por_fecha["Jornada"].tolist() == [8, 9]
+        assert por_manager["Jornada"].tolist() == [7, 9]
+
+    def test_typed_parsea_fechas_y_categorias(self, db_path):
+        db_utils.write_table(self._gameweek(), "gameweek", "2026-27")
+        db_utils.write_table(pd.DataFrame([{"fecha": "2026-10-18", "type": "transfer", "ganancias": 3}]),
+                             "ganancias_clean", "2026-27")
+
+        gw = db_utils.read_table("gameweek", "2026-27", typed=True)
+        ganancias = db_utils.read_table("ganancias_clean", "2026-27", typed=True)
+
+        assert pd.api.types.is_datetime64_any_dtype(gw["Date"])
+        assert gw["Jornada"].dtype == "int64"
+        assert isinstance(ganancias["type"].dtype, pd.CategoricalDtype)
+
+    def test_columnas_o_filtros_inexistentes(self, db_path):
+        db_utils.write_table(self._gameweek(), "gameweek", "2026-27")
+
+        assert list(db_utils.read_table("gameweek", columns=["Jornada", "NoExiste"]).columns) == ["Jornada"]
+        assert db_utils.read_table("gameweek", where={"NoExiste": 1}).empty
+
+
+class TestIndices:
+    """Los filtros por (temporada, columna) de TABLE_INDEXES usan su índice
+    compuesto en vez de recorrer la temporada entera (EXPLAIN QUERY PLAN)."""
+
+    @staticmethod
+    def _plan(sql: str, params: tuple) -> str:
+        conn = db_utils.get_connection()
+        return " | ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+    @pytest.mark.parametrize(
+        "table, col", [(t, cols[0]) for t, indices in db_utils.TABLE_INDEXES.items() for cols in indices]
+    )
+    def test_filtro_por_columna_registrada_usa_su_indice(self, db_path, table, col):
+        db_utils.write_table(pd.DataFrame([{col: "x", "otra": 1}]), table, "2026-27")
+
+        plan = self._plan(f'SELECT * FROM {table} WHERE temporada = ? AND "{col}" = ?', ("2026-27", "x"))
+
+        assert f"USING INDEX idx_{table}_{col} (temporada=? AND {col}=?)" in plan
+
+    def test_rango_de_jornadas_de_read_table_usa_el_indice(self, db_path):
+        db_utils.write_table(pd.DataFrame([{"Jornada": 1, "Manager": "Dani"}]), "gameweek", "2026-27")
+
+        plan = self._plan('SELECT * FROM gameweek WHERE temporada = ? AND "Jornada" >= ? AND "Jornada" <= ?',
+                          ("2026-27", 10, 15))
+
+        assert "USING INDEX idx_gameweek_Jornada" in plan
+
+    def test_se_crean_tambien_con_upsert_y_prepend(self, db_path):
+        db_utils.upsert_rows(pd.DataFrame([{"jornada": 1, "nombre": "Dani"}]), "clasificaciones", "2026-27",
+                             ("jornada", "nombre"))
+        db_utils.prepend_rows(pd.DataFrame([{"idTransfer": "a"}]), "ganancias", "2026-27")
+
+        conn = db_utils.get_connection()
+        nombres = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_clasificaciones_nombre", "idx_ganancias_idTransfer"} <= nombres
+
+
+class TestCacheDeLecturas:
+    """read_table reutiliza el último resultado mientras no haya escrituras
+    en la tabla (este proceso) ni commits de otra conexión (data_version)."""
+
+    @pytest.fixture(autouse=True)
+    def _cache_vacia(self):
+        db_utils.invalidate_read_cache()
+
+    @staticmethod
+    def _lee_sql(monkeypatch):
+        llamadas = []
+        original = pd.read_sql_query
+        monkeypatch.setattr(pd, "read_sql_query", lambda *a, **k: llamadas.append(a[0]) or original(*a, **k))
+        return llamadas
+
+    def test_lecturas_repetidas_no_vuelven_a_consultar(self, db_path, monkeypatch):
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+        llamadas = self._lee_sql(monkeypatch)
+        antes = db_utils.read_cache_stats()["hits"]
+
+        db_utils.read_table("t", "2026-27")
+        db_utils.read_table("t", "2026-27")
+
+        assert len(llamadas) == 1
+        assert db_utils.read_cache_stats()["hits"] == antes + 1
+
+    def test_columnas_distintas_son_entradas_distintas(self, db_path, monkeypatch):
+        db_utils.write_table(pd.DataFrame([{"x": 1, "y": 2}]), "t", "2026-27")
+        llamadas = self._lee_sql(monkeypatch)
+
+        assert list(db_utils.read_table("t", "2026-27", columns=["x"]).columns) == ["x"]
+        assert list(db_utils.read_table("t", "2026-27", columns=["y"]).columns) == ["y"]
+        assert len(llamadas) == 2
+
+    def test_escribir_en_la_tabla_invalida(self, db_path):
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+        db_utils.read_table("t", "2026-27")
+
+        db_utils.write_table(pd.DataFrame([{"x": 1}, {"x": 2}]), "t", "2026-27")
+
+        assert db_utils.read_table("t", "2026-27")["x"].tolist() == [1, 2]
+
+    def test_commit_de_otra_conexion_invalida(self, db_path):
+        import sqlite3
+
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+        db_utils.read_table("t", "2026-27")
+
+        otra = sqlite3.connect(db_path)
+        otra.execute("INSERT INTO t (x, temporada) VALUES (2, '2026-27')")
+        otra.commit()
+        otra.close()
+
+        assert db_utils.read_table("t", "2026-27")["x"].tolist() == [1, 2]
+
+    def test_modo_desconocido_no_invalida(self, db_path, monkeypatch):
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+        db_utils.read_table("t", "2026-27")
+        llamadas = self._lee_sql(monkeypatch)
+
+        assert db_utils.write_table(pd.DataFrame([{"x": 2}]), "t", "2026-27", mode="merge") is False
+        db_utils.read_table("t", "2026-27")
+
+        assert llamadas == []
+
+    def test_modificar_el_resultado_no_altera_la_cache(self, db_path):
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+
+        db_utils.read_table("t", "2026-27").loc[0, "x"] = 99
+
+        assert db_utils.read_table("t", "2026-27")["x"].tolist() == [1]
+
+
+class TestMarcadorDeCambios:
+    """change_marker identifica el estado de una partición (tabla,
+    temporada): cambia con cada escritura en ella y solo en ella."""
+
+    def test_tabla_inexistente_o_temporada_vacia_es_none(self, db_path):
+        assert db_utils.change_marker("t", "2026-27") is None
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+        assert db_utils.change_marker("t", "2025-26") is None
+
+    def test_cambia_con_cada_escritura_de_la_particion(self, db_path):
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2025-26")
+        antes = db_utils.change_marker("t", "2026-27")
+        otra = db_utils.change_marker("t", "2025-26")
+
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+
+        assert db_utils.change_marker("t", "2026-27") != antes
+        assert db_utils.change_marker("t", "2025-26") == otra
+
+    def test_upsert_sin_cambios_no_lo_mueve(self, db_path):
+        df = pd.DataFrame([{"jornada": 1, "nombre": "Dani", "puntos": 50}])
+        db_utils.write_table(df, "clasificaciones", "2026-27", mode="append")
+        antes = db_utils.change_marker("clasificaciones", "2026-27")
+
+        db_utils.write_table(df, "clasificaciones", "2026-27", mode="append")
+
+        assert db_utils.change_marker("clasificaciones", "2026-27") == antes
+
+    def test_escritura_a_mano_tambien_lo_cambia(self, db_path):
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+        antes = db_utils.change_marker("t", "2026-27")
+
+        with db_utils.get_connection() as conn:
+            conn.execute("INSERT INTO t (x, temporada) VALUES (2, '2026-27')")
+
+        assert db_utils.change_marker("t", "2026-27") != antes
+
+    def test_data_tables_no_incluye_las_internas(self, db_path):
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+
+        with db_utils.get_connection() as conn:
+            assert db_utils.data_tables(conn) == ["t"]
+
+
+class TestRegistroDeCambios:
+    """Cada escritura queda en _changelog con una versión creciente; los
+    consumidores piden changes_since(versión)."""
+
+    @staticmethod
+    def _clas(*filas):
+        return pd.DataFrame([{"jornada": j, "nombre": n, "puntos": p} for j, n, p in filas])
+
+    def test_bd_sin_escrituras_empieza_en_cero(self, db_path):
+        assert db_utils.current_version() == 0
+        assert db_utils.changes_since(0) == []
+
+    def test_cada_escritura_sube_la_version(self, db_path):
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+        v1 = db_utils.current_version()
+        db_utils.prepend_rows(pd.DataFrame([{"x": 0}]), "t", "2026-27")
+
+        cambios = db_utils.changes_since(v1)
+
+        assert [(c["tabla"], c["operacion"], c["filas"], c["claves"]) for c in cambios] == [("t", "prepend", 1, None)]
+        assert cambios[0]["version"] == db_utils.current_version() > v1
+
+    def test_upsert_registra_solo_las_claves_cambiadas(self, db_path):
+        db_utils.write_table(self._clas((1, "Dani", 10), (1, "Ana", 8)), "clasificaciones", "2026-27", mode="upsert")
+        v = db_utils.current_version()
+
+        db_utils.write_table(self._clas((1, "Dani", 12), (1, "Ana", 8), (2, "Ana", 3)), "clasificaciones", "2026-27",
+                             mode="upsert")
+
+        [cambio] = db_utils.changes_since(v)
+        assert cambio["filas"] == 2
+        assert sorted(cambio["claves"]) == [[1, "Dani"], [2, "Ana"]]
+
+    def test_upsert_sin_cambios_no_registra_nada(self, db_path):
+        df = self._clas((1, "Dani", 10))
+        db_utils.write_table(df, "clasificaciones", "2026-27", mode="upsert")
+        v = db_utils.current_version()
+
+        assert db_utils.write_table(df, "clasificaciones", "2026-27", mode="upsert")
+
+        assert db_utils.changes_since(v) == []
+
+    def test_replace_scope_registra_las_filas_borradas(self, db_path):
+        db_utils.upsert_rows(self._clas((1, "Dani", 10), (1, "Antiguo", 3)), "t", "2026-27", ("jornada", "nombre"))
+        v = db_utils.current_version()
+
+        db_utils.upsert_rows(self._clas((1, "Dani", 10)), "t", "2026-27", ("jornada", "nombre"),
+                             replace_scope="jornada")
+
+        assert db_utils.changes_since(v)[0]["claves"] == [[1, "Antiguo"]]
+
+    def test_escritura_rechazada_no_registra_nada(self, db_path):
+        db_utils.write_table(pd.DataFrame({"x": range(12)}), "t", "2026-27")
+        v = db_utils.current_version()
+
+        assert not db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+
+        assert db_utils.changes_since(v) == []
+
+    def test_filtra_por_tabla_y_temporada(self, db_path):
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2025-26")
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "u", "2026-27")
+
+        assert [c["tabla"] for c in db_utils.changes_since(0, temporada="2026-27")] == ["t", "u"]
+        assert [c["temporada"] for c in db_utils.changes_since(0, table="t")] == ["2026-27", "2025-26"]
+
+
+class TestLecturaArrow:
+    def test_sin_pyarrow_lee_con_numpy(self, db_path, monkeypatch, caplog):
+        monkeypatch.setattr(db_utils, "arrow_available", lambda: False)
+        db_utils.write_table(pd.DataFrame([{"x": 1}]), "t", "2026-27")
+
+        df = db_utils.read_table("t", "2026-27", arrow=True)
+
+        assert df["x"].dtype == "int64"
+        assert "pyarrow" in caplog.text
+
+    def test_con_pyarrow_columnas_arrow(self, db_path):
+        pytest.importorskip("pyarrow")
+        db_utils.write_table(pd.DataFrame([{"x": 1, "s": "a"}, {"x": None, "s": "b"}]), "t", "2026-27")
+
+        df = db_utils.read_table("t", "2026-27", arrow=True)
+
+        assert str(df["x"].dtype).endswith("[pyarrow]")
+        assert df["x"].isna().tolist() == [False, True]
+        assert str(df["s"].dtype).endswith("[pyarrow]")
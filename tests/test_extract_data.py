@@ -9,12 +9,19 @@ con un KeyError genérico al construir el DataFrame vacío; ahora se
 detecta y se devuelve un DataFrame vacío con las columnas correctas, con
 un warning explícito.
 """
+import pandas as pd
 import pytest
 
 from src.data.extract_subidas_bajadas import extraer_subidas_bajadas
 from src.data.extract_clasificacion import extraer_clasificaciones
 from src.data.extract_mercado import extraer_mercado
-from src.data.extract_gameweek import extraer_gameweek
+from src.data.extract_gameweek import COLUMNAS, contar_eventos, extraer_gameweek
+from src.data import extraction_context
+from src.data.extraction_cache import clave_cache
+from src.data.extraction_context import ExtractionContext, extraer_pagina
+from src.utils import html_parsing
+from src.utils.html_archive import content_hash
+from src.utils.html_parsing import parse_html
 
 
 class TestExtraerSubidasBajadas:
@@ -52,6 +59,19 @@ class TestExtraerSubidasBajadas:
         assert list(df.columns) == ["date", "nombre", "variacion"]
         assert df.empty
 
+    def test_sella_las_filas_con_la_fecha_indicada(self):
+        # run_extraction.py --fecha: la fila lleva el día archivado, no hoy.
+        html = """
+        <table class="thin-scrollbar">
+            <tr>
+                <a class="btn btn-sw-link">K. Mbappé</a>
+                <td class="td-right green">172</td>
+            </tr>
+        </table>
+        """
+        df = extraer_subidas_bajadas(html, fecha="2025-09-01")
+        assert df.iloc[0]["date"] == pd.Timestamp("2025-09-01")
+
 
 class TestExtraerClasificaciones:
     HTML_VALIDO = """
@@ -135,6 +155,10 @@ class TestExtraerMercado:
         assert row["equipoLiga"] == "48"
         assert row["estado"] == "injury"
 
+    def test_sella_las_filas_con_la_fecha_indicada(self):
+        df = extraer_mercado(self.HTML_VALIDO, fecha="2025-09-01")
+        assert df.iloc[0]["date"] == pd.Timestamp("2025-09-01")
+
     def test_sin_contenedor_principal_devuelve_vacio(self):
         df = extraer_mercado("<html><body>Sin nada relevante</body></html>")
         assert df.empty
@@ -214,3 +238,107 @@ class TestExtraerGameweek:
     def test_sin_gameweek_wrapper_devuelve_vacio(self):
         df = extraer_gameweek("<html><body>Sin nada relevante</body></html>")
         assert df.empty
+
+    def test_columnas_en_el_orden_de_siempre(self):
+        df = extraer_gameweek(self.HTML_VALIDO)
+        assert list(df.columns) == COLUMNAS
+
+    def test_contar_eventos_mantiene_la_semantica_de_subcadena(self):
+        hrefs = [
+            "#events-goal", "#events-goal", "#events-missed_penalty", "#events-penalty",
+            "#events-yellow", "#events-red", "#events-red", "#events-sub_in", "#events-mvp",
+        ]
+        conteo = dict(zip(COLUMNAS[-10:], contar_eventos(hrefs)))
+
+        assert conteo["Goles"] == 2
+        assert conteo["PenaltiMarcado"] == 1
+        assert conteo["PenaltiFallado"] == 1
+        assert conteo["Amarilla"] == 1
+        # Roja, Suplente y Cambio solo indican presencia
+        assert conteo["Roja"] == 1
+        assert conteo["Suplente"] == 1
+        assert conteo["Cambio"] == 0
+
+
+class TestBackendsDeParseo:
+    """parse_html puede usar lxml en vez de html.parser (config.yaml ->
+    parsing.backend); la salida de los extractores debe ser idéntica."""
+
+    CASOS = [
+        (extraer_mercado, TestExtraerMercado.HTML_VALIDO),
+        (extraer_clasificaciones, TestExtraerClasificaciones.HTML_VALIDO),
+        (extraer_gameweek, TestExtraerGameweek.HTML_VALIDO),
+        (extraer_subidas_bajadas, """
+            <table class="thin-scrollbar">
+                <tr><td><a class="btn btn-sw-link">K. Mbappé</a></td><td class="td-right green">172</td></tr>
+                <tr><td><a class="btn btn-sw-link">Pedri</a></td><td class="td-right red">-85</td></tr>
+            </table>
+        """),
+    ]
+
+    @pytest.mark.parametrize("extractor,html", CASOS, ids=lambda c: getattr(c, "__name__", "html"))
+    def test_lxml_produce_el_mismo_dataframe_que_html_parser(self, extractor, html, monkeypatch):
+        pytest.importorskip("lxml")
+        monkeypatch.setattr(html_parsing, "get_parser_backend", lambda: "html.parser")
+        esperado = extractor(html)
+        monkeypatch.setattr(html_parsing, "get_parser_backend", lambda: "lxml")
+        obtenido = extractor(html)
+
+        assert not esperado.empty
+        pd.testing.assert_frame_equal(obtenido, esperado)
+
+    def test_backend_no_disponible_cae_a_html_parser(self):
+        soup = parse_html("<p>hola</p>", backend="no-existe")
+
+        assert soup.p.get_text() == "hola"
+
+
+class TestExtractionContext:
+    """run_extraction.py lee y parsea cada HTML una sola vez por ejecución y
+    comparte el árbol entre la validación y los extractores."""
+
+    def test_parsea_cada_ruta_una_sola_vez(self, monkeypatch):
+        lecturas = []
+
+        def fake_read(path, fecha=None):
+            lecturas.append(path)
+            return TestExtraerMercado.HTML_VALIDO
+
+        monkeypatch.setattr(extraction_context, "safe_read_html", fake_read)
+        ctx = ExtractionContext()
+
+        assert ctx.html("mercado.html") is not None
+        soup = ctx.soup("mercado.html")
+
+        assert ctx.soup("mercado.html") is soup
+        assert lecturas == ["mercado.html"]
+        assert ctx.parse_count == 1
+
+    def test_extractor_acepta_el_arbol_compartido(self, monkeypatch):
+        monkeypatch.setattr(
+            extraction_context, "safe_read_html", lambda path, fecha=None: TestExtraerMercado.HTML_VALIDO
+        )
+        ctx = ExtractionContext()
+
+        pd.testing.assert_frame_equal(
+            extraer_mercado(ctx.soup("mercado.html")), extraer_mercado(TestExtraerMercado.HTML_VALIDO)
+        )
+
+    def test_pasa_la_fecha_de_archivo_al_leer(self, monkeypatch):
+        fechas = []
+        monkeypatch.setattr(
+            extraction_context, "safe_read_html", lambda path, fecha=None: fechas.append(fecha) or None
+        )
+
+        assert ExtractionContext("2026-10-18").html("mercado.html") is None
+        assert fechas == ["2026-10-18"]
+
+    def test_secciones_fechadas_se_sellan_y_cachean_con_el_dia_archivado(self, monkeypatch, tmp_path):
+        html = TestExtraerMercado.HTML_VALIDO
+        monkeypatch.setattr(extraction_context, "safe_read_html", lambda path, fecha=None: html)
+
+        res = extraer_pagina("mercado.html", {"mercado": extraer_mercado}, "2025-09-01",
+                             cache_dir=tmp_path, fechadas=frozenset({"mercado"}))["mercado"]
+
+        assert res["df"]["date"].tolist() == [pd.Timestamp("2025-09-01")]
+        assert res["clave"] == clave_cache(content_hash(html), extraer_mercado, "2025-09-01")
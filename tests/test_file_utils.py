@@ -67,3 +67,39 @@ class TestRutaDesconocidaUsaCsvLegacy:
         monkeypatch.setattr(file_utils, "_known_tables_cache", {"gameweek"})
         out = file_utils.safe_read_csv(str(tmp_path / "no_existe.csv"))
         assert out.empty
+
+
+class TestModoAppend:
+    def test_en_bd_no_duplica_al_repetir_el_mismo_dia(self, db_path):
+        df = pd.DataFrame([{"date": "2026-10-18", "nombre": "Pedri", "variacion": 0.3}])
+
+        file_utils.safe_save_csv(df, "data/processed/subidasBajadas.csv", mode="append")
+        file_utils.safe_save_csv(df, "data/processed/subidasBajadas.csv", mode="append")
+
+        assert len(db_utils.read_table("subidasBajadas", "2026-27")) == 1
+
+    def test_en_csv_legacy_deduplica_contra_lo_guardado(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(file_utils, "_known_tables_cache", set())
+        path = str(tmp_path / "t_mercado.csv")
+
+        file_utils.safe_save_csv(pd.DataFrame([{"a": 1}, {"a": 2}]), path, mode="append")
+        file_utils.safe_save_csv(pd.DataFrame([{"a": 2}, {"a": 3}]), path, mode="append")
+
+        assert pd.read_csv(path)["a"].tolist() == [1, 2, 3]
+
+
+class TestLecturaProyectada:
+    def test_csv_legacy_aplica_columnas_y_filtros(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(file_utils, "_known_tables_cache", set())
+        path = tmp_path / "gameweek.csv"
+        pd.DataFrame([
+            {"Date": "2026-10-04", "Jornada": 7, "Manager": "Dani"},
+            {"Date": "2026-10-11", "Jornada": 8, "Manager": "Bea"},
+        ]).to_csv(path, index=False)
+
+        out = file_utils.safe_read_csv(str(path), columns=["Date", "Jornada"], where={"Jornada": (8, None)},
+                                       typed=True)
+
+        assert list(out.columns) == ["Date", "Jornada"]
+        assert out["Jornada"].tolist() == [8]
+        assert pd.api.types.is_datetime64_any_dtype(out["Date"])
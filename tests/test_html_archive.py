@@ -0,0 +1,74 @@
+"""
+Tests para src/utils/html_archive.py — archivo histórico de HTML scrapeado,
+comprimido y direccionado por contenido, con manifiesto por día.
+"""
+import pytest
+
+from src.scraper.login import guardar_html
+from src.utils import file_utils
+from src.utils import html_archive
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    """Redirige get_archive_dir() a un directorio temporal."""
+    path = tmp_path / "archive"
+    monkeypatch.setattr(html_archive, "get_archive_dir", lambda: path)
+    return path
+
+
+class TestArchivarHtml:
+    def test_roundtrip_por_fecha_y_seccion(self, archive_dir):
+        html_archive.archivar_html("<html>mercado</html>", "mercado.html", fecha="2026-10-01")
+
+        out = html_archive.leer_html_archivado("mercado.html", "2026-10-01")
+
+        assert out == "<html>mercado</html>"
+
+    def test_contenido_identico_no_reescribe_el_objeto(self, archive_dir):
+        h1 = html_archive.archivar_html("<html>igual</html>", "clasificacion.html", fecha="2026-10-01")
+        obj = next((archive_dir / "objects").rglob("*.html.gz"))
+        mtime = obj.stat().st_mtime_ns
+
+        h2 = html_archive.archivar_html("<html>igual</html>", "clasificacion.html", fecha="2026-10-02")
+
+        assert h1 == h2
+        assert len(list((archive_dir / "objects").rglob("*.html.gz"))) == 1
+        assert obj.stat().st_mtime_ns == mtime
+
+    def test_el_manifiesto_registra_seccion_hash_y_tamano(self, archive_dir):
+        digest = html_archive.archivar_html("<html>x</html>", "quiniela.html", fecha="2026-10-01")
+
+        entries = html_archive.read_manifest("2026-10-01")
+
+        assert len(entries) == 1
+        assert entries[0]["seccion"] == "quiniela.html"
+        assert entries[0]["hash"] == digest
+        assert entries[0]["size"] == len("<html>x</html>")
+
+    def test_varias_capturas_el_mismo_dia_gana_la_ultima(self, archive_dir):
+        html_archive.archivar_html("<html>v1</html>", "mercado.html", fecha="2026-10-01")
+        html_archive.archivar_html("<html>v2</html>", "mercado.html", fecha="2026-10-01")
+
+        assert html_archive.leer_html_archivado("mercado.html", "2026-10-01") == "<html>v2</html>"
+
+    def test_fecha_sin_captura_devuelve_none(self, archive_dir):
+        assert html_archive.leer_html_archivado("mercado.html", "1999-01-01") is None
+
+
+class TestSafeReadHtmlConFecha:
+    def test_lee_del_archivo_por_nombre_de_archivo(self, archive_dir):
+        html_archive.archivar_html("<html>archivado</html>", "gameweek.html", fecha="2026-10-01")
+
+        out = file_utils.safe_read_html("data/raw/gameweek.html", fecha="2026-10-01")
+
+        assert out == "<html>archivado</html>"
+
+
+class TestGuardarHtmlArchiva:
+    def test_guardar_html_deja_copia_en_el_archivo(self, tmp_path):
+        guardar_html("<html>dashboard</html>", "dashboard.html", project_root=tmp_path)
+
+        archive_dir = tmp_path / "data" / "raw" / "archive"
+        assert len(list((archive_dir / "objects").rglob("*.html.gz"))) == 1
+        assert len(list((archive_dir / "manifests").glob("*.json"))) == 1
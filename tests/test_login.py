@@ -1,13 +1,24 @@
 """
 Tests para src/scraper/login.py — cerrar_popup_publicidad() (extraída para
-eliminar la duplicación x3) y los reintentos con backoff de login()
-(hallazgo DATA-04).
+eliminar la duplicación x3), los reintentos con backoff de login()
+(hallazgo DATA-04) y la captura de secciones en paralelo.
 """
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.scraper.login import cerrar_popup_publicidad, login
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from src.scraper.login import (
+    SECCIONES,
+    _abrir_sesion,
+    _debe_bloquear,
+    _nuevo_contexto,
+    _capturar_en_paralelo,
+    cerrar_popup_publicidad,
+    login,
+    scroll_adaptativo,
+)
 
 
 class TestCerrarPopupPublicidad:
@@ -72,3 +83,199 @@ class TestLoginRetries:
         assert result == {"dashboard": "path"}
         assert mock_once.call_count == 2
         assert mock_sleep.call_count == 1
+
+
+SCROLL_OPTS = {"mode": "fixed", "pause": 0, "max_scrolls": 1}
+
+
+class TestCapturaEnParalelo:
+    @patch("src.scraper.login.sync_playwright")
+    @patch("src.scraper.login._capturar_subidas_bajadas")
+    @patch("src.scraper.login._capturar_seccion")
+    def test_devuelve_las_mismas_claves_que_el_modo_secuencial(self, mock_seccion, mock_sb, mock_pw):
+        mock_seccion.side_effect = lambda page, url, archivo, *a: archivo
+        mock_sb.return_value = "MarketSubidasBajadas.html"
+        context = MagicMock()
+        context.storage_state.return_value = {"cookies": []}
+
+        saved = _capturar_en_paralelo(MagicMock(), context, {}, "https://x", 3, SCROLL_OPTS)
+
+        assert set(saved) == {"dashboard", "subidas_bajadas", *SECCIONES}
+        assert saved["market"] == "mercado.html"
+        assert mock_seccion.call_count == len(SECCIONES) + 1  # + dashboard
+        mock_sb.assert_called_once()
+
+    @patch("src.scraper.login.sync_playwright")
+    @patch("src.scraper.login._capturar_subidas_bajadas")
+    @patch("src.scraper.login._capturar_seccion")
+    def test_reutiliza_la_sesion_autenticada_en_los_workers(self, mock_seccion, mock_sb, mock_pw):
+        context = MagicMock()
+        context.storage_state.return_value = {"cookies": [{"name": "sid"}]}
+        browser = mock_pw.return_value.__enter__.return_value.chromium.launch.return_value
+
+        _capturar_en_paralelo(MagicMock(), context, {}, "https://x", 2, SCROLL_OPTS)
+
+        for call in browser.new_context.call_args_list:
+            assert call.kwargs["storage_state"] == {"cookies": [{"name": "sid"}]}
+
+    @patch("src.scraper.login.sync_playwright")
+    @patch("src.scraper.login._capturar_subidas_bajadas")
+    @patch("src.scraper.login._capturar_seccion")
+    def test_relanza_si_falla_una_seccion(self, mock_seccion, mock_sb, mock_pw):
+        mock_sb.side_effect = RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            _capturar_en_paralelo(MagicMock(), MagicMock(), {}, "https://x", 2, SCROLL_OPTS)
+
+
+class TestAbrirSesion:
+    @patch("src.scraper.login._realizar_login")
+    @patch("src.scraper.login._sesion_valida", return_value=True)
+    def test_reutiliza_la_sesion_guardada_sin_login(self, mock_valida, mock_login, tmp_path):
+        state_path = tmp_path / "state.json"
+        state_path.write_text("{}")
+        browser = MagicMock()
+
+        _abrir_sesion(browser, "https://x", "a@b.c", "pw", state_path)
+
+        browser.new_context.assert_called_once_with(storage_state=str(state_path))
+        mock_login.assert_not_called()
+
+    @patch("src.scraper.login._realizar_login")
+    @patch("src.scraper.login._sesion_valida", return_value=True)
+    def test_sesion_reutilizada_se_vuelve_a_guardar(self, mock_valida, mock_login, tmp_path):
+        # Las cookies renovadas al entrar sustituyen a las guardadas
+        state_path = tmp_path / "state.json"
+        state_path.write_text("{}")
+        browser = MagicMock()
+
+        context, _ = _abrir_sesion(browser, "https://x", "a@b.c", "pw", state_path)
+
+        context.storage_state.assert_called_once_with(path=str(state_path))
+
+    @patch("src.scraper.login._realizar_login", return_value=True)
+    @patch("src.scraper.login._sesion_valida", return_value=False)
+    def test_sesion_caducada_cae_al_login_completo_y_la_guarda(self, mock_valida, mock_login, tmp_path):
+        state_path = tmp_path / "state.json"
+        state_path.write_text("{}")
+        browser = MagicMock()
+
+        context, _ = _abrir_sesion(browser, "https://x", "a@b.c", "pw", state_path)
+
+        mock_login.assert_called_once()
+        context.storage_state.assert_called_once_with(path=str(state_path))
+
+    @patch("src.scraper.login._realizar_login", return_value=False)
+    def test_no_guarda_la_sesion_si_no_se_vio_el_contenido_principal(self, mock_login, tmp_path):
+        state_path = tmp_path / "state.json"
+        browser = MagicMock()
+
+        context, _ = _abrir_sesion(browser, "https://x", "a@b.c", "pw", state_path)
+
+        context.storage_state.assert_not_called()
+
+
+class TestScrollAdaptativo:
+    def test_para_cuando_la_lista_deja_de_crecer(self):
+        page = MagicMock()
+        page.evaluate.side_effect = lambda expr: 10
+        # crece dos veces y luego nunca más: pausas 0.25, 0.5, 1 y la última
+        # recortada a 0.25 para que el final sume pausa_max (2 s)
+        page.wait_for_function.side_effect = [None, None] + [PlaywrightTimeoutError("t")] * 4
+
+        stats = scroll_adaptativo(page, selector="#list-on-sale > li", pausa_inicial=0.25, pausa_max=2.0)
+
+        assert stats["iteraciones"] == 6
+        timeouts = [c.kwargs["timeout"] for c in page.wait_for_function.call_args_list]
+        assert timeouts == [250, 250, 250, 500, 1000, 250]
+
+    def test_la_pausa_se_resetea_cuando_vuelve_a_crecer(self):
+        page = MagicMock()
+        page.evaluate.return_value = 10
+        page.wait_for_function.side_effect = [
+            PlaywrightTimeoutError("t"), None, PlaywrightTimeoutError("t"), PlaywrightTimeoutError("t"),
+        ]
+
+        scroll_adaptativo(page, selector="ul > li", pausa_inicial=1, pausa_max=2)
+
+        timeouts = [c.kwargs["timeout"] for c in page.wait_for_function.call_args_list]
+        assert timeouts == [1000, 1000, 1000, 1000]
+
+    def test_el_final_no_espera_mas_que_pausa_max(self):
+        page = MagicMock()
+        page.evaluate.return_value = 10
+        page.wait_for_function.side_effect = PlaywrightTimeoutError("t")
+
+        scroll_adaptativo(page, selector="ul > li", pausa_inicial=0.3, pausa_max=2.0)
+
+        timeouts = [c.kwargs["timeout"] for c in page.wait_for_function.call_args_list]
+        assert sum(timeouts) == pytest.approx(2000)
+
+    def test_usa_polling_por_mutacion_si_hay_selector(self):
+        page = MagicMock()
+        page.evaluate.return_value = 0
+        page.wait_for_function.side_effect = PlaywrightTimeoutError("t")
+
+        scroll_adaptativo(page, selector="ul > li", pausa_inicial=2, pausa_max=2)
+
+        assert page.wait_for_function.call_args.kwargs["polling"] == "mutation"
+
+    def test_no_lanza_si_falla_la_medida_inicial(self):
+        page = MagicMock()
+        page.evaluate.side_effect = Exception("boom")
+
+        stats = scroll_adaptativo(page)
+
+        assert stats["iteraciones"] == 0
+
+
+FILTRO = {
+    "enabled": True,
+    "resource_types": ["image", "font", "media"],
+    "domains": ["doubleclick.net"],
+    "allowlist": ["/teams/"],
+}
+
+
+class TestFiltroRecursos:
+    def test_bloquea_tipos_de_recurso_configurados(self):
+        assert _debe_bloquear("image", "https://mister.mundodeportivo.com/a.png", FILTRO) is True
+        assert _debe_bloquear("font", "https://mister.mundodeportivo.com/a.woff2", FILTRO) is True
+
+    def test_deja_pasar_documentos_y_scripts_propios(self):
+        assert _debe_bloquear("document", "https://mister.mundodeportivo.com/feed", FILTRO) is False
+        assert _debe_bloquear("script", "https://mister.mundodeportivo.com/app.js", FILTRO) is False
+
+    def test_bloquea_dominios_de_publicidad_y_sus_subdominios(self):
+        assert _debe_bloquear("script", "https://doubleclick.net/x.js", FILTRO) is True
+        assert _debe_bloquear("xhr", "https://securepubads.g.doubleclick.net/gampad", FILTRO) is True
+        assert _debe_bloquear("script", "https://notdoubleclick.net/x.js", FILTRO) is False
+
+    def test_la_allowlist_gana_a_los_bloqueos(self):
+        assert _debe_bloquear("image", "https://cdn.mister.com/teams/48.png", FILTRO) is False
+
+    def test_instala_la_ruta_solo_si_esta_activado(self):
+        browser = MagicMock()
+        context = _nuevo_contexto(browser, FILTRO)
+        context.route.assert_called_once()
+
+        browser = MagicMock()
+        context = _nuevo_contexto(browser, {**FILTRO, "enabled": False})
+        context.route.assert_not_called()
+
+    def test_el_handler_aborta_o_continua_segun_la_peticion(self):
+        browser = MagicMock()
+        context = _nuevo_contexto(browser, FILTRO)
+        handler = context.route.call_args.args[1]
+
+        route_img = MagicMock()
+        route_img.request.resource_type = "image"
+        route_img.request.url = "https://x.com/a.png"
+        handler(route_img)
+        route_img.abort.assert_called_once()
+
+        route_doc = MagicMock()
+        route_doc.request.resource_type = "document"
+        route_doc.request.url = "https://x.com/feed"
+        handler(route_doc)
+        route_doc.continue_.assert_called_once()
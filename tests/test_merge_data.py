@@ -0,0 +1,157 @@
+"""
+Tests para los merges de src/data/merge_*.py contra la BD — las versiones
+incrementales (append_new_notifications, upsert_gameweek,
+upsert_clasificaciones) deben dejar la tabla igual que el merge completo en
+pandas de siempre, pero sin leerla ni reescribirla entera.
+"""
+import pandas as pd
+import pytest
+
+from src.data.merge_clasification import merge_clasifications, upsert_clasificaciones
+from src.data.merge_gameweek import merge_gameweek, upsert_gameweek
+from src.data.merge_notifications import append_new_notifications, merge_feed_cards_until_match
+from src.utils import db as db_utils
+
+TEMPORADA = "2025-26"
+PATH = "data/processed/ganancias.csv"
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "test.db"
+    monkeypatch.setattr(db_utils, "get_db_path", lambda: path)
+    monkeypatch.setattr(db_utils, "get_active_season", lambda: TEMPORADA)
+    return path
+
+
+def _feed(*filas) -> pd.DataFrame:
+    """Filas (type, idTransfer, jugador) en orden del feed (lo más reciente primero)."""
+    return pd.DataFrame([{"type": t, "idTransfer": i, "jugador": j} for t, i, j in filas])
+
+
+GUARDADO = _feed(
+    ("bonificacion", None, None),
+    ("transfer", "t2", "Pedri"),
+    ("transfer", "t1", "Mbappé"),
+)
+NUEVO = _feed(
+    ("transfer", "t4", "Lamine"),
+    ("transfer", "t3", "Vini"),
+    ("bonificacion", None, None),
+    ("transfer", "t2", "Pedri"),
+    ("transfer", "t1", "Mbappé"),
+)
+
+
+def _sin_temporada(df: pd.DataFrame) -> pd.DataFrame:
+    return df.drop(columns=["temporada"], errors="ignore").astype(str).reset_index(drop=True)
+
+
+def _ordenado(df: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    return _sin_temporada(df).sort_values(keys).reset_index(drop=True)
+
+
+class TestAppendNewNotifications:
+    def test_deja_la_tabla_igual_que_el_merge_completo(self, db_path):
+        db_utils.write_table(merge_feed_cards_until_match(pd.DataFrame(), GUARDADO.copy()), "ganancias", TEMPORADA)
+        esperado = merge_feed_cards_until_match(db_utils.read_table("ganancias", TEMPORADA), NUEVO.copy())
+
+        añadidas = append_new_notifications(NUEVO.copy(), PATH)
+
+        assert añadidas == 3
+        obtenido = _sin_temporada(db_utils.read_table("ganancias", TEMPORADA))
+        pd.testing.assert_frame_equal(obtenido, _sin_temporada(esperado))
+
+    def test_sin_novedades_no_anade_nada(self, db_path):
+        append_new_notifications(GUARDADO.copy(), PATH)
+
+        assert append_new_notifications(GUARDADO.iloc[1:].copy(), PATH) == 0
+        assert len(db_utils.read_table("ganancias", TEMPORADA)) == 3
+
+    def test_primera_ejecucion_crea_la_tabla_con_el_feed(self, db_path):
+        assert append_new_notifications(NUEVO.copy(), PATH) == len(NUEVO)
+        assert db_utils.read_table("ganancias", TEMPORADA)["idTransfer"].tolist()[:2] == ["t4", "t3"]
+
+    def test_conserva_la_fecha_de_extraccion(self, db_path):
+        # Reextracción de un día archivado (run_extraction.py --fecha)
+        append_new_notifications(NUEVO.assign(date=pd.Timestamp("2025-09-01").date()), PATH)
+
+        assert set(db_utils.read_table("ganancias", TEMPORADA)["date"]) == {"2025-09-01"}
+
+    def test_insercion_rechazada_lanza_write_error(self, db_path, monkeypatch):
+        monkeypatch.setattr(db_utils, "prepend_rows", lambda *a, **k: None)
+
+        with pytest.raises(db_utils.WriteError):
+            append_new_notifications(NUEVO.copy(), PATH)
+
+
+def _gameweek(jornada: int, *jugadores, date="2026-10-01") -> pd.DataFrame:
+    return pd.DataFrame([
+        {"Date": date, "Jornada": jornada, "EquipoLocal": 15, "EquipoVisitante": 3, "EquipoJugador": 15,
+         "Manager": manager, "NombreJugador": jugador, "Puntos": puntos}
+        for manager, jugador, puntos in jugadores
+    ])
+
+
+class TestUpsertGameweek:
+    def test_deja_la_tabla_igual_que_merge_gameweek(self, db_path):
+        viejo = _gameweek(3, ("Dani", "Pedri", 8), ("Maldinillo", "Mbappé", 18))
+        nuevo = pd.concat([
+            _gameweek(3, ("Dani", "Pedri", 99), date="2026-10-02"),
+            _gameweek(4, ("Dani", "Pedri", 5), ("Maldinillo", "Mbappé", 2), date="2026-10-02"),
+        ], ignore_index=True)
+        db_utils.write_table(viejo, "gameweek", TEMPORADA)
+        esperado = merge_gameweek(viejo, nuevo)
+
+        añadidas = upsert_gameweek(nuevo, "data/processed/gameweek.csv")
+
+        assert añadidas == 2
+        keys = ["Jornada", "Manager"]
+        obtenido = _ordenado(db_utils.read_table("gameweek", TEMPORADA), keys)
+        pd.testing.assert_frame_equal(obtenido, _ordenado(esperado, keys))
+
+    def test_escritura_fallida_lanza_write_error(self, db_path, monkeypatch):
+        monkeypatch.setattr(db_utils, "upsert_rows", lambda *a, **k: None)
+
+        with pytest.raises(db_utils.WriteError):
+            upsert_gameweek(_gameweek(4, ("Dani", "Pedri", 5)), "data/processed/gameweek.csv")
+
+
+class TestUpsertClasificaciones:
+    @staticmethod
+    def _clas(jornada, *filas):
+        return pd.DataFrame([
+            {"jornada": jornada, "nombre": n, "posicion": p, "puntos": pts, "valor_equipo": 100.0}
+            for n, p, pts in filas
+        ])
+
+    def test_deja_la_tabla_igual_que_merge_clasifications(self, db_path):
+        viejo = pd.concat([
+            self._clas(4, ("Dani", 1, 60), ("Maldinillo", 2, 50)),
+            self._clas(5, ("Dani", 2, 70), ("Maldinillo", 1, 75), ("Antiguo", 3, 10)),
+        ], ignore_index=True)
+        nuevo = self._clas(5, ("Dani", 1, 80), ("Maldinillo", 2, 78))
+        db_utils.write_table(viejo, "clasificaciones", TEMPORADA)
+        esperado = merge_clasifications(viejo, nuevo)
+
+        upsert_clasificaciones(nuevo, "data/processed/clasificaciones.csv")
+
+        keys = ["jornada", "nombre"]
+        obtenido = _ordenado(db_utils.read_table("clasificaciones", TEMPORADA), keys)
+        pd.testing.assert_frame_equal(obtenido, _ordenado(esperado, keys))
+
+    def test_clasificacion_vacia_no_toca_la_tabla(self, db_path):
+        viejo = self._clas(5, ("Dani", 2, 70))
+        db_utils.write_table(viejo, "clasificaciones", TEMPORADA)
+
+        assert upsert_clasificaciones(self._clas(5).reindex(columns=viejo.columns), "data/processed/clasificaciones.csv") == 0
+        assert len(db_utils.read_table("clasificaciones", TEMPORADA)) == 1
+
+    def test_upsert_rechazado_lanza_write_error_en_vez_de_0(self, db_path):
+        viejo = self._clas(5, *[(f"m{i}", i, i) for i in range(12)])
+        db_utils.write_table(viejo, "clasificaciones", TEMPORADA)
+
+        # 1 fila para una jornada con 12: la protección contra encogimiento la rechaza
+        with pytest.raises(db_utils.WriteError):
+            upsert_clasificaciones(self._clas(5, ("m0", 1, 1)), "data/processed/clasificaciones.csv")
+        assert len(db_utils.read_table("clasificaciones", TEMPORADA)) == 12
@@ -0,0 +1,77 @@
+"""
+Tests para src/utils/parquet_export.py — export de data/mister.db a Parquet
+particionado por temporada y tabla, incremental por partición.
+"""
+import pandas as pd
+import pytest
+
+from src.utils import db as db_utils
+from src.utils import parquet_export
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "test.db"
+    monkeypatch.setattr(db_utils, "get_db_path", lambda: path)
+    return path
+
+
+def test_sin_pyarrow_no_exporta(db_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(db_utils, "arrow_available", lambda: False)
+
+    assert parquet_export.export_parquet(tmp_path / "out") is None
+    assert not (tmp_path / "out").exists()
+
+
+class TestExportParquet:
+    @pytest.fixture(autouse=True)
+    def _pyarrow(self):
+        pytest.importorskip("pyarrow")
+
+    @pytest.fixture
+    def out(self, db_path, tmp_path):
+        db_utils.write_table(pd.DataFrame([{"x": 1}, {"x": 2}]), "t_a", "2025-26")
+        db_utils.write_table(pd.DataFrame([{"x": 3}]), "t_a", "2026-27")
+        db_utils.write_table(pd.DataFrame([{"y": "z"}]), "t_b", "2026-27")
+        return tmp_path / "out"
+
+    def test_particiona_por_temporada_y_tabla(self, out):
+        result = parquet_export.export_parquet(out)
+
+        assert sorted(result["exportadas"]) == ["t_a/2025-26", "t_a/2026-27", "t_b/2026-27"]
+        df = pd.read_parquet(out / "tabla=t_a" / "temporada=2025-26" / "part.parquet")
+        assert df["x"].tolist() == [1, 2]
+        assert "temporada" not in df.columns
+
+    def test_la_tabla_se_lee_entera_con_la_temporada_de_la_ruta(self, out):
+        parquet_export.export_parquet(out)
+
+        df = pd.read_parquet(out / "tabla=t_a")
+
+        assert sorted(zip(df["temporada"].astype(str), df["x"])) == [("2025-26", 1), ("2025-26", 2), ("2026-27", 3)]
+
+    def test_solo_reexporta_las_particiones_cambiadas(self, out):
+        parquet_export.export_parquet(out)
+        db_utils.write_table(pd.DataFrame([{"x": 3}, {"x": 4}]), "t_a", "2026-27")
+
+        result = parquet_export.export_parquet(out)
+
+        assert result["exportadas"] == ["t_a/2026-27"]
+        assert sorted(result["sin_cambios"]) == ["t_a/2025-26", "t_b/2026-27"]
+        df = pd.read_parquet(out / "tabla=t_a" / "temporada=2026-27" / "part.parquet")
+        assert df["x"].tolist() == [3, 4]
+
+    def test_full_reexporta_todo(self, out):
+        parquet_export.export_parquet(out)
+
+        assert len(parquet_export.export_parquet(out, full=True)["exportadas"]) == 3
+
+    def test_borra_las_particiones_que_ya_no_estan_en_la_bd(self, out):
+        parquet_export.export_parquet(out)
+        with db_utils.get_connection() as conn:
+            conn.execute("DELETE FROM t_b")
+
+        result = parquet_export.export_parquet(out)
+
+        assert result["borradas"] == ["t_b/2026-27"]
+        assert not (out / "tabla=t_b" / "temporada=2026-27").exists()
@@ -0,0 +1,342 @@
+"""
+Tests para src/preprocessing/ — limpieza del feed de notificaciones
+(procesar_ganancias) y Diff por jugador (procesar_ganancias_jugador). La
+referencia es la temporada archivada: sus ganancias_clean.csv y
+ganancias_jugador.csv se generaron con las implementaciones anteriores
+(fila a fila y cruce de ventas con compras), y las actuales tienen que
+reproducirlos.
+
+El preprocesado incremental (incremental.py) y el completo en una
+transacción (procesar_notificaciones + db.write_tables) se comparan contra rehacerlo todo paso a paso
+sobre el mismo feed, en un SQLite temporal.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.preprocessing import incremental
+from src.preprocessing.process_clausulas_acuerdos import procesar_clausulas_acuerdos
+from src.preprocessing.process_ganancias import procesar_ganancias
+from src.preprocessing.process_ganancias_jugador import procesar_ganancias_jugador
+from src.preprocessing.process_notificaciones import procesar_notificaciones
+from src.utils import db as db_utils
+
+ARCHIVO = Path(__file__).resolve().parent.parent / "archive" / "temporada_2025-26" / "data" / "processed"
+
+
+def _feed(*filas) -> pd.DataFrame:
+    columnas = ["type", "subtype", "jugador", "de_equipo", "a_equipo", "precio", "equipoLiga", "name", "money",
+                "jornada", "date"]
+    return pd.DataFrame([dict(zip(columnas, f)) for f in filas], columns=columnas)
+
+
+START = ("marks", "start_mercado", None, None, None, None, None, None, None, None, "2026-10-18")
+
+
+def _transfer(subtipo, de, a, precio=10.0, jugador="Pedri"):
+    return ("transfer", subtipo, jugador, de, a, precio, 3.0, None, None, None, "2026-10-18")
+
+
+class TestProcesarGanancias:
+    @pytest.mark.skipif(not (ARCHIVO / "ganancias.csv").exists(), reason="sin temporada archivada")
+    def test_reproduce_byte_a_byte_la_temporada_archivada(self):
+        df = pd.read_csv(ARCHIVO / "ganancias.csv")
+
+        out = procesar_ganancias(df)
+
+        assert out.to_csv(index=False) == (ARCHIVO / "ganancias_clean.csv").read_text(encoding="utf-8")
+
+    def test_transfer_entre_managers_da_venta_y_compra(self):
+        out = procesar_ganancias(_feed(_transfer("clausula", "Dani", "Juanba", 12.5)))
+
+        assert out[["equipo", "compra-venta", "ganancias"]].values.tolist() == [
+            ["Dani", "venta", 12.5], ["Juanba", "compra", -12.5],
+        ]
+
+    def test_puja_cuenta_cero_y_se_quita_la_parte_de_mister(self):
+        out = procesar_ganancias(_feed(_transfer("Puja", "Mister", "Dani", 7.0)))
+
+        assert out[["equipo", "compra-venta", "ganancias"]].values.tolist() == [["Dani", "compra", 0.0]]
+
+    def test_sin_a_equipo_es_bajada_de_clausula(self):
+        out = procesar_ganancias(_feed(_transfer("clausula", "Dani", None)))
+
+        assert out["type"].tolist() == ["bajadaclausula"]
+        assert list(out.columns) == ["fecha", "id", "type", "equipo", "jugador", "equipoLiga", "ganancias"]
+
+    def test_start_mercado_seguido_de_transfer_entre_managers_se_descarta(self):
+        out = procesar_ganancias(_feed(START, _transfer("clausula", "Dani", "Juanba"), START,
+                                       _transfer("mercado", "Mister", "Dani")))
+
+        assert out["subtype"].tolist() == ["clausula", "clausula", "start_mercado", "mercado"]
+
+    def test_el_id_sube_tras_cada_start_mercado(self):
+        out = procesar_ganancias(_feed(
+            _transfer("mercado", "Dani", "Mister"),
+            START,
+            _transfer("mercado", "Mister", "Juanba"),
+            _transfer("mercado", "Dani", "Mister"),
+            START,
+            START,
+            _transfer("mercado", "Juanba", "Mister"),
+        ))
+
+        # El segundo START va seguido de un transfer con de_equipo != 'Mister': se descarta
+        assert out["id"].tolist() == [0, 0, 0, 1, 1, 2]
+
+    def test_precio_no_numerico_se_queda_solo_con_la_venta(self):
+        df = _feed(_transfer("mercado", "Dani", "Juanba"))
+        df["precio"] = np.array(["abc"], dtype=object)
+
+        out = procesar_ganancias(df)
+
+        assert out["compra-venta"].tolist() == ["venta"]
+
+
+def _ledger(*filas) -> pd.DataFrame:
+    """ganancias_clean mínimo: (id, subtype, equipo, jugador, compra-venta, ganancias)."""
+    return pd.DataFrame(
+        [{"fecha": "2026-10-18", "id": i, "type": "transfer", "subtype": st, "equipo": eq, "jugador": j,
+          "compra-venta": cv, "equipoLiga": 3.0, "ganancias": g} for i, st, eq, j, cv, g in filas]
+    )
+
+
+class TestProcesarGananciasJugador:
+    @pytest.mark.skipif(not (ARCHIVO / "ganancias_jugador.csv").exists(), reason="sin temporada archivada")
+    def test_reproduce_la_temporada_archivada(self):
+        out = procesar_ganancias_jugador(pd.read_csv(ARCHIVO / "ganancias_clean.csv"))
+
+        esperado = pd.read_csv(ARCHIVO / "ganancias_jugador.csv")
+        pd.testing.assert_frame_equal(out.reset_index(drop=True), esperado, rtol=1e-12)
+
+    def test_empareja_con_la_compra_anterior_mas_reciente(self):
+        out = procesar_ganancias_jugador(_ledger(
+            (0, "mercado", "Dani", "Pedri", "venta", 20.0),
+            (2, "mercado", "Dani", "Pedri", "compra", -12.0),
+            (5, "mercado", "Dani", "Pedri", "compra", -3.0),
+            (3, "mercado", "Juanba", "Pedri", "compra", -1.0),
+        ))
+
+        assert out["Diff"].tolist() == [8.0]
+
+    def test_compra_de_la_misma_sesion_no_cuenta(self):
+        out = procesar_ganancias_jugador(_ledger(
+            (1, "mercado", "Dani", "Pedri", "venta", 20.0),
+            (1, "mercado", "Dani", "Pedri", "compra", -12.0),
+        ))
+
+        assert out.empty
+
+    def test_dos_compras_en_la_misma_sesion_gana_la_primera_del_historial(self):
+        out = procesar_ganancias_jugador(_ledger(
+            (0, "mercado", "Dani", "Pedri", "venta", 20.0),
+            (4, "acuerdo", "Dani", "Pedri", "compra", -15.0),
+            (4, "Puja", "Dani", "Pedri", "compra", 0.0),
+        ))
+
+        assert out["Diff"].tolist() == [5.0]
+
+    def test_compra_sin_importe_se_salta(self):
+        out = procesar_ganancias_jugador(_ledger(
+            (0, "mercado", "Dani", "Pedri", "venta", 20.0),
+            (2, "mercado", "Dani", "Pedri", "compra", np.nan),
+            (3, "mercado", "Dani", "Pedri", "compra", -12.0),
+        ))
+
+        assert out["Diff"].tolist() == [8.0]
+
+    def test_pujas_fuera_y_ventas_repetidas_comparten_diff(self):
+        out = procesar_ganancias_jugador(_ledger(
+            (0, "Puja", "Dani", "Pedri", "venta", 0.0),
+            (0, "mercado", "Dani", "Pedri", "venta", 20.0),
+            (0, "clausula", "Dani", "Pedri", "venta", 30.0),
+            (2, "mercado", "Dani", "Pedri", "compra", -12.0),
+        ))
+
+        assert out["subtype"].tolist() == ["mercado", "clausula"]
+        assert out["Diff"].tolist() == [8.0, 8.0]
+        assert list(out.columns) == ["fecha", "subtype", "equipo", "jugador", "equipoLiga", "Diff"]
+
+
+TABLAS = {"feed": "t_feed", "clean": "t_clean", "jugador": "t_jugador", "clausulas": "t_clausulas"}
+T = "2026-27"
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Redirige get_db_path() a un SQLite temporal, aislado del data/mister.db real."""
+    path = tmp_path / "test.db"
+    monkeypatch.setattr(db_utils, "get_db_path", lambda: path)
+    return path
+
+
+def _completo() -> None:
+    """Lo mismo que run_preprocess.py --full, sobre las tablas de TABLAS."""
+    version = db_utils.current_version()
+    feed = db_utils.read_table(TABLAS["feed"], T)
+    db_utils.write_table(procesar_ganancias(feed), TABLAS["clean"], T)
+    db_utils.write_table(procesar_ganancias_jugador(db_utils.read_table(TABLAS["clean"], T)), TABLAS["jugador"], T)
+    db_utils.write_table(procesar_clausulas_acuerdos(feed), TABLAS["clausulas"], T)
+    incremental.guardar_marca(TABLAS, T, feed, desde_version=version)
+
+
+def _derivadas() -> dict:
+    return {
+        clave: db_utils.read_table(TABLAS[clave], T).drop(columns="temporada").to_csv(index=False)
+        for clave in ("clean", "jugador", "clausulas")
+    }
+
+
+def _con_ids(df: pd.DataFrame, primero: int) -> pd.DataFrame:
+    df = df.copy()
+    df["idTransfer"] = [float(primero + i) if t == "transfer" else np.nan for i, t in enumerate(df["type"])]
+    return df
+
+
+class TestPreprocesadoIncremental:
+    # Historial de más antiguo (abajo) a más reciente (arriba), como el feed.
+    VIEJO = [
+        _transfer("clausula", "Dani", "Juanba", 12.5, "Pedri"),
+        START,
+        _transfer("mercado", "Mister", "Dani", 8.0, "Pedri"),
+        _transfer("mercado", "Juanba", "Mister", 3.0, "Isco"),
+        START,
+        _transfer("mercado", "Mister", "Juanba", 2.0, "Isco"),
+    ]
+    NUEVO = [
+        _transfer("acuerdo", "Juanba", "Dani", 15.0, "Pedri"),
+        START,
+        _transfer("mercado", "Mister", "Bea", 4.0, "Koke"),
+        _transfer("mercado", "Dani", "Mister", 5.0, "Isco"),
+    ]
+
+    def test_sin_marca_de_agua_pide_rehacerlo_todo(self, db_path):
+        db_utils.write_table(_con_ids(_feed(*self.VIEJO), 0), TABLAS["feed"], T)
+
+        assert not incremental.preprocesar_incremental(TABLAS, T)
+
+    def test_notificaciones_nuevas_dan_lo_mismo_que_rehacerlo_todo(self, db_path):
+        db_utils.write_table(_con_ids(_feed(*self.VIEJO), 0), TABLAS["feed"], T)
+        _completo()
+
+        db_utils.prepend_rows(_con_ids(_feed(*self.NUEVO), 100), TABLAS["feed"], T)
+        v = db_utils.current_version()
+        assert incremental.preprocesar_incremental(TABLAS, T)
+        incrementales = _derivadas()
+
+        # El incremental solo añade cabeceras y desplaza ids, no reescribe
+        assert {c["operacion"] for c in db_utils.changes_since(v)} <= {"prepend", "update"}
+        _completo()
+        assert incrementales == _derivadas()
+
+    def test_cabecera_sustituida_da_lo_mismo_que_rehacerlo_todo(self, db_path):
+        viejo = _con_ids(_feed(*self.VIEJO), 0)
+        db_utils.write_table(viejo.iloc[2:], TABLAS["feed"], T)
+        _completo()
+
+        # La extracción vuelve a traer las dos filas de arriba y las sustituye
+        corte = db_utils.rowid_at(TABLAS["feed"], T, 2)
+        nuevas = pd.concat([_con_ids(_feed(*self.NUEVO), 100), viejo.iloc[2:4]], ignore_index=True)
+        db_utils.prepend_rows(nuevas, TABLAS["feed"], T, replace_before_rowid=corte)
+        assert incremental.preprocesar_incremental(TABLAS, T)
+        incrementales = _derivadas()
+
+        _completo()
+        assert incrementales == _derivadas()
+
+    def test_fallo_a_medias_no_deja_las_tablas_desincronizadas(self, db_path, monkeypatch):
+        import sqlite3
+
+        db_utils.write_table(_con_ids(_feed(*self.VIEJO), 0), TABLAS["feed"], T)
+        _completo()
+        antes = _derivadas()
+        db_utils.prepend_rows(_con_ids(_feed(*self.NUEVO), 100), TABLAS["feed"], T)
+        v = db_utils.current_version()
+
+        registrar, llamadas = db_utils._record_change, []
+
+        def _falla_la_tercera(*args, **kwargs):
+            llamadas.append(args[1])
+            if len(llamadas) == 3:
+                raise sqlite3.OperationalError("disco lleno")
+            return registrar(*args, **kwargs)
+
+        monkeypatch.setattr(db_utils, "_record_change", _falla_la_tercera)
+        assert not incremental.preprocesar_incremental(TABLAS, T)
+        monkeypatch.setattr(db_utils, "_record_change", registrar)
+
+        assert _derivadas() == antes
+        assert db_utils.changes_since(v) == []
+        # La marca de agua sigue valiendo: la siguiente ejecución lo hace bien
+        assert incremental.preprocesar_incremental(TABLAS, T)
+        incrementales = _derivadas()
+        _completo()
+        assert incrementales == _derivadas()
+
+    def test_sin_notificaciones_nuevas_no_escribe_nada(self, db_path):
+        db_utils.write_table(_con_ids(_feed(*self.VIEJO), 0), TABLAS["feed"], T)
+        _completo()
+        v = db_utils.current_version()
+
+        assert incremental.preprocesar_incremental(TABLAS, T)
+
+        assert db_utils.current_version() == v
+
+    def test_feed_reescrito_o_tabla_derivada_tocada_pide_rehacerlo_todo(self, db_path):
+        db_utils.write_table(_con_ids(_feed(*self.VIEJO), 0), TABLAS["feed"], T)
+        _completo()
+        db_utils.write_table(_con_ids(_feed(*self.NUEVO), 100), TABLAS["feed"], T, allow_shrink=True)
+        assert not incremental.preprocesar_incremental(TABLAS, T)
+
+        _completo()
+        db_utils.write_table(db_utils.read_table(TABLAS["jugador"], T).iloc[:1], TABLAS["jugador"], T,
+                             allow_shrink=True)
+        assert not incremental.preprocesar_incremental(TABLAS, T)
+
+    @pytest.mark.skipif(not (ARCHIVO / "ganancias.csv").exists(), reason="sin temporada archivada")
+    def test_temporada_archivada_por_tandas(self, db_path):
+        feed = pd.read_csv(ARCHIVO / "ganancias.csv")
+        cortes = [len(feed), 1200, 900, 850, 600, 400, 399, 150, 0]
+        db_utils.write_table(feed.iloc[cortes[1]:], TABLAS["feed"], T)
+        _completo()
+
+        for hasta, desde in zip(cortes[1:], cortes[2:]):
+            db_utils.prepend_rows(feed.iloc[desde:hasta], TABLAS["feed"], T)
+            assert incremental.preprocesar_incremental(TABLAS, T)
+
+        incrementales = _derivadas()
+        _completo()
+        assert incrementales == _derivadas()
+
+
+class TestProcesarNotificaciones:
+    @pytest.mark.skipif(not (ARCHIVO / "ganancias.csv").exists(), reason="sin temporada archivada")
+    def test_reproduce_byte_a_byte_las_tres_tablas_archivadas(self):
+        salidas = procesar_notificaciones(pd.read_csv(ARCHIVO / "ganancias.csv"))
+
+        for clave, archivo in (("clean", "ganancias_clean.csv"), ("jugador", "ganancias_jugador.csv"),
+                               ("clausulas", "clausulas_acuerdos.csv")):
+            assert salidas[clave].to_csv(index=False) == (ARCHIVO / archivo).read_text(encoding="utf-8")
+
+    def test_sin_transfers_no_hay_ganancias_por_jugador(self):
+        salidas = procesar_notificaciones(_feed(START))
+
+        assert salidas["jugador"].empty
+        assert salidas["clausulas"].empty
+        assert salidas["clean"]["subtype"].tolist() == ["start_mercado"]
+
+    def test_guardado_en_una_transaccion_da_lo_mismo_que_por_pasos(self, db_path):
+        feed = _con_ids(_feed(*TestPreprocesadoIncremental.NUEVO, *TestPreprocesadoIncremental.VIEJO), 0)
+        db_utils.write_table(feed, TABLAS["feed"], T)
+        _completo()
+        por_pasos = _derivadas()
+
+        version = db_utils.current_version()
+        salidas = procesar_notificaciones(db_utils.read_table(TABLAS["feed"], T))
+        assert db_utils.write_tables({TABLAS[clave]: df for clave, df in salidas.items()}, T)
+        incremental.guardar_marca(TABLAS, T, feed, desde_version=version)
+
+        assert _derivadas() == por_pasos
+        assert db_utils.get_watermark(incremental.MARCA, T) is not None
@@ -0,0 +1,97 @@
+"""
+Tests para src/data/process_modeling.py — tabla data_model
+(procesar_model_data). La referencia es la temporada archivada: su
+data_model.csv se generó con la implementación anterior (apply fila a fila
+y cuatro merges), y la actual tiene que reproducirlo.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import process_modeling
+from src.data.process_modeling import procesar_model_data
+
+ARCHIVO = Path(__file__).resolve().parent.parent / "archive" / "temporada_2025-26" / "data" / "processed"
+
+
+def _mercado(*filas) -> pd.DataFrame:
+    """(date, jugador, precio) de jugadores libres."""
+    return pd.DataFrame([
+        {"date": d, "manager": "Libre", "jugador": j, "precio": p, "posicionJugador": 3.0, "puntosJugador": 7.0,
+         "equipoLiga": 16.0, "avgPoints": 1.8, "estado": np.nan}
+        for d, j, p in filas
+    ])
+
+
+def _notificaciones(*filas) -> pd.DataFrame:
+    """(fecha, subtype, equipo, jugador, ganancias) de compras."""
+    columnas = ["fecha", "id", "type", "subtype", "equipo", "jugador", "compra-venta", "equipoLiga", "ganancias"]
+    return pd.DataFrame([(f, 0, "transfer", s, e, j, "compra", 16.0, g) for f, s, e, j, g in filas], columns=columnas)
+
+
+SIN_SUBIDAS = pd.DataFrame({"date": pd.Series(dtype=object), "nombre": pd.Series(dtype=object),
+                            "variacion": pd.Series(dtype=float)})
+SIN_JORNADAS = pd.DataFrame({"date": ["2026-10-18"], "jornada": [9], "detalles": ["Finalizada"]})
+
+
+class TestProcesarModelData:
+    @pytest.mark.skipif(not (ARCHIVO / "data_model.csv").exists(), reason="sin temporada archivada")
+    def test_reproduce_byte_a_byte_la_temporada_archivada(self):
+        out = procesar_model_data(
+            pd.read_csv(ARCHIVO / "mercado.csv"),
+            pd.read_csv(ARCHIVO / "subidasBajadas.csv"),
+            pd.read_csv(ARCHIVO / "jornadas.csv"),
+            pd.read_csv(ARCHIVO / "ganancias_clean.csv"),
+        )
+
+        assert out.to_csv(index=False) == (ARCHIVO / "data_model.csv").read_text(encoding="utf-8")
+
+    def test_nombres_completos_se_abrevian_para_cruzar_con_el_mercado(self):
+        subidas = pd.DataFrame({"date": ["2026-10-18"], "nombre": ["  pedri González "], "variacion": [0.3]})
+
+        out = procesar_model_data(_mercado(("2026-10-18", "P. González", 20.0)), subidas, SIN_JORNADAS,
+                                  _notificaciones())
+
+        assert out[["jugador", "variacion"]].values.tolist() == [["P. GONZÁLEZ", 0.3]]
+        assert process_modeling._ABREVIATURAS["PEDRI GONZÁLEZ"] == "P. GONZÁLEZ"
+
+    def test_compra_del_dia_siguiente_y_pujas_por_fecha_y_jugador(self):
+        mercado = _mercado(("2026-10-18", "Isco", 5.0), ("2026-10-18", "Koke", 4.0), ("2026-10-18", "Pedri", 9.0))
+        notificaciones = _notificaciones(
+            ("2026-10-19", "mercado", "Dani", "Isco", -5.5),
+            ("2026-10-19", "mercado", "Bea", "Isco", -5.2),   # dos compras: dos filas, como el merge
+            ("2026-10-19", "Puja", "Dani", "Isco", 0.0),
+            ("2026-10-19", "Puja", "Dani", "Koke", 0.0),      # pujas sin compra
+            ("2026-10-19", "Puja", "Bea", "Koke", 0.0),
+            ("2026-10-18", "mercado", "Bea", "Pedri", -9.0),  # del mismo día: no cuenta
+        )
+
+        out = procesar_model_data(mercado, SIN_SUBIDAS, SIN_JORNADAS, notificaciones)
+
+        assert out[["jugador", "equipo", "num_pujas"]].fillna("-").values.tolist() == [
+            ["ISCO", "Dani", 1], ["ISCO", "Bea", 1], ["KOKE", "-", 2], ["PEDRI", "-", 0],
+        ]
+        assert list(out.columns)[-3:] == ["equipo", "ganancias", "num_pujas"]
+
+    def test_dias_hasta_la_jornada(self):
+        jornadas = pd.DataFrame({
+            "date": ["2026-10-18"] * 4,
+            "jornada": [9, 9, 10, 10],
+            "detalles": ["En juego", "Empieza en 3 días", "Empieza en 1 día", None],
+        })
+
+        out = procesar_model_data(_mercado(("2026-10-18", "Isco", 5.0)), SIN_SUBIDAS, jornadas, _notificaciones())
+
+        assert out[["jornada", "detalles"]].values.tolist() == [[9, 3.0], [10, 1.0], [10, 0.5]]
+
+    def test_no_modifica_los_dataframes_de_entrada(self):
+        mercado = _mercado(("2026-10-18", "Isco", 5.0))
+        notificaciones = _notificaciones(("2026-10-19", "mercado", "Dani", "isco alarcón", -5.5))
+        copias = mercado.copy(), notificaciones.copy()
+
+        procesar_model_data(mercado, SIN_SUBIDAS, SIN_JORNADAS, notificaciones)
+
+        pd.testing.assert_frame_equal(mercado, copias[0])
+        pd.testing.assert_frame_equal(notificaciones, copias[1])
@@ -0,0 +1,123 @@
+"""
+Tests para scripts/run_extraction.py — extracción de secciones en secuencial
+y en paralelo (extraction.workers > 1: parseo en un pool de procesos,
+escrituras siempre desde el proceso principal) y caché de extracción.
+"""
+import pandas as pd
+import pytest
+
+from scripts import run_extraction
+from scripts.run_extraction import extraer_secciones, guardar_append
+from src.data.extract_clasificacion import extraer_clasificaciones
+from src.data.extract_mercado import extraer_mercado
+from src.data.extraction_cache import clave_cache
+from src.utils import db as db_utils
+from tests import test_extract_data as casos
+
+
+@pytest.fixture
+def secciones(tmp_path):
+    (tmp_path / "mercado.html").write_text(casos.TestExtraerMercado.HTML_VALIDO, encoding="utf-8")
+    (tmp_path / "clasificacion.html").write_text(casos.TestExtraerClasificaciones.HTML_VALIDO, encoding="utf-8")
+    return [
+        ("clasificaciones", str(tmp_path / "clasificacion.html"), extraer_clasificaciones,
+         str(tmp_path / "out" / "t_clas.csv"), guardar_append),
+        ("quiniela", str(tmp_path / "no_existe.html"), extraer_mercado,
+         str(tmp_path / "out" / "t_quiniela.csv"), guardar_append),
+        ("mercado", str(tmp_path / "mercado.html"), extraer_mercado,
+         str(tmp_path / "out" / "t_mercado.csv"), guardar_append),
+    ]
+
+
+class TestExtraerSecciones:
+    def test_html_ausente_se_salta_y_el_resto_se_guarda(self, secciones):
+        skipped, _ = extraer_secciones(secciones)
+
+        assert skipped == ["quiniela"]
+        assert len(pd.read_csv(secciones[2][3])) == 1
+        assert len(pd.read_csv(secciones[0][3])) == 1
+
+    def test_paralelo_guarda_lo_mismo_que_secuencial(self, secciones, tmp_path):
+        extraer_secciones(secciones)
+        esperado = {nombre: pd.read_csv(csv) for nombre, _, _, csv, _ in secciones if nombre != "quiniela"}
+        for f in (tmp_path / "out").iterdir():
+            f.unlink()
+
+        skipped, _ = extraer_secciones(secciones, workers=2)
+
+        assert skipped == ["quiniela"]
+        for nombre, _, _, csv, _ in secciones:
+            if nombre in esperado:
+                pd.testing.assert_frame_equal(pd.read_csv(csv), esperado[nombre])
+
+    def test_devuelve_tiempos_de_todas_las_secciones(self, secciones):
+        _, tiempos = extraer_secciones(secciones, workers=2)
+
+        assert set(tiempos) == {"clasificaciones", "quiniela", "mercado"}
+        assert tiempos["quiniela"]["guardado"] == 0.0
+        assert all(t["extraccion"] >= 0 for t in tiempos.values())
+
+
+class TestGuardarAppend:
+    def test_escritura_fallida_lanza_write_error(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(run_extraction, "safe_save_csv", lambda *a, **k: False)
+
+        with pytest.raises(db_utils.WriteError):
+            guardar_append(pd.DataFrame([{"date": "2026-10-18", "jugador": "Pedri"}]), str(tmp_path / "t.csv"))
+
+
+class TestCacheExtraccion:
+    """Con caché, una página que no ha cambiado desde la última ejecución ni
+    se parsea ni se mergea (src/data/extraction_cache.py)."""
+
+    def test_segunda_ejecucion_sin_cambios_no_remergea(self, secciones, tmp_path, monkeypatch):
+        cache_dir = tmp_path / "cache"
+        extraer_secciones(secciones, cache_dir=cache_dir)
+
+        merges = []
+        monkeypatch.setattr(run_extraction, "_guardar_seccion", lambda nombre, *a: (merges.append(nombre) or 0.0, True))
+        skipped, tiempos = extraer_secciones(secciones, cache_dir=cache_dir)
+
+        assert merges == []
+        assert skipped == ["quiniela"]
+        assert tiempos["mercado"]["cache_hit"] and tiempos["clasificaciones"]["cache_hit"]
+
+    def test_escritura_fallida_se_salta_y_no_entra_en_la_cache(self, secciones, tmp_path, monkeypatch):
+        cache_dir = tmp_path / "cache"
+        guardar = run_extraction.safe_save_csv
+        monkeypatch.setattr(run_extraction, "safe_save_csv",
+                            lambda df, path, **k: "t_clas" not in path and guardar(df, path, **k))
+
+        skipped, _ = extraer_secciones(secciones, cache_dir=cache_dir)
+
+        assert skipped == ["clasificaciones", "quiniela"]
+        assert not (cache_dir / "clasificaciones").exists()
+
+        monkeypatch.setattr(run_extraction, "safe_save_csv", guardar)
+        skipped, tiempos = extraer_secciones(secciones, cache_dir=cache_dir)
+
+        assert skipped == ["quiniela"]
+        assert not tiempos["clasificaciones"]["cache_hit"] and tiempos["mercado"]["cache_hit"]
+        assert len(pd.read_csv(secciones[0][3])) == 1
+
+    def test_html_modificado_invalida_la_entrada(self, secciones, tmp_path):
+        cache_dir = tmp_path / "cache"
+        extraer_secciones(secciones, cache_dir=cache_dir)
+        html_mercado = tmp_path / "mercado.html"
+        html_mercado.write_text(html_mercado.read_text(encoding="utf-8").replace("7.003.000", "7.500.000"),
+                                encoding="utf-8")
+
+        _, tiempos = extraer_secciones(secciones, cache_dir=cache_dir)
+
+        assert not tiempos["mercado"]["cache_hit"]
+        assert tiempos["clasificaciones"]["cache_hit"]
+        # Solo queda la última entrada por sección
+        assert len(list((cache_dir / "mercado").glob("*.pkl"))) == 1
+
+    def test_la_clave_depende_del_dia_y_del_extractor(self):
+        base = clave_cache("abc", extraer_mercado)
+
+        assert clave_cache("abc", extraer_mercado) == base
+        assert clave_cache("abc", extraer_mercado, "2026-10-18") != base
+        assert clave_cache("abc", extraer_clasificaciones) != base
+        assert clave_cache("abd", extraer_mercado) != base